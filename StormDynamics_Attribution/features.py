@@ -0,0 +1,104 @@
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class FeatureEngine:
+    """Rolling, lagged and run-length features computed chunk by chunk.
+
+    Every column is processed in one vectorized pass per chunk: rolling means
+    from cumulative sums, rolling maxima from a strided sliding-window view and
+    lags by shifting. The last rows of each chunk and the current run length
+    are carried over, so features of a series split into consecutive chunks
+    equal those of the whole series. Rolling windows over the first rows of the
+    series use the rows available (like ``rolling(w, min_periods=1)``) and
+    ignore NaN.
+
+    Args:
+        columns: Columns to derive rolling and lagged features from
+        windows: Rolling window sizes, in rows
+        lags: Lags, in rows
+        run_column: 0/1 column whose consecutive runs of 1 are counted, or None
+    """
+
+    def __init__(self, columns: Sequence[str] = ('cape', 'shear'), windows: Sequence[int] = (3, 7, 30),
+                 lags: Sequence[int] = (1, 2, 3), run_column: str = 'storm_event'):
+        self.columns = list(columns)
+        self.windows = sorted(set(windows))
+        self.lags = sorted(set(lags))
+        self.run_column = run_column
+        # Rows of previous chunks needed by the longest window or lag
+        self.history = max([window - 1 for window in self.windows] + self.lags + [0])
+        self.reset()
+
+    def reset(self):
+        """Forget the carried state, so the next chunk starts a new series."""
+        self._tail: Dict[str, np.ndarray] = {}
+        self._run_length = 0
+
+    @property
+    def feature_names(self) -> list:
+        names = [
+            f'{column}_{stat}_{window}'
+            for column in self.columns for window in self.windows for stat in ('mean', 'max')
+        ]
+        names += [f'{column}_lag_{lag}' for column in self.columns for lag in self.lags]
+        if self.run_column:
+            names += [f'{self.run_column}_run_length']
+            names += [f'{self.run_column}_days_{window}' for window in self.windows]
+        return names
+
+    def _with_history(self, name: str, values: np.ndarray) -> np.ndarray:
+        """Prepend the carried tail, NaN-padded to ``history`` rows, and update the tail."""
+        tail = self._tail.get(name, np.full(self.history, np.nan))
+        extended = np.concatenate([tail, values])
+        self._tail[name] = extended[len(extended) - self.history:]
+        return extended
+
+    def _rolling(self, extended: np.ndarray, n: int) -> Dict[int, tuple]:
+        """Rolling sums, counts and maxima of the last ``n`` rows for every window."""
+        if n == 0:
+            empty = np.empty(0)
+            return {window: (empty, empty, empty) for window in self.windows}
+        finite = np.isfinite(extended)
+        sums = np.concatenate([[0.0], np.cumsum(np.where(finite, extended, 0.0))])
+        counts = np.concatenate([[0], np.cumsum(finite)])
+        filled = np.where(finite, extended, -np.inf)
+        end = np.arange(len(extended) - n, len(extended)) + 1
+        result = {}
+        for window in self.windows:
+            window_sum = sums[end] - sums[end - window]
+            window_count = counts[end] - counts[end - window]
+            window_max = sliding_window_view(filled, window)[end - window].max(axis=1)
+            result[window] = (window_sum, window_count, window_max)
+        return result
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Return ``df`` with the feature columns added, continuing the previous chunk."""
+        n = len(df)
+        features = {}
+        for column in self.columns:
+            extended = self._with_history(column, df[column].to_numpy(dtype='float64'))
+            for window, (window_sum, window_count, window_max) in self._rolling(extended, n).items():
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    features[f'{column}_mean_{window}'] = window_sum / window_count
+                features[f'{column}_max_{window}'] = np.where(np.isinf(window_max), np.nan, window_max)
+            for lag in self.lags:
+                features[f'{column}_lag_{lag}'] = extended[len(extended) - n - lag:len(extended) - lag]
+
+        if self.run_column:
+            events = df[self.run_column].to_numpy(dtype='float64')
+            index = np.arange(n)
+            # Position of the last non-event row; the carried run counts as events before row 0
+            last_break = np.maximum.accumulate(np.where(events == 1, -1 - self._run_length, index))
+            run_length = index - last_break
+            if n:
+                self._run_length = int(run_length[-1])
+            features[f'{self.run_column}_run_length'] = run_length
+            extended = self._with_history(self.run_column, events)
+            for window, (window_sum, _, _) in self._rolling(extended, n).items():
+                features[f'{self.run_column}_days_{window}'] = window_sum.astype('int64')
+
+        return df.assign(**features)
@@ -0,0 +1,110 @@
+import json
+from pathlib import Path
+from typing import Dict, Iterator
+
+import numpy as np
+import pandas as pd
+
+GRID_METADATA = 'metadata.json'
+
+
+def _axis(start: float, stop: float, step: float) -> Dict[str, float]:
+    """Describe a regular coordinate axis from ``start`` to ``stop`` inclusive."""
+    return {'start': start, 'step': step, 'count': int(round((stop - start) / step)) + 1}
+
+
+class GriddedDataset:
+    """(time, lat, lon) cubes stored as memory-mapped ``.npy`` files in one directory.
+
+    ``metadata.json`` describes the regular time, latitude and longitude axes,
+    the variables with their dtype and units, and free-form attributes. Each
+    variable is opened with ``numpy.lib.format.open_memmap``, so slices are read
+    from disk on access and a cube never has to fit in RAM.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        with open(self.directory / GRID_METADATA, 'r') as f:
+            self.metadata = json.load(f)
+
+    @classmethod
+    def create(cls, directory, start_date, end_date, lat, lon, freq: str = 'D',
+               attrs: Dict = None) -> 'GriddedDataset':
+        """Create an empty dataset.
+
+        Args:
+            directory: Directory of the dataset, created if needed
+            start_date, end_date: Inclusive time range
+            lat, lon: (start, stop, step) of the regular grid axes in degrees
+            freq: pandas frequency of the time axis
+            attrs: Extra metadata stored with the dataset
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        times = pd.date_range(start=start_date, end=end_date, freq=freq)
+        metadata = {
+            'time': {'start': times[0].isoformat(), 'freq': freq, 'count': len(times)},
+            'lat': _axis(*lat),
+            'lon': _axis(*lon),
+            'variables': {},
+            'attrs': attrs or {}
+        }
+        with open(directory / GRID_METADATA, 'w') as f:
+            json.dump(metadata, f, indent=4)
+        return cls(directory)
+
+    def _save_metadata(self):
+        with open(self.directory / GRID_METADATA, 'w') as f:
+            json.dump(self.metadata, f, indent=4)
+
+    @property
+    def shape(self) -> tuple:
+        return tuple(self.metadata[axis]['count'] for axis in ('time', 'lat', 'lon'))
+
+    @property
+    def times(self) -> pd.DatetimeIndex:
+        time = self.metadata['time']
+        return pd.date_range(start=time['start'], periods=time['count'], freq=time['freq'])
+
+    @property
+    def lats(self) -> np.ndarray:
+        lat = self.metadata['lat']
+        return lat['start'] + lat['step'] * np.arange(lat['count'])
+
+    @property
+    def lons(self) -> np.ndarray:
+        lon = self.metadata['lon']
+        return lon['start'] + lon['step'] * np.arange(lon['count'])
+
+    @property
+    def variables(self) -> Dict[str, Dict]:
+        return self.metadata['variables']
+
+    def create_variable(self, name: str, dtype: str = 'float32', units: str = None) -> np.memmap:
+        """Allocate the on-disk cube of a variable and return it opened for writing."""
+        cube = np.lib.format.open_memmap(
+            self.directory / f'{name}.npy', mode='w+', dtype=dtype, shape=self.shape
+        )
+        self.metadata['variables'][name] = {'dtype': str(np.dtype(dtype)), 'units': units}
+        self._save_metadata()
+        return cube
+
+    def variable(self, name: str, mode: str = 'r') -> np.memmap:
+        """Open the cube of a variable as a memory map (``'r'`` or ``'r+'``)."""
+        if name not in self.variables:
+            raise KeyError(f"Unknown gridded variable: {name}")
+        return np.lib.format.open_memmap(self.directory / f'{name}.npy', mode=mode)
+
+    def set_attrs(self, **attrs):
+        """Store extra metadata with the dataset."""
+        self.metadata['attrs'].update(attrs)
+        self._save_metadata()
+
+    def time_slices(self, chunk: int) -> Iterator[slice]:
+        """Slices of at most ``chunk`` time steps covering the time axis."""
+        count = self.shape[0]
+        for start in range(0, count, chunk):
+            yield slice(start, min(start + chunk, count))
+
+    def __repr__(self):
+        return f'GriddedDataset({str(self.directory)!r}, shape={self.shape}, variables={list(self.variables)})'
@@ -0,0 +1,101 @@
+import sqlite3
+from typing import Dict
+
+import numpy as np
+
+MOMENTS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS etl_moments (
+        job TEXT,
+        name TEXT,
+        count INTEGER,
+        mean REAL,
+        m2 REAL,
+        PRIMARY KEY (job, name)
+    )
+'''
+
+
+class RunningMoments:
+    """Count, mean and sum of squared deviations (M2) of a stream of values.
+
+    Chunks are summarized with vectorized NumPy operations and combined with
+    Chan et al.'s parallel merge, a chunk-wise form of Welford's algorithm, so
+    statistics accumulated over chunks or workers equal the full-batch ones.
+    """
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = int(count)
+        self.mean = float(mean)
+        self.m2 = float(m2)
+
+    @classmethod
+    def from_values(cls, values) -> 'RunningMoments':
+        """Summarize one chunk of values, ignoring NaN."""
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return cls()
+        mean = values.mean()
+        return cls(values.size, mean, np.square(values - mean).sum())
+
+    def merge(self, other: 'RunningMoments') -> 'RunningMoments':
+        """Return the moments of the union of both streams."""
+        count = self.count + other.count
+        if count == 0:
+            return RunningMoments()
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.count / count
+        m2 = self.m2 + other.m2 + delta * delta * self.count * other.count / count
+        return RunningMoments(count, mean, m2)
+
+    def update(self, values) -> 'RunningMoments':
+        """Return the moments after adding a chunk of values."""
+        return self.merge(RunningMoments.from_values(values))
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (ddof=1), matching ``pandas.Series.var``."""
+        return self.m2 / (self.count - 1) if self.count > 1 else float('nan')
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1), matching ``pandas.Series.std``."""
+        return float(np.sqrt(self.variance))
+
+    def zscore(self, values) -> np.ndarray:
+        """Standardize ``values`` with the accumulated mean and standard deviation."""
+        return (np.asarray(values, dtype='float64') - self.mean) / self.std
+
+    def __repr__(self):
+        return f'RunningMoments(count={self.count}, mean={self.mean:.6g}, std={self.std:.6g})'
+
+
+def load_moments(conn: sqlite3.Connection, job: str) -> Dict[str, RunningMoments]:
+    """Read the persisted moments of ``job``, keyed by variable name."""
+    conn.execute(MOMENTS_TABLE_SQL)
+    rows = conn.execute(
+        'SELECT name, count, mean, m2 FROM etl_moments WHERE job = ?', (job,)
+    ).fetchall()
+    return {name: RunningMoments(count, mean, m2) for name, count, mean, m2 in rows}
+
+
+def save_moments(conn: sqlite3.Connection, job: str, moments: Dict[str, RunningMoments]):
+    """Persist ``moments`` for ``job``; the caller owns the transaction."""
+    conn.execute(MOMENTS_TABLE_SQL)
+    conn.executemany(
+        'INSERT OR REPLACE INTO etl_moments (job, name, count, mean, m2) VALUES (?, ?, ?, ?, ?)',
+        [(job, name, m.count, m.mean, m.m2) for name, m in moments.items()]
+    )
+
+
+def load_merged_moments(conn: sqlite3.Connection, job: str) -> Dict[str, RunningMoments]:
+    """Merge the persisted moments of ``job`` and its sub-jobs named ``<job>:<part>``."""
+    conn.execute(MOMENTS_TABLE_SQL)
+    rows = conn.execute(
+        'SELECT name, count, mean, m2 FROM etl_moments WHERE job = ? OR job LIKE ?',
+        (job, f'{job}:%')
+    ).fetchall()
+    merged: Dict[str, RunningMoments] = {}
+    for name, count, mean, m2 in rows:
+        merged[name] = merged.get(name, RunningMoments()).merge(RunningMoments(count, mean, m2))
+    return merged
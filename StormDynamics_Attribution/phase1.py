@@ -1,14 +1,26 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
 import seaborn as sns
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 import sqlite3
+import hashlib
 import json
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterator, Tuple
 import logging
 
+from online_stats import RunningMoments, load_merged_moments
+
+# Runs are recorded in the lineage store of the ETL jobs in src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.lineage import LineageStore
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -31,20 +43,147 @@ def load_config(config_path: str = 'config.json') -> dict:
             "database_path": "data/storm_data.db"
         }
 
-def load_data_from_db(db_path: str) -> pd.DataFrame:
-    """Load processed data from SQLite database."""
+# Predictors of the attribution model
+ATTRIBUTION_FEATURES = ['temperature', 'humidity']
+
+# Columns of storm_events and the NumPy dtype each one is read into
+STORM_EVENT_DTYPES = {
+    'date': 'datetime64[ns]',
+    'cape': 'float64',
+    'shear': 'float64',
+    'temperature': 'float64',
+    'humidity': 'float64',
+    'scs_index': 'float64',
+    'storm_event': 'int64',
+    'season': 'object'
+}
+
+
+def _storm_events_filter(start_date=None, end_date=None, seasons=None) -> Tuple[str, list]:
+    """Build the WHERE clause and parameters for a date range and season filter.
+
+    Dates are stored as ISO text, so range bounds are compared as text and the
+    ``idx_date`` index serves the range scan. ``end_date`` is inclusive.
+    """
+    clauses, params = [], []
+    if start_date is not None:
+        clauses.append('date >= ?')
+        params.append(pd.Timestamp(start_date).strftime('%Y-%m-%d %H:%M:%S'))
+    if end_date is not None:
+        clauses.append('date < ?')
+        params.append((pd.Timestamp(end_date) + pd.Timedelta(days=1)).strftime('%Y-%m-%d'))
+    if seasons:
+        clauses.append(f"season IN ({', '.join('?' for _ in seasons)})")
+        params.extend(seasons)
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+def read_storm_events(db_path: str, start_date=None, end_date=None, seasons=None,
+                      columns=None, chunksize: int = 100_000) -> Dict[str, np.ndarray]:
+    """Read selected columns of storm_events into typed NumPy arrays.
+
+    The date range, season filter and column list are pushed into the SQL query,
+    and rows are fetched ``chunksize`` at a time into preallocated arrays, so only
+    the matching rows and columns are ever materialized.
+
+    Args:
+        db_path: SQLite database path
+        start_date, end_date: Inclusive date range, open-ended when None
+        seasons: Seasons to keep (e.g. ['Summer']), all when None
+        columns: Columns to read, all of ``STORM_EVENT_DTYPES`` when None
+        chunksize: Rows fetched per round trip
+
+    Returns:
+        Dictionary of column name to NumPy array, ordered by date
+    """
+    columns = list(columns or STORM_EVENT_DTYPES)
+    unknown = set(columns) - set(STORM_EVENT_DTYPES)
+    if unknown:
+        raise ValueError(f"Unknown storm_events columns: {sorted(unknown)}")
+    where, params = _storm_events_filter(start_date, end_date, seasons)
+
+    conn = sqlite3.connect(db_path)
     try:
-        conn = sqlite3.connect(db_path)
-        query = """
-        SELECT date, cape, shear, temperature, humidity, scs_index, storm_event, season
-        FROM storm_events
-        ORDER BY date
-        """
-        df = pd.read_sql_query(query, conn)
+        total = conn.execute(f'SELECT COUNT(*) FROM storm_events{where}', params).fetchone()[0]
+        arrays = {c: np.empty(total, dtype=STORM_EVENT_DTYPES[c]) for c in columns}
+        cursor = conn.execute(
+            f"SELECT {', '.join(columns)} FROM storm_events{where} ORDER BY date", params
+        )
+        offset = 0
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            end = offset + len(rows)
+            for column, values in zip(columns, zip(*rows)):
+                arrays[column][offset:end] = np.array(values, dtype=STORM_EVENT_DTYPES[column])
+            offset = end
+    finally:
         conn.close()
-        
-        # Convert date string to datetime
-        df['date'] = pd.to_datetime(df['date'])
+    return arrays
+
+
+def iter_storm_event_chunks(db_path: str, columns, after_rowid: int = 0,
+                            chunksize: int = 100_000, start_date=None, end_date=None,
+                            seasons=None) -> Iterator[Dict[str, np.ndarray]]:
+    """Stream storm_events rows added after ``after_rowid`` in rowid order.
+
+    Yields dictionaries of typed NumPy arrays with the requested columns plus
+    ``rowid``, ``chunksize`` rows at a time, walking the rowid primary key. Only
+    rows in the date range and seasons of ``_storm_events_filter`` are read.
+    """
+    columns = list(columns)
+    unknown = set(columns) - set(STORM_EVENT_DTYPES)
+    if unknown:
+        raise ValueError(f"Unknown storm_events columns: {sorted(unknown)}")
+    where, params = _storm_events_filter(start_date, end_date, seasons)
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.execute(
+            f"SELECT rowid, {', '.join(columns)} FROM storm_events{where or ' WHERE 1'} "
+            "AND rowid > ? ORDER BY rowid",
+            params + [after_rowid]
+        )
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            values = list(zip(*rows))
+            chunk = {'rowid': np.array(values[0], dtype='int64')}
+            for column, column_values in zip(columns, values[1:]):
+                chunk[column] = np.array(column_values, dtype=STORM_EVENT_DTYPES[column])
+            yield chunk
+    finally:
+        conn.close()
+
+
+def load_etl_moments(db_path: str) -> Dict[str, RunningMoments]:
+    """Return the cape/shear moments persisted by the ETL, merged over its regions,
+    empty if there are none."""
+    conn = sqlite3.connect(db_path)
+    try:
+        return load_merged_moments(conn, 'storm_events')
+    finally:
+        conn.close()
+
+
+def read_attribution_rows(db_path: str, start_date=None, end_date=None, seasons=None,
+                          chunksize: int = 100_000) -> pd.DataFrame:
+    """Attribution features and storm_event of the filtered storm_events rows, in
+    the rowid order ``perform_incremental_attribution`` trains in."""
+    columns = ATTRIBUTION_FEATURES + ['storm_event']
+    chunks = [pd.DataFrame(chunk) for chunk in iter_storm_event_chunks(
+        db_path, columns, chunksize=chunksize, start_date=start_date, end_date=end_date, seasons=seasons
+    )]
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=['rowid'] + columns)
+
+
+def load_data_from_db(db_path: str, start_date=None, end_date=None, seasons=None,
+                      columns=None) -> pd.DataFrame:
+    """Load processed data from SQLite database, optionally filtered by date range,
+    season and columns."""
+    try:
+        df = pd.DataFrame(read_storm_events(db_path, start_date, end_date, seasons, columns))
         
         logger.info(f"Loaded {len(df)} records from database")
         return df
@@ -52,20 +191,24 @@ def load_data_from_db(db_path: str) -> pd.DataFrame:
         logger.error(f"Error loading data from database: {str(e)}")
         raise
 
-def compute_scs_index(df: pd.DataFrame) -> pd.DataFrame:
-    """Compute SCS Index using the processed data."""
+def compute_scs_index(df: pd.DataFrame, moments: Dict[str, RunningMoments] = None) -> pd.DataFrame:
+    """Compute SCS Index using the processed data.
+
+    ``moments`` are the cape and shear statistics the ETL standardized with (see
+    ``load_etl_moments``); without them the statistics of ``df`` are used.
+    """
     try:
         # Create a copy to avoid modifying the original
         result_df = df.copy()
         
         # The SCS Index is already computed in the ETL process
-        # We'll just verify the calculation
-        scaler = StandardScaler()
-        cape_norm = scaler.fit_transform(result_df[['cape']])
-        shear_norm = scaler.fit_transform(result_df[['shear']])
+        # We'll just verify the calculation with one vectorized pass per variable
+        moments = {name: m for name, m in (moments or {}).items() if m.count > 1}
+        cape = moments.get('cape', RunningMoments.from_values(result_df['cape']))
+        shear = moments.get('shear', RunningMoments.from_values(result_df['shear']))
         
         # Verify the SCS Index calculation
-        expected_index = 0.6 * cape_norm + 0.4 * shear_norm
+        expected_index = 0.6 * cape.zscore(result_df['cape']) + 0.4 * shear.zscore(result_df['shear'])
         result_df['verified_scs_index'] = expected_index
         
         # Check if our verification matches the stored index
@@ -78,20 +221,52 @@ def compute_scs_index(df: pd.DataFrame) -> pd.DataFrame:
         logger.error(f"Error computing SCS Index: {str(e)}")
         raise
 
+def _partial_fit_chunk(model: SGDClassifier, moments: Dict[str, RunningMoments],
+                       chunk: Dict[str, np.ndarray]) -> Dict[str, RunningMoments]:
+    """Add one chunk of attribution rows to the running ``moments`` and train
+    ``model`` on it, standardized with them; returns the updated moments."""
+    moments = {name: moments[name].update(chunk[name]) for name in ATTRIBUTION_FEATURES}
+    X = np.column_stack([moments[name].zscore(chunk[name]) for name in ATTRIBUTION_FEATURES])
+    model.partial_fit(X, chunk['storm_event'], classes=np.array([0, 1]))
+    return moments
+
+
+def _incremental_coefficients(model: SGDClassifier, moments: Dict[str, RunningMoments]) -> np.ndarray:
+    """Coefficients of a model fitted on standardized features, rescaled to original units."""
+    return model.coef_[0] / np.array([moments[name].std for name in ATTRIBUTION_FEATURES])
+
+
+def _fit_attribution(X: np.ndarray, y: np.ndarray, mode: str = 'batch',
+                     chunksize: int = 100_000) -> np.ndarray:
+    """Fit the attribution model of ``mode`` and return its coefficients.
+
+    'batch' is the logistic regression of ``perform_attribution_analysis``;
+    'incremental' is the averaged SGD logistic regression of
+    ``perform_incremental_attribution``, trained the same way: ``chunksize``
+    rows at a time in the given order, standardized with running moments.
+    The columns of ``X`` are ``ATTRIBUTION_FEATURES``.
+    """
+    if mode == 'incremental':
+        state = _new_attribution_state()
+        moments = state['moments']
+        for start in range(0, len(y), chunksize):
+            chunk = {name: X[start:start + chunksize, i] for i, name in enumerate(ATTRIBUTION_FEATURES)}
+            chunk['storm_event'] = y[start:start + chunksize]
+            moments = _partial_fit_chunk(state['model'], moments, chunk)
+        return _incremental_coefficients(state['model'], moments)
+    model = LogisticRegression(random_state=42)
+    model.fit(X, y)
+    return model.coef_[0]
+
 def perform_attribution_analysis(df: pd.DataFrame) -> tuple:
     """Perform attribution analysis using the processed data."""
     try:
         # Prepare features for attribution
-        X = df[['temperature', 'humidity']]
-        y = df['storm_event']
-        
-        # Fit logistic regression
-        model = LogisticRegression(random_state=42)
-        model.fit(X, y)
+        X = df[ATTRIBUTION_FEATURES].to_numpy()
+        y = df['storm_event'].to_numpy()
         
-        # Get coefficients
-        temp_coef = model.coef_[0][0]
-        humidity_coef = model.coef_[0][1]
+        # Fit logistic regression and get coefficients
+        temp_coef, humidity_coef = _fit_attribution(X, y)
         
         logger.info(f"Attribution analysis completed. Temperature coefficient: {temp_coef:.3f}, Humidity coefficient: {humidity_coef:.3f}")
         return temp_coef, humidity_coef
@@ -99,26 +274,289 @@ def perform_attribution_analysis(df: pd.DataFrame) -> tuple:
         logger.error(f"Error performing attribution analysis: {str(e)}")
         raise
 
-def plot_results(df: pd.DataFrame, temp_coef: float, humidity_coef: float):
-    """Create visualization of the analysis results."""
+# Training data, attribution mode and chunk size of a bootstrap worker process,
+# set once by its initializer
+_bootstrap_data: Tuple[np.ndarray, np.ndarray, str, int] = None
+
+
+def _init_bootstrap_worker(X: np.ndarray, y: np.ndarray, mode: str, chunksize: int):
+    """Keep the training data in the worker, so it is sent once per process."""
+    global _bootstrap_data
+    _bootstrap_data = (X, y, mode, chunksize)
+
+
+def _bootstrap_replicates(seeds) -> np.ndarray:
+    """Refit the model on one resample per seed and return the coefficient rows.
+
+    Resampled rows keep the order of the data, which the incremental model is
+    trained in. Resamples containing a single class cannot be fitted and give
+    NaN rows.
+    """
+    X, y, mode, chunksize = _bootstrap_data
+    coefs = np.full((len(seeds), X.shape[1]), np.nan)
+    for i, seed in enumerate(seeds):
+        sample = np.sort(np.random.default_rng(seed).integers(0, len(y), size=len(y)))
+        if np.unique(y[sample]).size > 1:
+            coefs[i] = _fit_attribution(X[sample], y[sample], mode, chunksize)
+    return coefs
+
+
+def bootstrap_attribution(df: pd.DataFrame, n_replicates: int = 1000, confidence: float = 0.95,
+                          seed: int = 42, workers: int = None, mode: str = 'batch',
+                          chunksize: int = 100_000) -> Dict[str, Tuple[float, float]]:
+    """Percentile bootstrap confidence intervals of the attribution coefficients.
+
+    Every replicate refits the estimator of the attribution ``mode`` ('batch' or
+    'incremental', see ``_fit_attribution``), so the intervals describe the
+    coefficients that mode reports. For 'incremental', pass the rows in the
+    order the model is trained in (``read_attribution_rows``) and its
+    ``chunksize``; the intervals are those of a model trained in one update.
+
+    Every replicate draws its resample from its own child of one
+    ``numpy.random.SeedSequence``, so the intervals only depend on ``seed`` and
+    not on the number of workers. Replicates are split into one batch per
+    worker process and the data is shipped to each process once.
+
+    Args:
+        df: Data with the attribution features and storm_event
+        n_replicates: Number of bootstrap resamples
+        confidence: Coverage of the intervals (e.g. 0.95)
+        seed: Root seed of the replicate seed sequence
+        workers: Worker processes, all cores when None
+        mode: Attribution mode whose estimator is resampled
+        chunksize: Rows per ``partial_fit`` call of the incremental estimator
+
+    Returns:
+        Dictionary of feature name to (lower, upper) interval bounds
+    """
     try:
-        plt.figure(figsize=(12, 6))
+        X = df[ATTRIBUTION_FEATURES].to_numpy(dtype='float64')
+        y = df['storm_event'].to_numpy()
+        seeds = np.random.SeedSequence(seed).spawn(n_replicates)
+        workers = min(workers or os.cpu_count() or 1, n_replicates)
+        batches = [seeds[i::workers] for i in range(workers)]
         
-        # Plot SCS Index vs Storm Events
-        sns.scatterplot(data=df, x='scs_index', y='storm_event', 
-                       hue='storm_event', palette=['blue', 'red'], alpha=0.6)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_bootstrap_worker,
+                                 initargs=(X, y, mode, chunksize)) as pool:
+            coefs = np.vstack(list(pool.map(_bootstrap_replicates, batches)))
         
-        plt.title('SCS Index vs Storm Events\n' +
+        failed = int(np.isnan(coefs[:, 0]).sum())
+        if failed:
+            logger.warning(f"{failed} of {n_replicates} bootstrap resamples had a single class and were skipped")
+        
+        tail = (1 - confidence) / 2 * 100
+        lower, upper = np.nanpercentile(coefs, [tail, 100 - tail], axis=0)
+        intervals = {name: (float(lower[i]), float(upper[i])) for i, name in enumerate(ATTRIBUTION_FEATURES)}
+        
+        logger.info(f"Bootstrap ({mode} model, {n_replicates} replicates, {workers} workers) "
+                    f"{confidence:.0%} intervals: " +
+                    ", ".join(f"{name} [{lo:.3f}, {hi:.3f}]" for name, (lo, hi) in intervals.items()))
+        return intervals
+    except Exception as e:
+        logger.error(f"Error bootstrapping attribution analysis: {str(e)}")
+        raise
+
+def _new_attribution_state() -> dict:
+    """Untrained incremental attribution model state."""
+    return {
+        'model': SGDClassifier(loss='log_loss', average=True, random_state=42),
+        'moments': {name: RunningMoments() for name in ATTRIBUTION_FEATURES},
+        'last_rowid': 0,
+        'checksum': None,
+        'filter': None
+    }
+
+
+def _load_attribution_state(state_path: str) -> dict:
+    """Load the incremental attribution model state, or start a new one."""
+    path = Path(state_path)
+    if path.exists():
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    return _new_attribution_state()
+
+
+def trained_rows_checksum(db_path: str, last_rowid: int, start_date=None, end_date=None,
+                          seasons=None) -> tuple:
+    """Aggregates of the storm_events rows up to ``last_rowid`` in the date range and
+    seasons of ``_storm_events_filter``, the rows a model was trained on.
+
+    They cover the date and the features of every row, so they change when any
+    of those rows is rewritten with new values (e.g. by an upsert) or deleted
+    (e.g. by compaction). storm_event is left out: the ETL rescore reclassifies
+    rows as its moments drift, and a refit on every rescore would undo the
+    incremental updates.
+    """
+    where, params = _storm_events_filter(start_date, end_date, seasons)
+    weight = '(rowid % 1000003)'
+    conn = sqlite3.connect(db_path)
+    try:
+        return tuple(conn.execute(
+            f'SELECT COUNT(*), TOTAL(julianday(date) * {weight}), TOTAL(temperature * {weight}), '
+            f"TOTAL(humidity * {weight}) FROM storm_events{where or ' WHERE 1'} AND rowid <= ?",
+            params + [last_rowid]
+        ).fetchone())
+    finally:
+        conn.close()
+
+
+def perform_incremental_attribution(db_path: str, state_path: str = 'data/attribution_model.pkl',
+                                    chunksize: int = 100_000, start_date=None, end_date=None,
+                                    seasons=None) -> tuple:
+    """Update the attribution model with the rows loaded since its last update.
+
+    Rows in the date range and seasons of ``_storm_events_filter`` are streamed
+    from storm_events in chunks and fed to an averaged SGD logistic regression
+    with ``partial_fit``. Features are standardized with running moments that
+    are updated chunk by chunk. The model, moments, last seen rowid, filter and
+    a checksum of the trained rows are saved to ``state_path``, so the next run
+    only trains on new loads. SGD cannot unlearn rows, so when the filter
+    changed or any trained row was rewritten or deleted since (upserts and
+    compaction, see ``trained_rows_checksum``), the model is refitted on all
+    rows instead.
+
+    Returns:
+        Temperature and humidity coefficients on the original feature scale
+    """
+    try:
+        row_filter = _storm_events_filter(start_date, end_date, seasons)
+        state = _load_attribution_state(state_path)
+        if state['last_rowid'] and state.get('filter') != row_filter:
+            logger.info("Attribution rows are filtered differently, refitting on all rows")
+            state = _new_attribution_state()
+        elif state['last_rowid'] and state.get('checksum') != trained_rows_checksum(
+            db_path, state['last_rowid'], start_date, end_date, seasons
+        ):
+            logger.info("Rows the attribution model was trained on have changed, refitting on all rows")
+            state = _new_attribution_state()
+        model, moments = state['model'], state['moments']
+        new_rows = 0
+        
+        for chunk in iter_storm_event_chunks(db_path, ATTRIBUTION_FEATURES + ['storm_event'],
+                                             after_rowid=state['last_rowid'], chunksize=chunksize,
+                                             start_date=start_date, end_date=end_date, seasons=seasons):
+            moments = _partial_fit_chunk(model, moments, chunk)
+            state['last_rowid'] = int(chunk['rowid'][-1])
+            new_rows += len(chunk['rowid'])
+        
+        if not hasattr(model, 'coef_'):
+            raise ValueError("No storm_events rows available to train the attribution model")
+        
+        state['moments'] = moments
+        state['filter'] = row_filter
+        state['checksum'] = trained_rows_checksum(db_path, state['last_rowid'], start_date, end_date, seasons)
+        Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(state_path, 'wb') as f:
+            pickle.dump(state, f)
+        
+        # Coefficients were fitted on standardized features, rescale to original units
+        temp_coef, humidity_coef = _incremental_coefficients(model, moments)
+        
+        logger.info(f"Incremental attribution updated with {new_rows} new records. "
+                    f"Temperature coefficient: {temp_coef:.3f}, Humidity coefficient: {humidity_coef:.3f}")
+        return temp_coef, humidity_coef
+    except Exception as e:
+        logger.error(f"Error performing incremental attribution analysis: {str(e)}")
+        raise
+
+# Above this many rows plot_results draws binned densities instead of every point
+DENSITY_ROW_THRESHOLD = 100_000
+
+# Column pairs drawn as density panels, (x, y, x label, y label)
+DENSITY_PAIRS = [
+    ('scs_index', 'storm_event', 'SCS Index', 'Storm Event (0/1)'),
+    ('temperature', 'humidity', 'Temperature', 'Humidity'),
+    ('cape', 'shear', 'CAPE', 'Shear')
+]
+
+
+def _bin_edges(values: np.ndarray, bins: int) -> np.ndarray:
+    """Histogram edges for ``values``: one bin per level of a 0/1 column,
+    otherwise ``bins`` equal bins over the finite range."""
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return np.linspace(0, 1, bins + 1)
+    if np.isin(finite, (0, 1)).all():
+        return np.array([-0.5, 0.5, 1.5])
+    low, high = finite.min(), finite.max()
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return np.linspace(low, high, bins + 1)
+
+
+def histogram_2d(x, y, bins: int = 200, chunksize: int = 1_000_000) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Count (x, y) pairs on a fixed grid, ``chunksize`` rows at a time.
+
+    Edges are fixed before counting, so chunk counts add up exactly and the
+    temporaries stay bounded by ``chunksize``. Rows with NaN are ignored.
+
+    Returns:
+        Counts of shape (x bins, y bins), x edges and y edges
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    x_edges, y_edges = _bin_edges(x, bins), _bin_edges(y, bins)
+    counts = np.zeros((len(x_edges) - 1, len(y_edges) - 1))
+    for start in range(0, len(x), chunksize):
+        x_chunk, y_chunk = x[start:start + chunksize], y[start:start + chunksize]
+        finite = np.isfinite(x_chunk) & np.isfinite(y_chunk)
+        counts += np.histogram2d(x_chunk[finite], y_chunk[finite], bins=[x_edges, y_edges])[0]
+    return counts, x_edges, y_edges
+
+
+def _plot_density(df: pd.DataFrame, bins: int):
+    """Draw one log-scaled 2D histogram panel per available column pair."""
+    pairs = [pair for pair in DENSITY_PAIRS if pair[0] in df and pair[1] in df]
+    fig, axes = plt.subplots(1, len(pairs), figsize=(6 * len(pairs), 6), squeeze=False)
+    for ax, (x, y, x_label, y_label) in zip(axes[0], pairs):
+        counts, x_edges, y_edges = histogram_2d(df[x].to_numpy(), df[y].to_numpy(), bins=bins)
+        # Without any counts, fix the color range so LogNorm has valid limits
+        mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts, 0).T,
+                             norm=LogNorm(vmin=1, vmax=10) if not counts.any() else LogNorm(),
+                             cmap='viridis')
+        fig.colorbar(mesh, ax=ax, label='Records')
+        ax.set_xlabel(x_label)
+        ax.set_ylabel(y_label)
+    return fig, axes[0]
+
+
+def plot_results(df: pd.DataFrame, temp_coef: float, humidity_coef: float, mode: str = 'auto',
+                 threshold: int = DENSITY_ROW_THRESHOLD, bins: int = 200):
+    """Create visualization of the analysis results.
+
+    ``mode`` is 'scatter' (one marker per row), 'density' (binned 2D histograms,
+    whose render time depends on the number of bins rather than rows) or 'auto',
+    which switches to density above ``threshold`` rows.
+    """
+    try:
+        title = ('SCS Index vs Storm Events\n' +
                  f'Temperature Coefficient: {temp_coef:.3f}, Humidity Coefficient: {humidity_coef:.3f}')
-        plt.xlabel('SCS Index')
-        plt.ylabel('Storm Event (0/1)')
+        if mode == 'auto':
+            mode = 'density' if len(df) > threshold else 'scatter'
         
-        # Add legend
-        plt.legend(title='Storm Event', labels=['No Storm', 'Storm'])
+        if mode == 'density':
+            fig, axes = _plot_density(df, bins)
+            fig.suptitle(title)
+        elif mode == 'scatter':
+            plt.figure(figsize=(12, 6))
+            
+            # Plot SCS Index vs Storm Events
+            sns.scatterplot(data=df, x='scs_index', y='storm_event', 
+                           hue='storm_event', palette=['blue', 'red'], alpha=0.6)
+            
+            plt.title(title)
+            plt.xlabel('SCS Index')
+            plt.ylabel('Storm Event (0/1)')
+            
+            # Add legend
+            plt.legend(title='Storm Event', labels=['No Storm', 'Storm'])
+        else:
+            raise ValueError(f"Unknown plot mode: {mode}")
         
         # Save plot
         plt.savefig('scs_index_plot.png', dpi=300, bbox_inches='tight')
-        logger.info("Plot saved as scs_index_plot.png")
+        plt.close('all')
+        logger.info(f"Plot saved as scs_index_plot.png ({mode})")
         
         # Save data
         df.to_csv('scs_index_data.csv', index=False)
@@ -127,25 +565,204 @@ def plot_results(df: pd.DataFrame, temp_coef: float, humidity_coef: float):
         logger.error(f"Error creating visualization: {str(e)}")
         raise
 
+# Bump when the cached analysis results change shape or meaning
+ANALYSIS_CACHE_VERSION = 2
+
+# Settings of the analysis section that change the cached results; plotting and
+# cache settings, and the number of bootstrap workers, do not
+ANALYSIS_RESULT_PARAMS = ['start_date', 'end_date', 'seasons', 'attribution_mode', 'model_path',
+                          'bootstrap_replicates', 'confidence']
+
+# Files written by plot_results, and the analysis settings that change them on top of the results
+PLOT_OUTPUTS = ['scs_index_plot.png', 'scs_index_data.csv']
+PLOT_PARAMS = ['plot_mode', 'density_threshold']
+
+# Record of the results key the plot outputs were last written for, in the cache directory
+OUTPUTS_RECORD = 'outputs.json'
+
+
+def table_fingerprint(db_path: str) -> dict:
+    """Cheap fingerprint of the storm_events contents.
+
+    Combines the row count and max rowid with the ETL checkpoints and the
+    totals of the incrementally maintained monthly statistics, which change with
+    every load batch and rescore. Databases without the statistics table fall
+    back to a checksum over the whole table.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        fingerprint = {
+            'rows': conn.execute('SELECT COUNT(*), MAX(rowid) FROM storm_events').fetchone()
+        }
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if 'etl_checkpoint' in tables:
+            fingerprint['checkpoints'] = conn.execute(
+                'SELECT job, last_date, updated_at FROM etl_checkpoint ORDER BY job'
+            ).fetchall()
+        if 'storm_stats_monthly' in tables:
+            fingerprint['stats'] = conn.execute(
+                'SELECT SUM(records), TOTAL(storm_events), TOTAL(scs_index_sum), TOTAL(cape_sum), '
+                'TOTAL(shear_sum) FROM storm_stats_monthly'
+            ).fetchone()
+        else:
+            fingerprint['stats'] = conn.execute(
+                'SELECT TOTAL(storm_event), TOTAL(scs_index), TOTAL(cape), TOTAL(shear) FROM storm_events'
+            ).fetchone()
+        return fingerprint
+    finally:
+        conn.close()
+
+
+def analysis_cache_key(fingerprint: dict, analysis_config: dict) -> str:
+    """Hash of the table fingerprint and the ``ANALYSIS_RESULT_PARAMS`` of the analysis settings."""
+    params = {name: analysis_config.get(name) for name in ANALYSIS_RESULT_PARAMS}
+    payload = json.dumps([ANALYSIS_CACHE_VERSION, fingerprint, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def plot_outputs_key(cache_key: str, analysis_config: dict) -> str:
+    """Hash of the results key and the ``PLOT_PARAMS`` the plot outputs are drawn with."""
+    params = {name: analysis_config.get(name) for name in PLOT_PARAMS}
+    return hashlib.sha256(json.dumps([cache_key, params], sort_keys=True).encode()).hexdigest()
+
+
+def recorded_plot_outputs(cache_dir: str, key: str) -> dict:
+    """The outputs record if the plot outputs on disk were written for ``key``, else None."""
+    path = Path(cache_dir) / OUTPUTS_RECORD
+    if not path.exists() or not all(os.path.exists(output) for output in PLOT_OUTPUTS):
+        return None
+    with open(path) as f:
+        record = json.load(f)
+    return record if record.get('key') == key else None
+
+
+def record_plot_outputs(cache_dir: str, key: str, rows: int):
+    """Record that the plot outputs were written for ``key`` from ``rows`` rows."""
+    directory = Path(cache_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / OUTPUTS_RECORD, 'w') as f:
+        json.dump({'key': key, 'rows': rows}, f)
+
+
+def load_cached_analysis(cache_dir: str, key: str) -> dict:
+    """Return the cached results for ``key`` and mark them recently used, or None."""
+    path = Path(cache_dir) / f'{key}.pkl'
+    if not path.exists():
+        return None
+    with open(path, 'rb') as f:
+        result = pickle.load(f)
+    os.utime(path)
+    return result
+
+
+def save_cached_analysis(cache_dir: str, key: str, result: dict, max_entries: int = 8):
+    """Store results under ``key``, evicting the least recently used entries."""
+    directory = Path(cache_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp_path = directory / f'{key}.pkl.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(result, f)
+    os.replace(tmp_path, directory / f'{key}.pkl')
+    entries = sorted(directory.glob('*.pkl'), key=lambda path: path.stat().st_mtime, reverse=True)
+    for stale in entries[max_entries:]:
+        stale.unlink()
+
+
 def main():
-    """Main function to run the analysis."""
+    """Main function to run the analysis, recorded in the lineage store."""
     try:
         logger.info("Starting analysis...")
         
         # Load configuration
         config = load_config()
+        analysis_config = config.get('analysis', {})
+        lineage = LineageStore(config.get('lineage', {}).get('location'))
         
-        # Load data from database
-        df = load_data_from_db(config['database_path'])
-        
-        # Compute SCS Index
-        df = compute_scs_index(df)
-        
-        # Perform attribution analysis
-        temp_coef, humidity_coef = perform_attribution_analysis(df)
-        
-        # Create visualization
-        plot_results(df, temp_coef, humidity_coef)
+        with lineage.start_run('storm_analysis') as run:
+            # The database can be large: fingerprint it by size and time only
+            run.record_input(config['database_path'], checksum=False)
+            
+            # Reuse the results of an earlier run on the same data and parameters, and
+            # the plot outputs when they were drawn from them with the same settings
+            cache_dir = analysis_config.get('cache_dir')
+            cached, outputs = None, None
+            if cache_dir:
+                cache_key = analysis_cache_key(table_fingerprint(config['database_path']), analysis_config)
+                outputs_key = plot_outputs_key(cache_key, analysis_config)
+                cached = load_cached_analysis(cache_dir, cache_key)
+                if cached is not None:
+                    outputs = recorded_plot_outputs(cache_dir, outputs_key)
+            
+            if outputs is None:
+                # Load data from database, restricted to the configured analysis window
+                with run.stage('load') as stage:
+                    df = load_data_from_db(config['database_path'],
+                                           start_date=analysis_config.get('start_date'),
+                                           end_date=analysis_config.get('end_date'),
+                                           seasons=analysis_config.get('seasons'))
+                    
+                    # Compute SCS Index
+                    df = compute_scs_index(df, load_etl_moments(config['database_path']))
+                    stage.rows = len(df)
+            
+            if cached is not None:
+                logger.info(f"Storm data unchanged, reusing cached analysis {cache_key[:12]}")
+                temp_coef, humidity_coef = cached['temp_coef'], cached['humidity_coef']
+                if cached['intervals']:
+                    logger.info(f"Cached bootstrap intervals: {cached['intervals']}")
+            else:
+                # Perform attribution analysis
+                attribution_mode = analysis_config.get('attribution_mode', 'batch')
+                with run.stage('attribution') as stage:
+                    if attribution_mode == 'incremental':
+                        model_path = analysis_config.get('model_path', 'data/attribution_model.pkl')
+                        temp_coef, humidity_coef = perform_incremental_attribution(
+                            config['database_path'], state_path=model_path,
+                            start_date=analysis_config.get('start_date'),
+                            end_date=analysis_config.get('end_date'),
+                            seasons=analysis_config.get('seasons')
+                        )
+                        run.record_output(model_path)
+                    else:
+                        temp_coef, humidity_coef = perform_attribution_analysis(df)
+                        stage.rows = len(df)
+                
+                # Confidence intervals of the coefficients, when bootstrap replicates are configured
+                n_replicates = analysis_config.get('bootstrap_replicates', 0)
+                intervals = None
+                if n_replicates:
+                    with run.stage('bootstrap'):
+                        # The incremental model is trained in rowid order, resample it in that order
+                        rows = df if attribution_mode != 'incremental' else read_attribution_rows(
+                            config['database_path'],
+                            start_date=analysis_config.get('start_date'),
+                            end_date=analysis_config.get('end_date'),
+                            seasons=analysis_config.get('seasons')
+                        )
+                        intervals = bootstrap_attribution(rows, n_replicates=n_replicates,
+                                                          confidence=analysis_config.get('confidence', 0.95),
+                                                          workers=analysis_config.get('bootstrap_workers'),
+                                                          mode=attribution_mode)
+                
+                if cache_dir:
+                    save_cached_analysis(cache_dir, cache_key, {
+                        'temp_coef': temp_coef, 'humidity_coef': humidity_coef, 'intervals': intervals
+                    }, max_entries=analysis_config.get('cache_entries', 8))
+            
+            if outputs is not None:
+                logger.info(f"{' and '.join(PLOT_OUTPUTS)} are up to date, not redrawing them")
+            else:
+                # Create visualization
+                with run.stage('plot') as stage:
+                    plot_results(df, temp_coef, humidity_coef,
+                                 mode=analysis_config.get('plot_mode', 'auto'),
+                                 threshold=analysis_config.get('density_threshold', DENSITY_ROW_THRESHOLD))
+                    stage.rows = len(df)
+                outputs = {'rows': len(df)}
+                if cache_dir:
+                    record_plot_outputs(cache_dir, outputs_key, len(df))
+            run.record_output('scs_index_plot.png')
+            run.record_output('scs_index_data.csv', outputs['rows'])
         
         logger.info("Analysis completed successfully")
         
@@ -6,8 +6,24 @@ from datetime import datetime, timedelta
 import logging
 from pathlib import Path
 import json
+import re
+import queue
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from typing import Dict, List, Tuple
 import os
+import sys
+
+from features import FeatureEngine
+from gridded import GriddedDataset
+from online_stats import (MOMENTS_TABLE_SQL, RunningMoments, load_merged_moments, load_moments,
+                          save_moments)
+from snapshots import CATALOG_FILE, prune_catalog, read_catalog, read_snapshot, record_snapshot, write_snapshot
+from synthetic import SYNTHETIC_VARIABLES, SyntheticStormGenerator
+
+# Runs are recorded in the lineage store of the ETL jobs in src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.lineage import LineageStore
 
 # Set up logging
 logging.basicConfig(
@@ -20,13 +36,204 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Natural key of storm_events rows, enforced by a unique index in upsert mode
+KEY_COLUMNS = ['date', 'region']
+UNIQUE_KEY_INDEX = 'ux_storm_events_date_region'
+
+# Region of rows loaded without a configured region list
+DEFAULT_REGION = 'default'
+
+# Season of each month, indexed by month - 1
+SEASON_BY_MONTH = np.array([
+    'Winter', 'Winter', 'Spring', 'Spring', 'Spring', 'Summer',
+    'Summer', 'Summer', 'Fall', 'Fall', 'Fall', 'Winter'
+], dtype=object)
+
+# Weights of the standardized variables in the SCS index
+SCS_WEIGHTS = {'cape': 0.6, 'shear': 0.4}
+
+CHECKPOINT_JOB = 'storm_events'
+# Moments the stored scs_index was last standardized with
+SCORED_JOB = 'scored:storm_events'
+CHECKPOINT_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS etl_checkpoint (
+        job TEXT PRIMARY KEY,
+        last_date TEXT,
+        updated_at TEXT
+    )
+'''
+
+# Roll-up tables of compacted rows: table -> SQL expression of its period key
+ROLLUP_PERIODS = {
+    'storm_events_daily': "substr(date, 1, 10)",
+    'storm_events_monthly': "substr(date, 1, 7)"
+}
+ROLLUP_MEASURES = ['cape', 'shear', 'temperature', 'humidity', 'scs_index']
+
+# Dated snapshot files: raw/processed_storm_data_<run date>[_<region>][_<first>-<last>].csv
+SNAPSHOT_FILE_DATES = re.compile(r'_(\d{8})(?:_.+?)?(?:_(\d{8})-(\d{8}))?\.csv$')
+
+# Monthly statistics of storm_events kept up to date by every load. Power sums
+# (count, sum, sum of squares) are stored so batches can be added and subtracted.
+STATS_TABLE = 'storm_stats_monthly'
+STATS_SUMS = {
+    'storm_events': 'storm_event',
+    'scs_index_sum': 'scs_index',
+    'cape_sum': 'cape',
+    'cape_sumsq': 'cape * cape',
+    'shear_sum': 'shear',
+    'shear_sumsq': 'shear * shear'
+}
+STATS_TABLE_SQL = f'''
+    CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+        period TEXT PRIMARY KEY,
+        season TEXT,
+        records INTEGER,
+        {', '.join(f'{name} REAL' for name in STATS_SUMS)}
+    )
+'''
+# Dashboard views derive rates, means and sample standard deviations from the sums
+_STATS_COLUMNS = '''
+        SUM(records) AS records,
+        SUM(storm_events) * 1.0 / SUM(records) AS storm_event_rate,
+        SUM(scs_index_sum) / SUM(records) AS scs_index_mean,
+        SUM(cape_sum) / SUM(records) AS cape_mean,
+        sqrt(MAX((SUM(cape_sumsq) - SUM(cape_sum) * SUM(cape_sum) / SUM(records))
+                 / (SUM(records) - 1), 0)) AS cape_std,
+        SUM(shear_sum) / SUM(records) AS shear_mean,
+        sqrt(MAX((SUM(shear_sumsq) - SUM(shear_sum) * SUM(shear_sum) / SUM(records))
+                 / (SUM(records) - 1), 0)) AS shear_std
+'''
+STATS_VIEWS_SQL = [
+    f'''CREATE VIEW IF NOT EXISTS storm_stats_by_month AS
+        SELECT period AS month, season, {_STATS_COLUMNS}
+        FROM {STATS_TABLE} WHERE records > 0 GROUP BY period''',
+    f'''CREATE VIEW IF NOT EXISTS storm_stats_by_season AS
+        SELECT season, {_STATS_COLUMNS}
+        FROM {STATS_TABLE} WHERE records > 0 GROUP BY season'''
+]
+
+
+def _stats_delta_sql(sign: int, where: str) -> str:
+    """Add (``sign`` 1) or subtract (-1) the storm_events rows matching ``where``
+    to or from the monthly statistics."""
+    sums = ', '.join(f'{sign} * TOTAL({expr})' for expr in STATS_SUMS.values())
+    merges = ', '.join(f'{name} = {name} + excluded.{name}' for name in STATS_SUMS)
+    return f'''
+        INSERT INTO {STATS_TABLE} (period, season, records, {', '.join(STATS_SUMS)})
+        SELECT substr(date, 1, 7), MAX(season), {sign} * COUNT(*), {sums}
+        FROM storm_events WHERE {where} GROUP BY substr(date, 1, 7)
+        ON CONFLICT(period) DO UPDATE SET records = records + excluded.records, {merges}
+    '''
+
+
+def _rollup_table_sql(table: str) -> str:
+    """CREATE TABLE statement of a roll-up table."""
+    measures = ''.join(f'{m}_mean REAL, {m}_max REAL, ' for m in ROLLUP_MEASURES)
+    return f'''
+        CREATE TABLE IF NOT EXISTS {table} (
+            period TEXT PRIMARY KEY,
+            season TEXT,
+            records INTEGER,
+            {measures}storm_events INTEGER
+        )
+    '''
+
+
+def _rollup_sql(table: str, period: str) -> str:
+    """Aggregate storm_events rows older than a cutoff into ``table``.
+
+    Periods that already have a roll-up (late rows of a compacted period) are
+    merged with it: counts add up, means are count-weighted and maxima combine.
+    """
+    measures = [f'{m}_{agg}' for m in ROLLUP_MEASURES for agg in ('mean', 'max')]
+    selects = ', '.join(f'AVG({m}), MAX({m})' for m in ROLLUP_MEASURES)
+    merges = ', '.join(
+        f'{m}_mean = ({m}_mean * records + excluded.{m}_mean * excluded.records) '
+        f'/ (records + excluded.records), '
+        f'{m}_max = MAX({m}_max, excluded.{m}_max)'
+        for m in ROLLUP_MEASURES
+    )
+    return f'''
+        INSERT INTO {table} (period, season, records, {', '.join(measures)}, storm_events)
+        SELECT {period}, MAX(season), COUNT(*), {selects}, SUM(storm_event)
+        FROM storm_events WHERE date < ? GROUP BY {period}
+        ON CONFLICT(period) DO UPDATE SET {merges},
+            records = records + excluded.records,
+            storm_events = storm_events + excluded.storm_events
+    '''
+
+
+def _range_suffix(df: pd.DataFrame) -> str:
+    """File name suffix with the region and the first and last date of a window."""
+    if df.empty:
+        return ''
+    region = df['region'].iloc[0] if 'region' in df else DEFAULT_REGION
+    prefix = '' if region == DEFAULT_REGION else f'_{region}'
+    return f"{prefix}_{df['date'].min():%Y%m%d}-{df['date'].max():%Y%m%d}"
+
+
+def _moments_drift(scored: Dict[str, RunningMoments], moments: Dict[str, RunningMoments]) -> float:
+    """Largest change of a mean or standard deviation between ``scored`` and
+    ``moments``, in standard deviations of ``moments``; infinite without usable
+    ``scored`` moments."""
+    drift = 0.0
+    for name, current in moments.items():
+        previous = scored.get(name, RunningMoments())
+        if not previous.std > 0:
+            return float('inf')
+        drift = max(drift, abs(current.mean - previous.mean) / current.std,
+                    abs(current.std - previous.std) / current.std)
+    return drift
+
+
+def _checkpoint_job(region: str = None) -> str:
+    """Checkpoint and moments job name of one region (the plain job without one)."""
+    return CHECKPOINT_JOB if region is None else f'{CHECKPOINT_JOB}:{region}'
+
+
+def _process_region_window(config: Dict, run_id: str, region: str, window: int,
+                           window_start: pd.Timestamp, window_end: pd.Timestamp) -> Tuple:
+    """Extract and transform one window of one region in a worker process.
+
+    The window is standardized with its own moments, which the writer merges
+    into the region's running moments; the final rescore applies the global ones.
+    Features are added by the writer, which sees the windows of a region in order.
+    """
+    etl = StormDataETL(config=config, run_id=run_id)
+    etl.feature_engine = None
+    raw_data = etl.extract(window_start, window_end, region=region)
+    moments = {name: RunningMoments.from_values(raw_data[name]) for name in SCS_WEIGHTS}
+    return region, window, window_end, etl.transform(raw_data, moments), moments
+
+def _put_batch(batches: queue.Queue, item, writer):
+    """Queue ``item`` for the region writer, waiting while the queue is full.
+
+    Returns without queueing once the writer has stopped, so a failed writer
+    cannot block the producers.
+    """
+    while not writer.done():
+        try:
+            batches.put(item, timeout=1)
+            return
+        except queue.Full:
+            pass
+
 class StormDataETL:
-    def __init__(self, config_path: str = 'config.json'):
-        """Initialize ETL process with configuration."""
-        self.config = self._load_config(config_path)
+    def __init__(self, config_path: str = 'config.json', config: Dict = None, run_id: str = None):
+        """Initialize ETL process with configuration, read from ``config_path``
+        unless a ``config`` dictionary is given. ``run_id`` identifies the
+        snapshots of this run in the catalog (default: a new timestamped id)."""
+        self.config = config if config is not None else self._load_config(config_path)
+        self.run_id = run_id or f"{datetime.now():%Y%m%dT%H%M%S}-{os.urandom(3).hex()}"
         self.raw_data_dir = Path('data/raw')
         self.processed_data_dir = Path('data/processed')
+        self.catalog_path = Path('data') / CATALOG_FILE
         self._setup_directories()
+        # Reproducible sample data, see the synthetic section of the config
+        self.generator = SyntheticStormGenerator(**self.config.get('synthetic', {}))
+        # Rolling and lagged features, carried from window to window within a run
+        self.feature_engine = self._new_feature_engine()
         
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from JSON file."""
@@ -39,39 +246,245 @@ class StormDataETL:
                 "noaa_api_key": os.getenv("NOAA_API_KEY", ""),
                 "database_path": "data/storm_data.db",
                 "start_date": "2020-01-01",
-                "end_date": "2023-12-31"
+                "end_date": "2023-12-31",
+                "batch_size": 1000
             }
 
+    def _new_feature_engine(self) -> FeatureEngine:
+        """Feature engine of the ``features`` config section, or None when disabled."""
+        feature_config = dict(self.config.get('features', {}))
+        return FeatureEngine(**feature_config) if feature_config.pop('enabled', False) else None
+
+    def _resumed_feature_engine(self, region: str = DEFAULT_REGION,
+                                start_date: pd.Timestamp = None) -> FeatureEngine:
+        """Feature engine continuing the stored series of ``region`` up to ``start_date``.
+
+        The last rows loaded before ``start_date`` are read back and fed to a new
+        engine, so rolling and lagged features of a resumed run continue the
+        series. Without ``start_date`` the engine starts a new series. Run-length
+        features of the carried rows are recomputed by the final rescore.
+        """
+        engine = self._new_feature_engine()
+        if engine is None or start_date is None or not engine.history:
+            return engine
+        columns = engine.columns + ([engine.run_column] if engine.run_column else [])
+        conn = self._connect()
+        try:
+            history = pd.read_sql(
+                f'''SELECT {', '.join(columns)} FROM storm_events
+                   WHERE region = ? AND date < ? ORDER BY date DESC LIMIT ?''',
+                conn, params=(region, start_date.strftime('%Y-%m-%d'), engine.history)
+            )
+        finally:
+            conn.close()
+        engine.transform(history.iloc[::-1])
+        return engine
+
     def _setup_directories(self):
         """Create necessary directories if they don't exist."""
         self.raw_data_dir.mkdir(parents=True, exist_ok=True)
         self.processed_data_dir.mkdir(parents=True, exist_ok=True)
 
-    def extract(self) -> pd.DataFrame:
-        """Extract storm data from NOAA API."""
+    def _date_windows(self, start_date: str = None) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Split the configured date range into windows of at most ``batch_size`` records.
+
+        Windows span whole days, as many as fit ``batch_size`` records at the
+        frequency of the source (e.g. 41 days of hourly records for 1000), and
+        at least one day.
+        """
+        start = pd.Timestamp(start_date or self.config['start_date'])
+        end = pd.Timestamp(self.config['end_date'])
+        batch_size = int(self.config.get('batch_size', 1000))
+        records_per_day = pd.Timedelta(days=1) / self.generator.step
+        window_days = max(int(batch_size // records_per_day), 1)
+        window_starts = pd.date_range(start=start, end=end, freq=f'{window_days}D')
+        return [
+            (window_start, min(window_start + pd.Timedelta(days=window_days - 1), end))
+            for window_start in window_starts
+        ]
+
+    def _read_checkpoint(self, job: str = CHECKPOINT_JOB) -> str:
+        """Return the last date of the last completed window, or None."""
+        conn = self._connect()
+        try:
+            conn.execute(CHECKPOINT_TABLE_SQL)
+            row = conn.execute(
+                'SELECT last_date FROM etl_checkpoint WHERE job = ?', (job,)
+            ).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def _write_checkpoint(self, conn: sqlite3.Connection, job: str, last_date: pd.Timestamp,
+                          moments: Dict[str, RunningMoments] = None):
+        """Record a checkpoint and its moments; the caller owns the transaction."""
+        conn.execute(CHECKPOINT_TABLE_SQL)
+        conn.execute(
+            'INSERT OR REPLACE INTO etl_checkpoint (job, last_date, updated_at) '
+            'VALUES (?, ?, ?)',
+            (job, last_date.strftime('%Y-%m-%d'), datetime.now().isoformat()),
+        )
+        if moments:
+            save_moments(conn, job, moments)
+
+    def _save_checkpoint(self, last_date: pd.Timestamp, moments: Dict[str, RunningMoments] = None):
+        """Record ``last_date`` as the end of the last completed window.
+
+        The running moments of the loaded data are saved in the same transaction,
+        so a window that is retried after an interruption is never counted twice.
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                self._write_checkpoint(conn, CHECKPOINT_JOB, last_date, moments)
+        finally:
+            conn.close()
+
+    def _read_moments(self, job: str = CHECKPOINT_JOB) -> Dict[str, RunningMoments]:
+        """Return the persisted moments of the standardized variables."""
+        conn = self._connect()
+        try:
+            moments = load_moments(conn, job)
+        finally:
+            conn.close()
+        return {name: moments.get(name, RunningMoments()) for name in SCS_WEIGHTS}
+
+    def _global_moments(self) -> Dict[str, RunningMoments]:
+        """Return the moments of all loaded data, merged over the plain and region jobs."""
+        conn = self._connect()
+        try:
+            moments = load_merged_moments(conn, CHECKPOINT_JOB)
+        finally:
+            conn.close()
+        return {name: moments.get(name, RunningMoments()) for name in SCS_WEIGHTS}
+
+    def _rescore(self, moments: Dict[str, RunningMoments], where: str = '1', params=()):
+        """Recompute scs_index and storm_event of the rows matching ``where`` (default:
+        every loaded row) with ``moments``, recorded as the scored moments.
+
+        Runs as a single UPDATE inside SQLite, so the rows match a full-batch
+        transform without reading history back into Python. Run-length features
+        of storm_event are recomputed from the new classification in the same
+        transaction. Moments without a positive standard deviation (fewer than
+        two rows, or constant values) cannot standardize, so the rows are left
+        as loaded.
+        """
+        if not all(moments[name].std > 0 for name in SCS_WEIGHTS):
+            logger.warning(f"Not rescoring storm_events, moments {moments} have no spread")
+            return
+        terms = ' + '.join(f'{weight} * ({name} - ?) / ?' for name, weight in SCS_WEIGHTS.items())
+        values = [v for name in SCS_WEIGHTS for v in (moments[name].mean, moments[name].std)]
+        conn = self._connect()
+        try:
+            self._ensure_stats(conn)
+            with conn:
+                conn.execute(_stats_delta_sql(-1, where), params)
+                conn.execute(
+                    f'''
+                    UPDATE storm_events SET
+                        scs_index = {terms},
+                        storm_event = CASE WHEN {terms} > 1.0 AND temperature > 20 THEN 1 ELSE 0 END
+                    WHERE {where}
+                    ''',
+                    values + values + list(params)
+                )
+                self._update_run_features(conn, where, params)
+                conn.execute(_stats_delta_sql(1, where), params)
+                save_moments(conn, SCORED_JOB, moments)
+        finally:
+            conn.close()
+
+    def _rescore_loaded(self, starts: Dict[str, pd.Timestamp]):
+        """Standardize the rows a run loaded, from ``starts`` (region -> first date).
+
+        While the moments of all loaded data stay within ``rescore_tolerance``
+        (in standard deviations, default 0.01) of the scored moments, only the
+        loaded rows are rescored, with the scored moments, so a run writes its
+        own rows rather than the whole table. Past the tolerance, or before the
+        first rescore, every row is rescored with the final moments.
+        """
+        moments = self._global_moments()
+        scored = self._read_moments(SCORED_JOB)
+        drift = _moments_drift(scored, moments)
+        if drift > float(self.config.get('rescore_tolerance', 0.01)):
+            self._rescore(moments)
+            logger.info(f"Rescored storm_events with {moments}")
+        elif starts:
+            where = ' OR '.join(['(region = ? AND date >= ?)'] * len(starts))
+            params = [v for region, start in starts.items() for v in (region, start.strftime('%Y-%m-%d'))]
+            self._rescore(scored, where, params)
+            logger.info(f"Rescored loaded rows with {scored}, moments drifted by {drift:.3g} std")
+
+    def _update_run_features(self, conn: sqlite3.Connection, where: str = '1', params=()):
+        """Recompute the storm_event run-length features of the rows matching ``where``
+        from the stored classification, per region in date order; the caller owns
+        the transaction.
+
+        The values equal those of a FeatureEngine run over each region's whole
+        series. Requires SQLite 3.33 (UPDATE ... FROM).
+        """
+        engine = self.feature_engine
+        if engine is None or engine.run_column != 'storm_event':
+            return
+        run_length = f'{engine.run_column}_run_length'
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(storm_events)')}
+        if run_length not in columns:
+            return
+        # Rows are numbered in date order, then each run is counted from its last break
+        order = 'PARTITION BY region ORDER BY date, id'
+        days = {
+            f'{engine.run_column}_days_{window}':
+                f'TOTAL(storm_event) OVER ({order} ROWS BETWEEN {window - 1} PRECEDING AND CURRENT ROW)'
+            for window in engine.windows
+        }
+        conn.execute(f'''
+            WITH numbered AS (
+                SELECT rowid AS id, region, date, storm_event,
+                       ROW_NUMBER() OVER (PARTITION BY region ORDER BY date, rowid) AS position
+                FROM storm_events
+            ), runs AS (
+                SELECT id,
+                       position - MAX(CASE WHEN storm_event = 1 THEN 0 ELSE position END)
+                           OVER ({order} ROWS UNBOUNDED PRECEDING) AS run_length,
+                       {', '.join(f'{sql} AS {name}' for name, sql in days.items())}
+                FROM numbered
+            )
+            UPDATE storm_events SET
+                {run_length} = runs.run_length,
+                {', '.join(f'{name} = runs.{name}' for name in days)}
+            FROM runs WHERE storm_events.rowid = runs.id AND ({where})
+        ''', params)
+
+    def reset_checkpoint(self):
+        """Forget the progress of previous runs so the next run starts from ``start_date``."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(CHECKPOINT_TABLE_SQL)
+                conn.execute(MOMENTS_TABLE_SQL)
+                region_jobs = _checkpoint_job('%')
+                conn.execute('DELETE FROM etl_checkpoint WHERE job = ? OR job LIKE ?',
+                             (CHECKPOINT_JOB, region_jobs))
+                conn.execute('DELETE FROM etl_moments WHERE job LIKE ? OR job = ?',
+                             (region_jobs, SCORED_JOB))
+                save_moments(conn, CHECKPOINT_JOB, {name: RunningMoments() for name in SCS_WEIGHTS})
+        finally:
+            conn.close()
+
+    def extract(self, start_date: str = None, end_date: str = None,
+                region: str = DEFAULT_REGION) -> pd.DataFrame:
+        """Extract storm data of one region from NOAA API for the given (default:
+        configured) date range."""
         logger.info("Starting data extraction...")
         
         try:
-            # Simulate API call with sample data (replace with actual NOAA API call)
-            dates = pd.date_range(start=self.config['start_date'], 
-                                end=self.config['end_date'], 
-                                freq='D')
-            
-            # Generate sample data
-            data = {
-                'date': dates,
-                'cape': np.random.normal(1500, 500, len(dates)),
-                'shear': np.random.normal(20, 5, len(dates)),
-                'temperature': np.random.normal(25, 2, len(dates)),
-                'humidity': np.random.normal(70, 10, len(dates))
-            }
-            
-            df = pd.DataFrame(data)
+            # Simulate API call with seeded sample data (replace with actual NOAA API call)
+            df = self.generator.generate(start_date or self.config['start_date'],
+                                         end_date or self.config['end_date'],
+                                         region=region)
             
             # Save raw data
-            raw_file = self.raw_data_dir / f'raw_storm_data_{datetime.now().strftime("%Y%m%d")}.csv'
-            df.to_csv(raw_file, index=False)
-            logger.info(f"Raw data saved to {raw_file}")
+            self._save_snapshot('raw', df)
             
             return df
             
@@ -79,18 +492,24 @@ class StormDataETL:
             logger.error(f"Error during data extraction: {str(e)}")
             raise
 
-    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Transform the extracted data."""
+    def transform(self, df: pd.DataFrame, moments: Dict[str, RunningMoments] = None) -> pd.DataFrame:
+        """Transform the extracted data.
+
+        ``moments`` holds the running mean and standard deviation of cape and shear
+        over all data loaded so far; without it, the statistics of ``df`` are used.
+        """
         logger.info("Starting data transformation...")
         
         try:
             # Create a copy to avoid modifying the original
             transformed_df = df.copy()
+            if moments is None:
+                moments = {name: RunningMoments.from_values(df[name]) for name in SCS_WEIGHTS}
             
             # Add derived columns
-            transformed_df['scs_index'] = (
-                0.6 * (transformed_df['cape'] - transformed_df['cape'].mean()) / transformed_df['cape'].std() +
-                0.4 * (transformed_df['shear'] - transformed_df['shear'].mean()) / transformed_df['shear'].std()
+            transformed_df['scs_index'] = sum(
+                weight * moments[name].zscore(transformed_df[name])
+                for name, weight in SCS_WEIGHTS.items()
             )
             
             # Add storm event classification
@@ -100,17 +519,14 @@ class StormDataETL:
             ).astype(int)
             
             # Add season column
-            transformed_df['season'] = transformed_df['date'].dt.month.map({
-                12: 'Winter', 1: 'Winter', 2: 'Winter',
-                3: 'Spring', 4: 'Spring', 5: 'Spring',
-                6: 'Summer', 7: 'Summer', 8: 'Summer',
-                9: 'Fall', 10: 'Fall', 11: 'Fall'
-            })
+            transformed_df['season'] = SEASON_BY_MONTH[transformed_df['date'].dt.month.to_numpy() - 1]
+            
+            # Add rolling, lagged and run-length features, continuing the previous window
+            if self.feature_engine is not None:
+                transformed_df = self.feature_engine.transform(transformed_df)
             
             # Save transformed data
-            processed_file = self.processed_data_dir / f'processed_storm_data_{datetime.now().strftime("%Y%m%d")}.csv'
-            transformed_df.to_csv(processed_file, index=False)
-            logger.info(f"Transformed data saved to {processed_file}")
+            self._save_snapshot('processed', transformed_df)
             
             return transformed_df
             
@@ -118,38 +534,149 @@ class StormDataETL:
             logger.error(f"Error during data transformation: {str(e)}")
             raise
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database with the configured journal and synchronous settings."""
+        conn = sqlite3.connect(self.config['database_path'])
+        sqlite_config = self.config.get('sqlite', {})
+        conn.execute(f"PRAGMA journal_mode={sqlite_config.get('journal_mode', 'WAL')}")
+        conn.execute(f"PRAGMA synchronous={sqlite_config.get('synchronous', 'NORMAL')}")
+        return conn
+
+    def _ensure_unique_key(self, conn: sqlite3.Connection):
+        """Create the unique index on the natural key, dropping older duplicate rows first."""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+            (UNIQUE_KEY_INDEX,)
+        ).fetchone()
+        if exists:
+            return
+        key = ', '.join(KEY_COLUMNS)
+        with conn:
+            removed = conn.execute(f'''
+                DELETE FROM storm_events WHERE rowid NOT IN (
+                    SELECT MAX(rowid) FROM storm_events GROUP BY {key}
+                )
+            ''').rowcount
+            if removed:
+                logger.warning(f"Removed {removed} duplicate rows before adding the unique key")
+            conn.execute(
+                f'CREATE UNIQUE INDEX IF NOT EXISTS {UNIQUE_KEY_INDEX} ON storm_events({key})'
+            )
+
+    def _ensure_stats(self, conn: sqlite3.Connection):
+        """Create the monthly statistics table and its views.
+
+        A new table is seeded from the rows already in storm_events; from then on
+        every load and rescore applies its changes to it incrementally.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (STATS_TABLE,)
+        ).fetchone()
+        with conn:
+            conn.execute(STATS_TABLE_SQL)
+            for view_sql in STATS_VIEWS_SQL:
+                conn.execute(view_sql)
+            if not exists:
+                conn.execute(_stats_delta_sql(1, '1'))
+
+    def _prepare_tables(self, conn: sqlite3.Connection, upsert: bool = True):
+        """Create storm_events, its indexes and the statistics tables.
+
+        Tables created before regions existed get a ``region`` column, with
+        their rows in ``DEFAULT_REGION``.
+        """
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS storm_events (
+                date TEXT,
+                cape REAL,
+                shear REAL,
+                temperature REAL,
+                humidity REAL,
+                scs_index REAL,
+                storm_event INTEGER,
+                season TEXT,
+                processed_date TEXT,
+                region TEXT DEFAULT 'default'
+            )
+        ''')
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(storm_events)')]
+        if 'region' not in columns:
+            with conn:
+                conn.execute(f"ALTER TABLE storm_events ADD COLUMN region TEXT DEFAULT '{DEFAULT_REGION}'")
+        self._ensure_stats(conn)
+        if upsert:
+            self._ensure_unique_key(conn)
+        
+        # Create indexes for common queries
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_date ON storm_events(date)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_storm_event ON storm_events(storm_event)')
+
+    def _ensure_columns(self, conn: sqlite3.Connection, columns):
+        """Add columns of ``columns`` missing from storm_events, such as feature columns."""
+        existing = {row[1] for row in conn.execute('PRAGMA table_info(storm_events)')}
+        for column in columns:
+            if column not in existing:
+                conn.execute(f'ALTER TABLE storm_events ADD COLUMN {column} REAL')
+
+    def _write_rows(self, conn: sqlite3.Connection, df: pd.DataFrame):
+        """Upsert ``df`` on the natural key and move the monthly statistics from the
+        replaced rows to the new ones; the caller owns the transaction."""
+        columns = list(df.columns)
+        self._ensure_columns(conn, columns)
+        updates = ', '.join(f'{c} = excluded.{c}' for c in columns if c not in KEY_COLUMNS)
+        sql = (
+            f"INSERT INTO storm_events ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT({', '.join(KEY_COLUMNS)}) DO UPDATE SET {updates}"
+        )
+        rows = df.astype(object).where(df.notna(), None)
+        rows['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d %H:%M:%S')
+        # Rows of the batch are found again by date, before and after the upsert
+        in_batch = 'date IN (SELECT value FROM json_each(?))'
+        batch_keys = json.dumps(list(rows['date'].unique()))
+        conn.execute(_stats_delta_sql(-1, in_batch), (batch_keys,))
+        conn.executemany(sql, list(rows.itertuples(index=False, name=None)))
+        conn.execute(_stats_delta_sql(1, in_batch), (batch_keys,))
+
+    def _upsert(self, conn: sqlite3.Connection, df: pd.DataFrame):
+        """Insert or update rows on the natural key, one transaction per ``batch_size`` rows."""
+        batch_size = int(self.config.get('batch_size', 1000))
+        for start in range(0, len(df), batch_size):
+            with conn:
+                self._write_rows(conn, df.iloc[start:start + batch_size])
+
     def load(self, df: pd.DataFrame):
-        """Load the transformed data into SQLite database."""
+        """Load the transformed data into SQLite database.
+
+        The default ``upsert`` load mode makes reloads idempotent: rows are keyed on
+        ``date`` and ``region`` and existing rows are updated instead of duplicated. The legacy
+        behaviour is available with ``"load_mode": "append"`` in the config.
+        Both modes update the monthly statistics behind the ``storm_stats_by_month``
+        and ``storm_stats_by_season`` views with the loaded rows only.
+        """
         logger.info("Starting data loading...")
         
         try:
             # Create database connection
-            conn = sqlite3.connect(self.config['database_path'])
+            conn = self._connect()
             
             # Create tables if they don't exist
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS storm_events (
-                    date TEXT,
-                    cape REAL,
-                    shear REAL,
-                    temperature REAL,
-                    humidity REAL,
-                    scs_index REAL,
-                    storm_event INTEGER,
-                    season TEXT,
-                    processed_date TEXT
-                )
-            ''')
+            append = self.config.get('load_mode', 'upsert') == 'append'
+            self._prepare_tables(conn, upsert=not append)
             
             # Add processed date
             df['processed_date'] = datetime.now().strftime('%Y-%m-%d')
             
             # Load data into database
-            df.to_sql('storm_events', conn, if_exists='append', index=False)
-            
-            # Create indexes for common queries
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_date ON storm_events(date)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_storm_event ON storm_events(storm_event)')
+            if append:
+                last_rowid = conn.execute('SELECT COALESCE(MAX(rowid), 0) FROM storm_events').fetchone()[0]
+                with conn:
+                    self._ensure_columns(conn, df.columns)
+                df.to_sql('storm_events', conn, if_exists='append', index=False)
+                with conn:
+                    conn.execute(_stats_delta_sql(1, 'rowid > ?'), (last_rowid,))
+            else:
+                self._upsert(conn, df)
             
             conn.close()
             logger.info("Data successfully loaded into database")
@@ -158,32 +685,453 @@ class StormDataETL:
             logger.error(f"Error during data loading: {str(e)}")
             raise
 
-    def run_etl(self):
-        """Run the complete ETL process."""
+    def _save_snapshot(self, kind: str, df: pd.DataFrame):
+        """Save a raw or processed snapshot of ``df``.
+
+        With the default ``npz`` snapshot format the columns go to a compressed
+        file named by their content hash and the run is recorded in the catalog;
+        content already stored is not written again. ``"snapshot_format": "csv"``
+        keeps the dated CSV files and ``"none"`` skips snapshots (e.g. load tests).
+        """
+        directory = self.raw_data_dir if kind == 'raw' else self.processed_data_dir
+        snapshot_format = self.config.get('snapshot_format', 'npz')
+        if snapshot_format == 'none':
+            return
+        if snapshot_format == 'csv':
+            path = directory / f'{kind}_storm_data_{datetime.now().strftime("%Y%m%d")}{_range_suffix(df)}.csv'
+            df.to_csv(path, index=False)
+            logger.info(f"{kind.capitalize()} data saved to {path}")
+            return
+        digest, path, written = write_snapshot(df, directory, kind)
+        record_snapshot(self.catalog_path, self.run_id, kind, digest, path, df)
+        logger.info(f"{kind.capitalize()} data {'saved to' if written else 'unchanged, reusing'} {path}")
+
+    def replay(self, run_id: str, kind: str = 'processed') -> int:
+        """Load the snapshots a previous run recorded into the database again,
+        then rescore the table.
+
+        When the database holds no moments yet (e.g. a new ``database_path``),
+        the moments and last date of every replayed region are accumulated from
+        the snapshots and checkpointed, as the original run did, so the rescore
+        standardizes with them and later runs resume after the replayed data.
+
+        Returns:
+            Number of rows loaded
+        """
+        entries = [e for e in read_catalog(self.catalog_path)
+                   if e['run_id'] == run_id and e['kind'] == kind]
+        if not entries:
+            raise ValueError(f"No {kind} snapshots recorded for run {run_id}")
+        moments = self._global_moments()
+        # Per region: last date and moments of the replayed rows, for a database without moments
+        replayed = {} if all(m.count == 0 for m in moments.values()) else None
+        rows = 0
+        for entry in entries:
+            df = read_snapshot(entry['path'])
+            if replayed is not None and len(df):
+                region = df['region'].iloc[0] if 'region' in df else DEFAULT_REGION
+                state = replayed.setdefault(region, {
+                    'last_date': df['date'].max(),
+                    'moments': {name: RunningMoments() for name in SCS_WEIGHTS}
+                })
+                state['last_date'] = max(state['last_date'], df['date'].max())
+                state['moments'] = {name: state['moments'][name].update(df[name]) for name in SCS_WEIGHTS}
+                moments = state['moments']
+            if kind == 'raw':
+                df = self.transform(df, moments)
+            self.load(df)
+            rows += len(df)
+        if replayed:
+            conn = self._connect()
+            try:
+                with conn:
+                    for region, state in replayed.items():
+                        job = _checkpoint_job(None if region == DEFAULT_REGION else region)
+                        self._write_checkpoint(conn, job, pd.Timestamp(state['last_date']),
+                                               state['moments'])
+            finally:
+                conn.close()
+        # Snapshots hold the index of their window, standardize with the final moments
+        self._rescore(self._global_moments())
+        logger.info(f"Replayed {rows} rows from {len(entries)} {kind} snapshots of run {run_id}")
+        return rows
+
+    def _prune_snapshots(self, cutoff: pd.Timestamp) -> int:
+        """Delete raw and processed snapshots whose data ends before ``cutoff``.
+
+        Catalogued snapshots are dropped from the catalog and deleted once no
+        remaining entry refers to them. For CSV snapshots the data range is read
+        from the file name; files without one are dated by the run date in their name.
+        """
+        removed = prune_catalog(self.catalog_path, cutoff) if self.catalog_path.exists() else 0
+        for directory in (self.raw_data_dir, self.processed_data_dir):
+            for path in directory.glob('*_storm_data_*.csv'):
+                match = SNAPSHOT_FILE_DATES.search(path.name)
+                if match and pd.Timestamp(match.group(3) or match.group(1)) < cutoff:
+                    path.unlink()
+                    removed += 1
+        return removed
+
+    def compact(self, as_of: str = None) -> Dict[str, int]:
+        """Enforce ``data_retention_days`` on storm_events and the CSV snapshots.
+
+        Rows older than the retention window (counted back from ``as_of``, default
+        today) are rolled up into the daily and monthly tables of ``ROLLUP_PERIODS``
+        and deleted from storm_events in one transaction, which also subtracts them
+        from the monthly statistics, so the dashboard views keep matching
+        storm_events. Old CSV snapshots are removed, then up to
+        ``compaction.vacuum_pages`` free pages are returned to the file system
+        with an incremental vacuum.
+
+        Roll-ups keep the scs_index of the rows at compaction time; a later
+        ``_rescore`` only updates rows still in storm_events.
+
+        Returns:
+            Number of compacted rows and pruned files
+        """
+        retention_days = self.config.get('data_retention_days')
+        if retention_days is None:
+            logger.info("No data_retention_days configured, nothing to compact")
+            return {'rows': 0, 'files': 0}
+        cutoff = pd.Timestamp(as_of or datetime.now().date()) - pd.Timedelta(days=retention_days)
+        compaction_config = self.config.get('compaction', {})
+        logger.info(f"Compacting storm data older than {cutoff.date()}")
+        
+        try:
+            conn = self._connect()
+            try:
+                # auto_vacuum only changes with a full VACUUM, done once for older databases
+                if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                    conn.execute('PRAGMA auto_vacuum=INCREMENTAL')
+                    conn.execute('VACUUM')
+                
+                rows = 0
+                has_table = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'storm_events'"
+                ).fetchone()
+                if has_table:
+                    bound = cutoff.strftime('%Y-%m-%d')
+                    self._ensure_stats(conn)
+                    with conn:
+                        for table, period in ROLLUP_PERIODS.items():
+                            conn.execute(_rollup_table_sql(table))
+                            conn.execute(_rollup_sql(table, period), (bound,))
+                        conn.execute(_stats_delta_sql(-1, 'date < ?'), (bound,))
+                        rows = conn.execute('DELETE FROM storm_events WHERE date < ?', (bound,)).rowcount
+                
+                conn.execute(f"PRAGMA incremental_vacuum({int(compaction_config.get('vacuum_pages', 1000))})")
+            finally:
+                conn.close()
+            
+            files = self._prune_snapshots(cutoff) if compaction_config.get('prune_files', True) else 0
+            logger.info(f"Compacted {rows} rows into {', '.join(ROLLUP_PERIODS)} and pruned {files} files")
+            return {'rows': rows, 'files': files}
+        except Exception as e:
+            logger.error(f"Error during compaction: {str(e)}")
+            raise
+
+    def run_etl(self, resume: bool = True):
+        """Run the complete ETL process, one window of up to ``batch_size`` records at a time.
+
+        Each window is extracted, transformed and loaded before the next one starts,
+        and its last date is checkpointed in the database. With ``resume`` an
+        interrupted backfill continues after the last completed window.
+
+        Returns:
+            Number of rows loaded
+        """
         try:
             logger.info("Starting ETL process...")
             
-            # Extract
-            raw_data = self.extract()
-            logger.info(f"Extracted {len(raw_data)} records")
+            start_date = None
+            if resume:
+                last_date = self._read_checkpoint()
+                if last_date is not None:
+                    start_date = pd.Timestamp(last_date) + pd.Timedelta(days=1)
+                    logger.info(f"Resuming after checkpoint {last_date}")
+            windows = self._date_windows(start_date)
+            if not windows:
+                logger.info("No new windows to process, data is up to date")
+                return 0
+            self.feature_engine = self._resumed_feature_engine(start_date=start_date)
+            
+            # Moments of cape and shear over everything loaded by previous windows
+            moments = self._read_moments() if resume else {
+                name: RunningMoments() for name in SCS_WEIGHTS
+            }
             
-            # Transform
-            transformed_data = self.transform(raw_data)
-            logger.info(f"Transformed {len(transformed_data)} records")
+            rows = 0
+            for number, (window_start, window_end) in enumerate(windows, start=1):
+                logger.info(f"Processing window {number}/{len(windows)}: "
+                            f"{window_start.date()} to {window_end.date()}")
+                
+                # Extract
+                raw_data = self.extract(window_start, window_end)
+                logger.info(f"Extracted {len(raw_data)} records")
+                
+                # Transform
+                moments = {name: moments[name].update(raw_data[name]) for name in SCS_WEIGHTS}
+                transformed_data = self.transform(raw_data, moments)
+                logger.info(f"Transformed {len(transformed_data)} records")
+                
+                # Load
+                self.load(transformed_data)
+                self._save_checkpoint(window_end, moments)
+                rows += len(transformed_data)
+            
+            # Second pass: standardize with the moments of all loaded data, including
+            # those of regions loaded by run_regions
+            self._rescore_loaded({DEFAULT_REGION: windows[0][0]})
             
-            # Load
-            self.load(transformed_data)
             logger.info("ETL process completed successfully")
+            return rows
             
         except Exception as e:
             logger.error(f"ETL process failed: {str(e)}")
             raise
 
+    def _region_writer(self, batches: queue.Queue, progress: Dict[str, Dict]):
+        """Single writer of the region ETL: commit queued batches in large transactions.
+
+        Batches are grouped until ``writer_rows`` rows are pending or the queue is
+        empty and committed together. Each region's windows are written in window
+        order, once all earlier windows of the region are done: the region's
+        FeatureEngine adds the features, carried from window to window. In the same
+        transaction, each region's checkpoint and moments advance over the windows
+        written, so windows finished out of order are never skipped on resume.
+        ``None`` on the queue stops the writer.
+
+        Returns:
+            Number of rows committed
+        """
+        writer_rows = int(self.config.get('writer_rows', 50_000))
+        conn = self._connect()
+        rows = 0
+        try:
+            self._prepare_tables(conn)
+            pending, stop = [], False
+            while not stop:
+                item = batches.get()
+                stop = item is None
+                if not stop:
+                    pending.append(item)
+                if not pending or not (stop or batches.empty() or
+                                       sum(len(batch[3]) for batch in pending) >= writer_rows):
+                    continue
+                
+                committed, windows = 0, 0
+                with conn:
+                    processed_date = datetime.now().strftime('%Y-%m-%d')
+                    for region, window, window_end, df, moments in pending:
+                        progress[region]['done'][window] = (window_end, df, moments)
+                    for region in {batch[0] for batch in pending}:
+                        state = progress[region]
+                        last_date = None
+                        while state['next'] in state['done']:
+                            last_date, df, moments = state['done'].pop(state['next'])
+                            if state['engine'] is not None:
+                                df = state['engine'].transform(df)
+                            self._write_rows(conn, df.assign(processed_date=processed_date))
+                            committed += len(df)
+                            windows += 1
+                            state['moments'] = {
+                                name: state['moments'][name].merge(moments[name]) for name in SCS_WEIGHTS
+                            }
+                            state['next'] += 1
+                        if last_date is not None:
+                            self._write_checkpoint(conn, _checkpoint_job(region), last_date,
+                                                   state['moments'])
+                rows += committed
+                logger.info(f"Committed {committed} rows from {windows} region windows")
+                pending = []
+        finally:
+            conn.close()
+        return rows
+
+    def run_regions(self, resume: bool = True):
+        """Run the ETL for every configured region in parallel.
+
+        Windows of all ``regions`` are extracted and transformed in a process pool
+        of ``workers`` processes. Finished batches go through a bounded queue to a
+        single writer thread, the only connection writing to SQLite, which commits
+        them in large transactions. Each region has its own checkpoint and moments
+        (job ``storm_events:<region>``); after the last window the moments of all
+        jobs are merged to rescore the loaded rows (see ``_rescore_loaded``).
+        ``default`` is the region of plain ``run_etl`` loads and cannot be listed:
+        its rows and moments would be counted under both jobs.
+
+        Returns:
+            Number of rows loaded
+        """
+        try:
+            regions = self.config['regions']
+            if DEFAULT_REGION in regions:
+                raise ValueError(f"Region '{DEFAULT_REGION}' is reserved for loads without regions")
+            workers = self.config.get('workers') or os.cpu_count() or 1
+            logger.info(f"Starting region ETL process for {len(regions)} regions with {workers} workers...")
+            
+            progress, tasks = {}, []
+            for region in regions:
+                start_date = None
+                last_date = self._read_checkpoint(_checkpoint_job(region)) if resume else None
+                if last_date is not None:
+                    start_date = pd.Timestamp(last_date) + pd.Timedelta(days=1)
+                moments = self._read_moments(_checkpoint_job(region)) if resume else {
+                    name: RunningMoments() for name in SCS_WEIGHTS
+                }
+                progress[region] = {'next': 0, 'done': {}, 'moments': moments,
+                                    'engine': self._resumed_feature_engine(region, start_date)}
+                tasks += [(region, window, start, end)
+                          for window, (start, end) in enumerate(self._date_windows(start_date))]
+            logger.info(f"{len(tasks)} region windows to process")
+            
+            batches = queue.Queue(maxsize=2 * workers)
+            # Workers must not be forked from this process while the writer thread
+            # runs: a lock it holds (logging, sqlite3) would stay locked in the child
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            with ThreadPoolExecutor(max_workers=1) as writer_pool, \
+                    ProcessPoolExecutor(max_workers=workers,
+                                        mp_context=multiprocessing.get_context(start_method)) as pool:
+                writer = writer_pool.submit(self._region_writer, batches, progress)
+                futures = [pool.submit(_process_region_window, self.config, self.run_id, *task) for task in tasks]
+                try:
+                    for future in as_completed(futures):
+                        _put_batch(batches, future.result(), writer)
+                        if writer.done():
+                            break
+                finally:
+                    for future in futures:
+                        future.cancel()
+                    _put_batch(batches, None, writer)
+                rows = writer.result()
+            
+            # Second pass: standardize with the moments of all loaded data
+            if tasks:
+                self._rescore_loaded({region: start for region, window, start, _ in tasks if window == 0})
+            
+            logger.info("Region ETL process completed successfully")
+            return rows
+            
+        except Exception as e:
+            logger.error(f"Region ETL process failed: {str(e)}")
+            raise
+
+    def extract_gridded(self, start_date: str = None, end_date: str = None) -> GriddedDataset:
+        """Extract gridded storm data into memory-mapped (time, lat, lon) cubes.
+
+        The grid and time chunk come from the ``gridded`` section of the config.
+        Sample data is generated ``chunk_days`` time steps at a time from seeded
+        streams and written straight to disk (replace with reads of the real
+        gridded source).
+        """
+        logger.info("Starting gridded data extraction...")
+        
+        try:
+            grid_config = self.config.get('gridded', {})
+            dataset = GriddedDataset.create(
+                grid_config.get('directory', 'data/gridded'),
+                start_date or self.config['start_date'],
+                end_date or self.config['end_date'],
+                lat=grid_config.get('lat', [25.0, 50.0, 0.25]),
+                lon=grid_config.get('lon', [-125.0, -65.0, 0.25])
+            )
+            units = {'cape': 'J/kg', 'shear': 'm/s', 'temperature': 'degC', 'humidity': '%'}
+            cubes = {
+                name: dataset.create_variable(name, units=units[name])
+                for name in SYNTHETIC_VARIABLES
+            }
+            for time_slice in dataset.time_slices(int(grid_config.get('chunk_days', 30))):
+                shape = (time_slice.stop - time_slice.start,) + dataset.shape[1:]
+                # One seeded stream per time chunk, so the cube is reproducible
+                rng = np.random.Generator(np.random.PCG64(
+                    np.random.SeedSequence(self.generator.seed, spawn_key=(time_slice.start,))
+                ))
+                for name, (mean, std) in SYNTHETIC_VARIABLES.items():
+                    cubes[name][time_slice] = rng.normal(mean, std, shape)
+            for cube in cubes.values():
+                cube.flush()
+            
+            logger.info(f"Gridded raw data saved to {dataset}")
+            return dataset
+            
+        except Exception as e:
+            logger.error(f"Error during gridded data extraction: {str(e)}")
+            raise
+
+    def transform_gridded(self, dataset: GriddedDataset) -> GriddedDataset:
+        """Add scs_index and storm_event cubes to a gridded dataset.
+
+        A first pass over memory-mapped time slices accumulates the cape and shear
+        moments of the whole cube; a second pass standardizes each slice and
+        writes the index and classification, so memory use is bounded by the
+        time chunk rather than the cube size. The moments are stored in the
+        dataset attributes.
+        """
+        logger.info("Starting gridded data transformation...")
+        
+        try:
+            chunk = int(self.config.get('gridded', {}).get('chunk_days', 30))
+            cubes = {name: dataset.variable(name) for name in list(SCS_WEIGHTS) + ['temperature']}
+            
+            # First pass: moments of the standardized variables over the whole grid
+            moments = {name: RunningMoments() for name in SCS_WEIGHTS}
+            for time_slice in dataset.time_slices(chunk):
+                moments = {name: moments[name].update(cubes[name][time_slice]) for name in SCS_WEIGHTS}
+            
+            # Second pass: SCS index and storm classification, slice by slice
+            scs_index = dataset.create_variable('scs_index')
+            storm_event = dataset.create_variable('storm_event', dtype='int8')
+            for time_slice in dataset.time_slices(chunk):
+                index = sum(
+                    weight * moments[name].zscore(cubes[name][time_slice])
+                    for name, weight in SCS_WEIGHTS.items()
+                )
+                scs_index[time_slice] = index
+                storm_event[time_slice] = (index > 1.0) & (cubes['temperature'][time_slice] > 20)
+            scs_index.flush()
+            storm_event.flush()
+            
+            dataset.set_attrs(moments={
+                name: {'count': m.count, 'mean': m.mean, 'm2': m.m2} for name, m in moments.items()
+            })
+            logger.info(f"Gridded SCS index computed with {moments}")
+            return dataset
+            
+        except Exception as e:
+            logger.error(f"Error during gridded data transformation: {str(e)}")
+            raise
+
+    def run_gridded(self) -> GriddedDataset:
+        """Run the gridded ETL: extract the cubes and add scs_index and storm_event."""
+        try:
+            logger.info("Starting gridded ETL process...")
+            dataset = self.transform_gridded(self.extract_gridded())
+            logger.info("Gridded ETL process completed successfully")
+            return dataset
+        except Exception as e:
+            logger.error(f"Gridded ETL process failed: {str(e)}")
+            raise
+
 def main():
-    """Main function to run the ETL process."""
+    """Main function to run the ETL process, recorded in the lineage store."""
     try:
         etl = StormDataETL()
-        etl.run_etl()
+        lineage = LineageStore(etl.config.get('lineage', {}).get('location'))
+        # The lineage run shares its id with the snapshots of the run
+        with lineage.start_run('storm_etl', run_id=etl.run_id) as run:
+            run.record_input('config.json')
+            if etl.config.get('gridded', {}).get('enabled', False):
+                with run.stage('gridded') as stage:
+                    dataset = etl.run_gridded()
+                    stage.rows = int(np.prod(dataset.shape))
+                run.record_output(str(dataset.directory), stage.rows)
+                return
+            with run.stage('etl') as stage:
+                stage.rows = etl.run_regions() if etl.config.get('regions') else etl.run_etl()
+            run.record_output(etl.config['database_path'], stage.rows)
+            if etl.config.get('compaction', {}).get('enabled', False):
+                with run.stage('compact') as stage:
+                    stage.rows = etl.compact()['rows']
     except Exception as e:
         logger.error(f"ETL process failed: {str(e)}")
         raise
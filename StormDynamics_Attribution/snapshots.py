@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+CATALOG_FILE = 'snapshot_catalog.jsonl'
+
+
+def _column_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Typed NumPy array of every column; text columns become fixed-width unicode."""
+    arrays = {}
+    for column in df.columns:
+        values = df[column].to_numpy()
+        if values.dtype == object:
+            values = values.astype(str)
+        arrays[column] = values
+    return arrays
+
+
+def content_digest(arrays: Dict[str, np.ndarray]) -> str:
+    """SHA-256 of the column names, dtypes and values, independent of the run."""
+    digest = hashlib.sha256()
+    for column, values in arrays.items():
+        digest.update(f'{column}:{values.dtype.str}:{len(values)};'.encode())
+        digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+
+def write_snapshot(df: pd.DataFrame, directory, kind: str) -> Tuple[str, Path, bool]:
+    """Store ``df`` as a compressed columnar ``.npz`` file named by its content hash.
+
+    Returns:
+        The digest, the file path and whether the file was written (False when
+        identical content was already stored)
+    """
+    arrays = _column_arrays(df)
+    digest = content_digest(arrays)
+    path = Path(directory) / f'{kind}_{digest}.npz'
+    if path.exists():
+        return digest, path, False
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+    return digest, path, True
+
+
+def read_snapshot(path) -> pd.DataFrame:
+    """Read a snapshot back into a DataFrame, column by column from binary arrays."""
+    with np.load(path, allow_pickle=False) as arrays:
+        return pd.DataFrame({column: arrays[column] for column in arrays.files})
+
+
+def record_snapshot(catalog_path, run_id: str, kind: str, digest: str, path, df: pd.DataFrame):
+    """Append a catalog entry mapping ``run_id`` to a snapshot.
+
+    Entries are single JSON lines written with one append, so worker processes
+    can record snapshots concurrently.
+    """
+    entry = {
+        'run_id': run_id,
+        'kind': kind,
+        'digest': digest,
+        'path': str(path),
+        'rows': len(df),
+        'first_date': f"{df['date'].min():%Y-%m-%d}" if len(df) else None,
+        'last_date': f"{df['date'].max():%Y-%m-%d}" if len(df) else None,
+        'created_at': datetime.now().isoformat()
+    }
+    with open(catalog_path, 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+
+
+def read_catalog(catalog_path) -> List[Dict]:
+    """Return all catalog entries in the order they were recorded."""
+    if not Path(catalog_path).exists():
+        return []
+    with open(catalog_path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def prune_catalog(catalog_path, cutoff: pd.Timestamp) -> int:
+    """Drop catalog entries whose data ends before ``cutoff`` and delete the
+    snapshot files no remaining entry refers to.
+
+    Returns:
+        Number of deleted snapshot files
+    """
+    entries = read_catalog(catalog_path)
+    keep = [e for e in entries if e['last_date'] is None or pd.Timestamp(e['last_date']) >= cutoff]
+    referenced = {e['path'] for e in keep}
+    removed = 0
+    for path in {e['path'] for e in entries} - referenced:
+        if Path(path).exists():
+            Path(path).unlink()
+            removed += 1
+    tmp_path = Path(str(catalog_path) + '.tmp')
+    with open(tmp_path, 'w') as f:
+        f.writelines(json.dumps(e) + '\n' for e in keep)
+    os.replace(tmp_path, catalog_path)
+    return removed
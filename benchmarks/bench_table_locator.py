@@ -0,0 +1,61 @@
+"""Benchmark the streaming table locator against the BeautifulSoup + read_html extract.
+
+Usage:
+    python benchmarks/bench_table_locator.py page1.html [page2.html ...]
+
+Pass archived copies of the Wikipedia "List of largest banks" page (for example saved
+from the Wayback Machine URL in config.yaml). The legacy path needs beautifulsoup4 and
+an HTML parser for pandas.read_html (lxml or html5lib); it is skipped if unavailable.
+"""
+
+import os
+import sys
+import timeit
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.html_tables import locate_table
+
+REQUIRED_HEADERS = ["Bank name", "Market cap"]
+
+
+def legacy_extract(html):
+    """The original extract(): full soup, table.text twice, str(table) re-parsed."""
+    from bs4 import BeautifulSoup
+    from io import StringIO
+
+    soup = BeautifulSoup(html, "html.parser")
+    for table in soup.find_all("table"):
+        if "Bank name" in table.text and "Market cap" in table.text:
+            return pd.read_html(StringIO(str(table)))[0]
+    return pd.DataFrame()
+
+
+def streaming_extract(html):
+    """The table locator used by extract() now."""
+    return locate_table(html, REQUIRED_HEADERS)
+
+
+def bench(path, repeat=5):
+    """Print the best time of ``repeat`` runs for both extract paths on one page."""
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    print(f"{path} ({len(html) / 1024:.0f} KiB)")
+    for name, func in (("legacy", legacy_extract), ("streaming", streaming_extract)):
+        try:
+            rows = len(func(html))
+            best = min(timeit.repeat(lambda f=func: f(html), number=1, repeat=repeat))
+        except ImportError as e:
+            print(f"  {name:<10} skipped ({e})")
+            continue
+        print(f"  {name:<10} {best * 1000:8.1f} ms  {rows} rows")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    for page in sys.argv[1:]:
+        bench(page)
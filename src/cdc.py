@@ -0,0 +1,152 @@
+"""Row-hash change data capture (CDC) for database loads.
+
+Each load stores a content hash per row, keyed on the table's natural key, in a
+side table named ``<table>_row_hashes``. The next load hashes the new snapshot,
+compares it with the stored hashes and writes only the inserted, updated and
+deleted rows to the database, in a single transaction.
+"""
+
+from typing import Dict, List
+
+import pandas as pd
+import sqlalchemy
+from sqlalchemy import inspect
+
+HASH_TABLE_SUFFIX = "_row_hashes"
+
+
+def row_hashes(data_frame: pd.DataFrame, key: str) -> pd.Series:
+    """Hash the content of every row of ``data_frame``.
+
+    Values are hashed in their text form, so a row keeps its hash when a column
+    is read back with a different dtype (``"1"`` and ``1`` hash the same).
+
+    Returns:
+        pandas.Series: Hex digests indexed by the natural key (as text)
+    """
+    content = data_frame.astype(str)
+    hashes = pd.util.hash_pandas_object(content, index=False)
+    return pd.Series(
+        [f"{h:016x}" for h in hashes.to_numpy()],
+        index=data_frame[key].astype(str).to_numpy(),
+        name="row_hash",
+    )
+
+
+def diff_rows(data_frame: pd.DataFrame, key: str, previous: pd.Series) -> Dict:
+    """Compare a snapshot with the hashes of the previous load.
+
+    Args:
+        data_frame (pandas.DataFrame): New snapshot, unique on ``key``
+        key (str): Natural key column
+        previous (pandas.Series): Hashes of the previous load, indexed by key
+
+    Returns:
+        dict: ``inserts`` and ``updates`` DataFrames, ``deletes`` list of keys
+        and the ``hashes`` of the inserted and updated rows
+    """
+    hashes = row_hashes(data_frame, key)
+    keys = pd.Index(hashes.index)
+    known = keys.isin(previous.index)
+    changed = known & (hashes.to_numpy() != previous.reindex(keys).to_numpy())
+    return {
+        "inserts": data_frame[~known],
+        "updates": data_frame[changed],
+        "deletes": list(previous.index[~previous.index.isin(keys)]),
+        "hashes": hashes[~known | changed],
+    }
+
+
+def load_previous_hashes(connection, table_name: str) -> pd.Series:
+    """Read the stored row hashes of ``table_name``, empty if there are none yet."""
+    hash_table = table_name + HASH_TABLE_SUFFIX
+    if not inspect(connection).has_table(hash_table):
+        return pd.Series(dtype=object, name="row_hash")
+    stored = pd.read_sql(sqlalchemy.text(f"SELECT * FROM {hash_table}"), connection)
+    return pd.Series(
+        stored["row_hash"].to_numpy(), index=stored["row_key"].astype(str), name="row_hash"
+    )
+
+
+def _records(data_frame: pd.DataFrame) -> List[Dict]:
+    """Convert a frame to parameter dicts with NaN replaced by None."""
+    return data_frame.astype(object).where(data_frame.notna(), None).to_dict("records")
+
+
+def _params(columns) -> Dict[str, str]:
+    """Map column names to bind parameter names safe for any dialect."""
+    return {column: f"p{i}" for i, column in enumerate(columns)}
+
+
+def apply_changes(data_frame: pd.DataFrame, engine, table_name: str, key: str) -> Dict:
+    """Write only the differences between ``data_frame`` and the previous load.
+
+    The first load (no hash table yet) replaces the table, like the plain
+    ``to_sql(if_exists="replace")`` loads did, and records the hashes.
+
+    Args:
+        data_frame (pandas.DataFrame): Transformed snapshot to load
+        engine (sqlalchemy.engine.Engine): Target database
+        table_name (str): Target table
+        key (str): Natural key column (e.g. ``Country``, ``Name``, ``Film``)
+
+    Returns:
+        dict: Number of inserted, updated and deleted rows
+    """
+    if data_frame[key].duplicated().any():
+        print(f"Warning: duplicate {key} values, keeping the first occurrence.")
+        data_frame = data_frame.drop_duplicates(key)
+
+    hash_table = table_name + HASH_TABLE_SUFFIX
+    with engine.begin() as connection:
+        previous = load_previous_hashes(connection, table_name)
+        if previous.empty or not inspect(connection).has_table(table_name):
+            previous = pd.Series(dtype=object, name="row_hash")
+            for name in (table_name, hash_table):
+                connection.execute(sqlalchemy.text(f"DROP TABLE IF EXISTS {name}"))
+            data_frame.head(0).to_sql(name=table_name, con=connection, index=False)
+        changes = diff_rows(data_frame, key, previous)
+        quote = connection.dialect.identifier_preparer.quote
+        params = _params(data_frame.columns)
+
+        if changes["deletes"]:
+            connection.execute(
+                sqlalchemy.text(f"DELETE FROM {table_name} WHERE {quote(key)} = :k"),
+                [{"k": k} for k in changes["deletes"]],
+            )
+        if not changes["updates"].empty:
+            assignments = ", ".join(
+                f"{quote(c)} = :{params[c]}" for c in data_frame.columns if c != key
+            )
+            connection.execute(
+                sqlalchemy.text(
+                    f"UPDATE {table_name} SET {assignments} "
+                    f"WHERE {quote(key)} = :{params[key]}"
+                ),
+                [
+                    {params[c]: v for c, v in row.items()}
+                    for row in _records(changes["updates"])
+                ],
+            )
+        if not changes["inserts"].empty:
+            changes["inserts"].to_sql(
+                name=table_name, con=connection, if_exists="append", index=False
+            )
+
+        # Keep the stored hashes in step with the table, again writing only deltas
+        stale = changes["deletes"] + list(changes["updates"][key].astype(str))
+        if stale:
+            connection.execute(
+                sqlalchemy.text(f"DELETE FROM {hash_table} WHERE row_key = :k"),
+                [{"k": k} for k in stale],
+            )
+        hashes = changes["hashes"]
+        pd.DataFrame({"row_key": hashes.index, "row_hash": hashes.to_numpy()}).to_sql(
+            name=hash_table, con=connection, if_exists="append", index=False
+        )
+
+    return {
+        "inserted": len(changes["inserts"]),
+        "updated": len(changes["updates"]),
+        "deleted": len(changes["deletes"]),
+    }
@@ -10,7 +10,7 @@ import glob
 import os
 import sys
 import xml.etree.ElementTree as ET
-from typing import List
+from typing import Iterator, List
 
 # Third-party library imports
 import pandas as pd
@@ -20,7 +20,11 @@ from pandas import DataFrame
 # Add the 'src' directory to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from src.fanout import fan_out, sinks_from_config
+from src.lineage import LineageStore
+from src.pipeline import file_source, map_chunks, run_pipeline, source_files
 from src.utils import log_progress
+from src.validation import Validator, save_report, summarize
 
 # Load configuration from config.yaml
 config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../config.yaml")
@@ -32,6 +36,13 @@ base_path = os.path.abspath(os.path.dirname(__file__))
 log_file = os.path.join(base_path, config["etl_car"]["logging"]["location"])
 target_file = os.path.join(base_path, "../output/car_data.csv")
 data_folder = os.path.join(base_path, "../data_car")
+load_config = config["etl_car"].get("load", {}).get(
+    "sinks", [{"type": "csv", "location": "../output/car_data.csv"}]
+)
+validation_config = config["etl_car"].get("validation", {})
+validation_report = os.path.join(
+    base_path, validation_config.get("report", "../output/validation_car.json")
+)
 
 # Ensure directories exist
 os.makedirs(os.path.dirname(log_file), exist_ok=True)
@@ -138,50 +149,49 @@ def extract_from_xml(file_to_process: str) -> pd.DataFrame:
             columns=["year_of_manufacture", "price", "fuel", "car_model"]
         )
 
-def extract() -> pd.DataFrame:
-    """Extract data from CSV, JSON, and XML files in the data folder."""
-    data_frames = []
-    columns = ["year_of_manufacture", "price", "fuel", "car_model"]
-    files_processed = 0
-
-    for csvfile in glob.glob(f"{data_folder}/*.csv"):
-        if csvfile != target_file:
-            df = extract_from_csv(csvfile)
-            if df.empty or df["car_model"].isna().all():
-                log_progress(f"Warning: No car_model data in {csvfile}", log_file)
-            data_frames.append(df)
-            files_processed += 1
-
-    for jsonfile in glob.glob(f"{data_folder}/*.json"):
-        df = extract_from_json(jsonfile)
-        if df.empty or df["car_model"].isna().all():
-            log_progress(f"Warning: No car_model data in {jsonfile}", log_file)
-        data_frames.append(df)
-        files_processed += 1
+COLUMNS = ["year_of_manufacture", "price", "fuel", "car_model"]
 
-    for xmlfile in glob.glob(f"{data_folder}/*.xml"):
-        df = extract_from_xml(xmlfile)
+def _warn_without_car_model(reader):
+    """Wrap a reader so that files without car_model data are logged."""
+    def read(file_to_process: str) -> pd.DataFrame:
+        df = reader(file_to_process)
         if df.empty or df["car_model"].isna().all():
-            log_progress(f"Warning: No car_model data in {xmlfile}", log_file)
-        data_frames.append(df)
+            log_progress(f"Warning: No car_model data in {file_to_process}", log_file)
+        return df
+    return read
+
+READERS = {
+    "csv": _warn_without_car_model(extract_from_csv),
+    "json": _warn_without_car_model(extract_from_json),
+    "xml": _warn_without_car_model(extract_from_xml),
+}
+
+def extract_chunks() -> Iterator[pd.DataFrame]:
+    """Source stage: extract the CSV, JSON and XML files of the data folder, one chunk per file."""
+    files_processed = 0
+    for df in file_source(data_folder, READERS, exclude=[target_file]):
         files_processed += 1
+        if not df.empty:
+            yield df
 
     if files_processed == 0:
         log_progress("Warning: No files found to process.", log_file)
-        return pd.DataFrame(columns=columns)
-
-    data_frame = pd.concat(data_frames, ignore_index=True)
-    if data_frame["car_model"].isna().any():
-        log_progress(
-            f"Warning: {data_frame['car_model'].isna().sum()} rows have missing car_model values.",
-            log_file,
-        )
 
-    return data_frame
+def extract() -> pd.DataFrame:
+    """Extract data from CSV, JSON, and XML files in the data folder."""
+    data_frames = list(extract_chunks())
+    if not data_frames:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(data_frames, ignore_index=True)
 
 def transform(data: pd.DataFrame) -> pd.DataFrame:
     """Transform price into two decimal points and handle missing car_model."""
     data["price"] = data["price"].astype(float).round(2)
+    if data["car_model"].isna().any():
+        log_progress(
+            f"Warning: {data['car_model'].isna().sum()} rows have missing car_model values.",
+            log_file,
+        )
     data["car_model"] = data["car_model"].fillna("Unknown")
     return data
 
@@ -189,34 +199,34 @@ def load_data(output_path: str, data_frame: pd.DataFrame) -> None:
     """Load the data into a target CSV file."""
     data_frame.to_csv(output_path, index=False)
 
-# Run ETL process
-log_progress("Preliminaries complete. Initiating ETL process", log_file)
-# Log the beginning of the Extraction process
-# with open(log_file, "a", encoding="utf-8") as f:
-#     f.write("\nExtract phase Started!\n")
-extracted_data = extract()
-
-log_progress("Data extraction complete. Initiating Transformation process", log_file)
-
-# # Log the completion of the Extraction process
-# with open(log_file, "a", encoding="utf-8") as f:
-#     f.write("\nExtract phase Ended!\n")
-
-# # Log the beginning of the Transformation process
-# with open(log_file, "a", encoding="utf-8") as f:
-#     f.write("\nTransform phase Started!\n")
-transformed_data = transform(extracted_data)
-print("Transformed Data")
-print(transformed_data)
-log_progress("Data transformation complete. Initiating loading process", log_file)
-
-# # Log the completion of the Transformation process
-# with open(log_file, "a", encoding="utf-8") as f:
-#     f.write("\nTransform phase Ended!\n")
-
-# # Log the beginning of the Loading process
-# with open(log_file, "a", encoding="utf-8") as f:
-#     f.write("\nLoad phase Started!\n")
-load_data(output_path=target_file, data_frame=transformed_data)
-log_progress("Data saved to CSV file", log_file)
-log_progress("ETL Job Ended!", log_file)
\ No newline at end of file
+
+if __name__ == "__main__":
+    # Run ETL process: files are read, transformed and written as a stream of chunks
+    log_progress("Preliminaries complete. Initiating ETL process", log_file)
+    # The extracted rows are validated on their way to the transformation
+    validator = Validator.from_config(validation_config)
+    with LineageStore().start_run("etl_car") as run:
+        for input_file in source_files(data_folder, READERS, exclude=[target_file]):
+            run.record_input(input_file)
+        loaded = run_pipeline(
+            run.timed_source("extract", extract_chunks()),
+            map_chunks(run.timed("validate", validator.update)),
+            map_chunks(run.timed("transform", transform)),
+            sink=run.timed_sink(
+                "load", fan_out(sinks_from_config(load_config, base_path, COLUMNS))
+            ),
+        )
+        for entry in load_config:
+            run.record_output(
+                os.path.join(base_path, entry["location"]), loaded[entry.get("name", entry["type"])]
+            )
+        rows_loaded = max(loaded.values(), default=0)
+        validation = validator.report()
+        for line in summarize(validation):
+            log_progress(line, log_file)
+        save_report(validation, validation_report)
+        run.record_output(validation_report)
+        if validation_config.get("fail_on_error") and not validation["passed"]:
+            raise SystemExit(f"Validation failed, see {validation_report}")
+    log_progress(f"{rows_loaded} rows extracted, transformed and saved to CSV file", log_file)
+    log_progress("ETL Job Ended!", log_file)
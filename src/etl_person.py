@@ -27,7 +27,11 @@ from datetime import datetime
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # Import local modules
+from src.fanout import fan_out, sinks_from_config
+from src.lineage import LineageStore
+from src.pipeline import file_source, map_chunks, run_pipeline, source_files
 from src.utils import log_progress
+from src.validation import Validator, save_report, summarize
 
 # Load configuration from config.yaml
 config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../config.yaml")
@@ -41,6 +45,13 @@ log_file = os.path.join(base_path, "../output/log_file_person.txt")
 os.makedirs(os.path.dirname(log_file), exist_ok=True)
 target_file = os.path.join(base_path, "../output/person_data.csv")
 data_folder = os.path.join(base_path, "../data_person")
+load_config = config["etl_person"].get("load", {}).get(
+    "sinks", [{"type": "csv", "location": "../output/person_data.csv"}]
+)
+validation_config = config["etl_person"].get("validation", {})
+validation_report = os.path.join(
+    base_path, validation_config.get("report", "../output/validation_person.json")
+)
 
 
 
@@ -87,6 +98,23 @@ def extract_from_xml(file_to_process):
     return dataframe
 
 
+COLUMNS = ["name", "height", "weight"]
+
+READERS = {"csv": extract_from_csv, "json": extract_from_json, "xml": extract_from_xml}
+
+
+# source stage of the pipeline: one chunk per file
+def extract_chunks():
+    """Extract the CSV, JSON and XML files of the data folder one file at a time.
+
+    Yields:
+        pandas.DataFrame: Data of one file, with name, height, and weight columns
+    """
+    for data_frame in file_source(data_folder, READERS, exclude=[target_file]):
+        if not data_frame.empty:
+            yield data_frame
+
+
 # write a function to call the respective function based on the file type
 def extract():
     """Extract data from CSV, JSON, and XML files in the data folder.
@@ -95,28 +123,10 @@ def extract():
         pandas.DataFrame: Combined data from all processed files with name,
                          height, and weight columns
     """
-    data_frame = pd.DataFrame(columns=["name", "height", "weight"])
-
-    # process all csv files in the data folder, except the target file
-    for csvfile in glob.glob(f"{data_folder}/*.csv"):
-        if csvfile != target_file:
-            data_frame = pd.concat(
-                [data_frame, extract_from_csv(csvfile)], ignore_index=True
-            )
-
-    # process all json files in the data folder
-    for jsonfile in glob.glob(f"{data_folder}/*.json"):
-        data_frame = pd.concat(
-            [data_frame, extract_from_json(jsonfile)], ignore_index=True
-        )
-
-    # process all xml files in the data folder
-    for xmlfile in glob.glob(f"{data_folder}/*.xml"):
-        data_frame = pd.concat(
-            [data_frame, extract_from_xml(xmlfile)], ignore_index=True
-        )
-
-    return data_frame
+    data_frames = list(extract_chunks())
+    if not data_frames:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(data_frames, ignore_index=True)
 
 
 # Transform the data
@@ -147,40 +157,33 @@ def load_data(output_path, data_frame):
 #     f.write("ETL Job Started!\n")
 
 
-log_progress("Preliminaries complete. Initiating ETL process", log_file)
-# Log the beginning of the Extraction process
-# with open(log_file, "a", encoding="utf-8") as f:
-#     f.write("\nExtract phase Started!\n")
-extracted_data = extract()
-
-log_progress("Data extraction complete. Initiating Transformation process", log_file)
-
-# # Log the completion of the Extraction process
-# with open(log_file, "a", encoding="utf-8") as f:
-#     f.write("\nExtract phase Ended!\n")
-
-# # Log the beginning of the Transformation process
-# with open(log_file, "a", encoding="utf-8") as f:
-#     f.write("\nTransform phase Started!\n")
-transformed_data = transform(extracted_data)
-print("Transformed Data")
-print(transformed_data)
-log_progress("Data transformation complete. Initiating loading process", log_file)
-
-# # Log the completion of the Transformation process
-# with open(log_file, "a", encoding="utf-8") as f:
-#     f.write("\nTransform phase Ended!\n")
-
-# # Log the beginning of the Loading process
-# with open(log_file, "a", encoding="utf-8") as f:
-#     f.write("\nLoad phase Started!\n")
-load_data(output_path=target_file, data_frame=transformed_data)
-log_progress("Data saved to CSV file", log_file)
-log_progress("ETL Job Ended!", log_file)
-# Log the completion of the Loading process
-# with open(log_file, "a", encoding="utf-8") as f:
-#     f.write("\nLoad phase Ended!\n")
-
-# Log the completion of the ETL process
-# with open(log_file, "a", encoding="utf-8") as f:
-#     f.write("\nETL Job Ended!\n")
+if __name__ == "__main__":
+    log_progress("Preliminaries complete. Initiating ETL process", log_file)
+    # Files are extracted, transformed and loaded as a stream of chunks, one per file
+    # The extracted rows are validated on their way to the transformation
+    validator = Validator.from_config(validation_config)
+    with LineageStore().start_run("etl_person") as run:
+        for input_file in source_files(data_folder, READERS, exclude=[target_file]):
+            run.record_input(input_file)
+        loaded = run_pipeline(
+            run.timed_source("extract", extract_chunks()),
+            map_chunks(run.timed("validate", validator.update)),
+            map_chunks(run.timed("transform", transform)),
+            sink=run.timed_sink(
+                "load", fan_out(sinks_from_config(load_config, base_path, COLUMNS))
+            ),
+        )
+        for entry in load_config:
+            run.record_output(
+                os.path.join(base_path, entry["location"]), loaded[entry.get("name", entry["type"])]
+            )
+        rows_loaded = max(loaded.values(), default=0)
+        validation = validator.report()
+        for line in summarize(validation):
+            log_progress(line, log_file)
+        save_report(validation, validation_report)
+        run.record_output(validation_report)
+        if validation_config.get("fail_on_error") and not validation["passed"]:
+            raise SystemExit(f"Validation failed, see {validation_report}")
+    log_progress(f"{rows_loaded} rows extracted, transformed and saved to CSV file", log_file)
+    log_progress("ETL Job Ended!", log_file)
@@ -0,0 +1,97 @@
+"""Time-indexed exchange rates and as-of joins for currency conversion.
+
+Rates are stored per currency as sorted NumPy arrays of dates and values, so the
+rate in force on any date is found with a binary search (``np.searchsorted``)
+instead of a per-row dictionary lookup.
+"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# Undated rate files (one rate per currency) are treated as valid since this date
+UNDATED_EFFECTIVE_DATE = pd.Timestamp("1970-01-01")
+
+
+class ExchangeRateStore:
+    """Sorted, binary-searchable store of exchange rates keyed on currency and date.
+
+    Args:
+        rates (pandas.DataFrame): Rates with ``Currency``, ``Rate`` and, optionally,
+            ``Date`` columns. Rows without a ``Date`` column apply from
+            ``UNDATED_EFFECTIVE_DATE`` onwards.
+    """
+
+    def __init__(self, rates: pd.DataFrame):
+        rates = rates.copy()
+        if "Date" not in rates.columns:
+            rates["Date"] = UNDATED_EFFECTIVE_DATE
+        rates["Date"] = pd.to_datetime(rates["Date"])
+        rates = rates.sort_values(["Currency", "Date"], kind="mergesort")
+        # Keep the last rate published for a currency on any given date
+        rates = rates.drop_duplicates(["Currency", "Date"], keep="last")
+
+        self._dates: Dict[str, np.ndarray] = {}
+        self._rates: Dict[str, np.ndarray] = {}
+        for currency, group in rates.groupby("Currency", sort=False):
+            self._dates[currency] = group["Date"].to_numpy(dtype="datetime64[ns]")
+            self._rates[currency] = group["Rate"].to_numpy(dtype="float64")
+
+    @classmethod
+    def from_csv(cls, path: str) -> "ExchangeRateStore":
+        """Build a store from a CSV file with ``Currency``, ``Rate`` and optional ``Date``."""
+        return cls(pd.read_csv(path))
+
+    @property
+    def currencies(self) -> list:
+        """Currencies available in the store."""
+        return list(self._rates)
+
+    def latest(self, currency: str) -> float:
+        """Return the most recent rate for ``currency``."""
+        return float(self._rates[currency][-1])
+
+    def rates_asof(self, currency: str, dates) -> np.ndarray:
+        """Return the latest rate at or before each of ``dates`` for ``currency``.
+
+        Dates before the first known rate map to NaN. Repeated dates are looked up
+        once, so millions of (bank, date) observations cost one search per distinct date.
+        """
+        codes, uniques = pd.factorize(pd.to_datetime(pd.Series(dates)), sort=False)
+        known_dates = self._dates[currency]
+        positions = np.searchsorted(
+            known_dates, uniques.to_numpy(dtype="datetime64[ns]"), side="right"
+        ) - 1
+        unique_rates = np.where(
+            positions >= 0, self._rates[currency][np.maximum(positions, 0)], np.nan
+        )
+        # Missing dates are factorized to code -1, which picks the trailing NaN
+        return np.append(unique_rates, np.nan)[codes]
+
+
+def asof_join(
+    df_data: pd.DataFrame,
+    store: ExchangeRateStore,
+    date_column: Optional[str] = "Date",
+    currencies: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """Attach the as-of exchange rate for each row as ``Rate_<currency>`` columns.
+
+    Args:
+        df_data (pandas.DataFrame): Observations to convert
+        store (ExchangeRateStore): Exchange rate store to search
+        date_column (str, optional): Column holding observation dates. When it is
+            None or missing from ``df_data``, the latest rate is used for every row.
+        currencies (iterable, optional): Currencies to join, all by default
+
+    Returns:
+        pandas.DataFrame: Copy of ``df_data`` with one rate column per currency
+    """
+    result = df_data.copy()
+    for currency in currencies or store.currencies:
+        if date_column is not None and date_column in result.columns:
+            result[f"Rate_{currency}"] = store.rates_asof(currency, result[date_column])
+        else:
+            result[f"Rate_{currency}"] = store.latest(currency)
+    return result
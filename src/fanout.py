@@ -0,0 +1,314 @@
+"""Concurrent fan-out of one chunk stream to several sinks.
+
+``fan_out`` builds a sink (in the sense of ``src/pipeline.py``) that hands
+every chunk to several sinks at once. Each sink consumes its own bounded queue
+in its own thread, so writing a CSV file, a columnar file and a database table
+overlap and the load takes about as long as the slowest sink, not the sum of
+them. The chunks reach the sinks as ``EncodedChunk`` objects that encode their
+DataFrame lazily and only once: two sinks that need the same encoding (CSV
+text, typed column arrays or database records) share it.
+
+Sinks can be configured in config.yaml, e.g.
+
+    load:
+      sinks:
+        - {type: csv, location: ../output/car_data.csv}
+        - {type: columnar, location: ../output/car_data.npz}
+        - {type: sql, location: ../output/car_data.db, table: car_data}
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+_END = object()
+
+
+class StreamAborted(Exception):
+    """Raised inside the sinks when the stream fails before its end."""
+
+
+class _Abort:
+    """Queue item telling a sink that the stream failed."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _discard(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class EncodedChunk:
+    """A DataFrame chunk with its encodings, each computed once on first use.
+
+    The sink threads share one object per chunk and must not modify ``frame``.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def _encoded(self, name: str, encode: Callable[[], Any]) -> Any:
+        with self._lock:
+            if name not in self._cache:
+                self._cache[name] = encode()
+            return self._cache[name]
+
+    def csv(self) -> str:
+        """The rows as CSV text, without header."""
+        return self._encoded("csv", lambda: self.frame.to_csv(index=False, header=False))
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Typed NumPy array of every column; text columns become fixed-width unicode."""
+
+        def encode():
+            arrays = {}
+            for column in self.frame.columns:
+                values = self.frame[column].to_numpy()
+                arrays[str(column)] = values.astype(str) if values.dtype == object else values
+            return arrays
+
+        return self._encoded("arrays", encode)
+
+    def records(self) -> List[tuple]:
+        """The rows as tuples of Python values (None for missing), for database drivers."""
+
+        def encode():
+            values = self.frame.astype(object).where(self.frame.notna(), None)
+            return list(values.itertuples(index=False, name=None))
+
+        return self._encoded("records", encode)
+
+
+def frame_sink(sink: Callable[[Iterable[pd.DataFrame]], Any]) -> Callable:
+    """Adapt a sink of DataFrames (e.g. ``pipeline.csv_sink``) to ``fan_out``."""
+
+    def consume(chunks: Iterable[EncodedChunk]):
+        return sink(chunk.frame for chunk in chunks)
+
+    return consume
+
+
+def csv_file_sink(path: str, columns: Optional[List[str]] = None) -> Callable:
+    """Sink writing the shared CSV text of every chunk to one file.
+
+    Returns:
+        Sink function returning the number of rows written
+    """
+
+    def write(chunks: Iterable[EncodedChunk]) -> int:
+        rows = 0
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                header = None
+                for chunk in chunks:
+                    if header is None:
+                        header = list(chunk.frame.columns)
+                        f.write(pd.DataFrame(columns=header).to_csv(index=False))
+                    f.write(chunk.csv())
+                    rows += len(chunk)
+                if header is None:
+                    f.write(pd.DataFrame(columns=columns).to_csv(index=False))
+        except BaseException:
+            # The previous file stays in place when the stream fails
+            _discard(tmp_path)
+            raise
+        os.replace(tmp_path, path)
+        return rows
+
+    return write
+
+
+def columnar_sink(path: str) -> Callable:
+    """Sink writing all chunks to one compressed ``.npz`` file, one array per column.
+
+    The file is written once the stream ends; chunks are kept as their typed
+    column arrays until then.
+
+    Returns:
+        Sink function returning the number of rows written
+    """
+
+    def write(chunks: Iterable[EncodedChunk]) -> int:
+        parts: Dict[str, list] = {}
+        rows = 0
+        for chunk in chunks:
+            for column, values in chunk.arrays().items():
+                parts.setdefault(column, []).append(values)
+            rows += len(chunk)
+        arrays = {column: np.concatenate(part) for column, part in parts.items()}
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(f, **arrays)
+        except BaseException:
+            _discard(tmp_path)
+            raise
+        os.replace(tmp_path, path)
+        return rows
+
+    return write
+
+
+def sql_sink(
+    connect: Callable[[], Any],
+    table: str,
+    replace: bool = True,
+    placeholder: str = "?",
+) -> Callable:
+    """Sink inserting all chunks into a database table in one transaction.
+
+    The transaction is rolled back when the stream or an insert fails, so a
+    replaced table keeps its previous rows.
+
+    Args:
+        connect: Function returning a DB-API connection, e.g. ``lambda: sqlite3.connect(path)``
+        table: Target table; created with the chunk's columns if it does not exist
+        replace: Delete the previous rows of the table first
+        placeholder: Parameter marker of the driver ("?" for sqlite3, "%s" for MySQL)
+
+    Returns:
+        Sink function returning the number of rows inserted
+    """
+
+    def write(chunks: Iterable[EncodedChunk]) -> int:
+        conn = connect()
+        rows = 0
+        try:
+            cursor = conn.cursor()
+            insert = None
+            for chunk in chunks:
+                if insert is None:
+                    columns = ", ".join(f'"{column}"' for column in chunk.frame.columns)
+                    cursor.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({columns})')
+                    if replace:
+                        cursor.execute(f'DELETE FROM "{table}"')
+                    markers = ", ".join([placeholder] * len(chunk.frame.columns))
+                    insert = f'INSERT INTO "{table}" ({columns}) VALUES ({markers})'
+                cursor.executemany(insert, chunk.records())
+                rows += len(chunk)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return rows
+
+    return write
+
+
+def sinks_from_config(
+    entries: List[Dict], base_path: str, columns: Optional[List[str]] = None
+) -> Dict[str, Callable]:
+    """Build the sinks of a ``load.sinks`` config list.
+
+    Entries have a ``type`` (csv, columnar or sql), a ``location`` relative to
+    ``base_path`` and, for sql, a ``table``; ``name`` defaults to the type.
+    """
+    sinks = {}
+    for entry in entries:
+        location = os.path.join(base_path, entry["location"])
+        os.makedirs(os.path.dirname(location), exist_ok=True)
+        if entry["type"] == "csv":
+            sink = csv_file_sink(location, columns)
+        elif entry["type"] == "columnar":
+            sink = columnar_sink(location)
+        elif entry["type"] == "sql":
+            sink = sql_sink(
+                lambda location=location: sqlite3.connect(location),
+                entry["table"],
+                replace=entry.get("replace", True),
+            )
+        else:
+            raise ValueError(f"Unknown sink type {entry['type']!r}")
+        sinks[entry.get("name", entry["type"])] = sink
+    return sinks
+
+
+def _queue_iterator(buffer: queue.Queue) -> Iterator[EncodedChunk]:
+    while True:
+        item = buffer.get()
+        if item is _END:
+            return
+        if isinstance(item, _Abort):
+            raise StreamAborted(f"Stream failed: {item.error}") from item.error
+        yield item
+
+
+def fan_out(sinks: Dict[str, Callable], queue_size: int = 2) -> Callable:
+    """Sink feeding every chunk to all ``sinks`` concurrently, one thread per sink.
+
+    Each sink receives the stream as ``EncodedChunk`` objects through a queue
+    of ``queue_size`` chunks, so a slow sink holds back the stream instead of
+    buffering it. If the stream or a sink fails before the stream ends, the
+    sinks get ``StreamAborted`` from their iterator instead of a normal end, so
+    none of them commits a partial load (files are not replaced, transactions
+    roll back), and the stream's error or the first sink error is raised.
+
+    Returns:
+        Sink function returning the result of every sink, by name
+    """
+
+    def load(chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+        buffers = {name: queue.Queue(maxsize=queue_size) for name in sinks}
+        results: Dict[str, Any] = {}
+        errors: Dict[str, BaseException] = {}
+
+        def consume(name: str):
+            iterator = _queue_iterator(buffers[name])
+            try:
+                results[name] = sinks[name](iterator)
+            except Exception as e:  # pylint: disable=broad-except
+                errors[name] = e
+            # Drain the queue, so the feeder never blocks on a sink that stopped
+            try:
+                for _ in iterator:
+                    pass
+            except StreamAborted:
+                pass
+
+        threads = [threading.Thread(target=consume, args=(name,), daemon=True) for name in sinks]
+        for thread in threads:
+            thread.start()
+        end = _END
+        try:
+            for frame in chunks:
+                if errors:
+                    break
+                chunk = EncodedChunk(frame)
+                for buffer in buffers.values():
+                    buffer.put(chunk)
+            if errors:
+                end = _Abort(next(iter(errors.values())))
+        except BaseException as e:
+            end = _Abort(e)
+            raise
+        finally:
+            for buffer in buffers.values():
+                buffer.put(end)
+            for thread in threads:
+                thread.join()
+        if errors:
+            name, error = next(iter(errors.items()))
+            raise RuntimeError(f"Sink {name} failed: {error}") from error
+        return results
+
+    return load
+
+
+def load_frame(frame: pd.DataFrame, sinks: Dict[str, Callable]) -> Dict[str, Any]:
+    """Write one DataFrame to all ``sinks`` concurrently."""
+    return fan_out(sinks)([frame])
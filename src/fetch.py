@@ -0,0 +1,182 @@
+"""Asyncio fetch layer shared by the web-sourced ETL jobs.
+
+Pages are downloaded concurrently with a bound on requests in flight, a minimum
+interval between requests to the same host, and retries with exponential backoff.
+``fetch_and_parse`` hands each page to a process pool as soon as it arrives, so
+CPU-bound parsing of one page overlaps with the download of the others.
+``fetch_streamed`` feeds a page to a parser in text chunks while it downloads,
+so a parser that stops early (e.g. ``html_tables.locate_table``) saves the
+download of the rest of the page.
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+# Status codes worth retrying, anything else >= 400 fails immediately
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Characters per text chunk of a streamed page
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class Fetcher:
+    """Concurrent, rate-limited HTTP fetcher.
+
+    Args:
+        max_concurrency (int): Maximum number of requests in flight
+        per_host_interval (float): Minimum seconds between requests to one host
+        retries (int): Retries after the first failed attempt
+        backoff (float): Base delay in seconds, doubled after every retry
+        timeout (float): Timeout of each request in seconds
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 4,
+        per_host_interval: float = 1.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 10,
+    ):
+        self.max_concurrency = max_concurrency
+        self.per_host_interval = per_host_interval
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        # Event loop, semaphore and per-host locks, created for the running loop
+        self._loop_state: Optional[tuple] = None
+        self._next_request: Dict[str, float] = {}
+
+    def _bind_loop(self, loop: asyncio.AbstractEventLoop) -> Tuple:
+        """Return the semaphore and host locks of ``loop``, creating them if needed."""
+        if self._loop_state is None or self._loop_state[0] is not loop:
+            self._loop_state = (loop, asyncio.Semaphore(self.max_concurrency), {})
+        return self._loop_state[1:]
+
+    async def _wait_for_host(self, host: str, host_locks: Dict[str, asyncio.Lock]):
+        """Sleep until ``host`` may receive another request."""
+        lock = host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            delay = self._next_request.get(host, 0.0) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_request[host] = time.monotonic() + self.per_host_interval
+
+    def _get(self, url: str, stream: bool = False) -> requests.Response:
+        response = requests.get(url, timeout=self.timeout, stream=stream)
+        response.encoding = response.encoding or "utf-8"
+        return response
+
+    async def _response(self, url: str, stream: bool = False) -> requests.Response:
+        """Request ``url`` until it succeeds, retrying transient failures.
+
+        With ``stream`` only the headers are read; the caller closes the response.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore, host_locks = self._bind_loop(loop)
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            await self._wait_for_host(host, host_locks)
+            try:
+                async with semaphore:
+                    response = await loop.run_in_executor(None, self._get, url, stream)
+                if response.status_code not in RETRY_STATUS:
+                    if response.status_code >= 400:
+                        response.close()
+                    response.raise_for_status()
+                    return response
+                response.close()
+                error = requests.HTTPError(f"{response.status_code} for {url}")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            if attempt == self.retries:
+                raise error
+            await asyncio.sleep(self.backoff * 2 ** attempt)
+        raise RuntimeError("unreachable")
+
+    async def fetch(self, url: str) -> str:
+        """Download ``url`` and return its text, retrying transient failures."""
+        return (await self._response(url)).text
+
+    async def fetch_streamed(self, url: str, consume: Callable[[Iterator[str]], Any]) -> Any:
+        """Stream ``url`` into ``consume`` as text chunks and return its result.
+
+        ``consume`` runs in a thread while the page downloads and counts against
+        the concurrency bound. The connection is closed when it returns, so the
+        rest of the page is not downloaded when it stops reading early. Retries
+        only cover the request, not failures while reading the body.
+        """
+        loop = asyncio.get_running_loop()
+        response = await self._response(url, stream=True)
+        semaphore, _ = self._bind_loop(loop)
+        try:
+            chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE, decode_unicode=True)
+            async with semaphore:
+                return await loop.run_in_executor(None, consume, chunks)
+        finally:
+            response.close()
+
+    async def fetch_all(self, urls: List[str]) -> List[str]:
+        """Download all ``urls`` concurrently, returning texts in the same order."""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+
+# A job is (source, parser, parser keyword arguments). The source is a URL or a
+# saved HTML file; parser(html, **kwargs) must be a module-level function so it
+# can run in a worker process.
+Job = Tuple[str, Callable, Dict]
+
+
+async def fetch_and_parse(
+    jobs: List[Job],
+    fetcher: Optional[Fetcher] = None,
+    parse_workers: Optional[int] = None,
+) -> List:
+    """Download every job's source and parse it in a process pool as soon as it arrives.
+
+    Returns:
+        list: Parser results, in the order of ``jobs``
+    """
+    fetcher = fetcher or Fetcher()
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=parse_workers) as pool:
+
+        async def run(job: Job):
+            source, parser, kwargs = job
+            if os.path.isfile(source):
+                html = await loop.run_in_executor(None, _read_file, source)
+            else:
+                html = await fetcher.fetch(source)
+            return await loop.run_in_executor(pool, _call_parser, parser, html, kwargs)
+
+        return await asyncio.gather(*(run(job) for job in jobs))
+
+
+def _read_file(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _call_parser(parser: Callable, html: str, kwargs: Dict):
+    return parser(html, **kwargs)
+
+
+def run_jobs(jobs: List[Job], **kwargs) -> List:
+    """Synchronous entry point for ``fetch_and_parse``."""
+    return asyncio.run(fetch_and_parse(jobs, **kwargs))
+
+
+def fetch_text(url: str, **kwargs) -> str:
+    """Download a single page with the retry and rate-limit settings of ``Fetcher``."""
+    return asyncio.run(Fetcher(**kwargs).fetch(url))
+
+
+def fetch_streamed(url: str, consume: Callable[[Iterator[str]], Any], **kwargs) -> Any:
+    """Stream a single page into ``consume`` with the settings of ``Fetcher``."""
+    return asyncio.run(Fetcher(**kwargs).fetch_streamed(url, consume))
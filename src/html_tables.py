@@ -0,0 +1,158 @@
+"""Streaming HTML table locator.
+
+Finds a table by the text of its header cells while the document is still being
+read, stops as soon as that table closes (or enough rows were collected), and
+builds the DataFrame straight from the collected cells, without building a full
+document tree or re-parsing the table.
+"""
+
+from html.parser import HTMLParser
+from typing import Iterable, List, Optional, Union
+
+import pandas as pd
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _TableState:
+    """Parsing state of one open ``<table>`` element."""
+
+    def __init__(self, skip: bool):
+        self.skip = skip
+        self.row: Optional[List[str]] = None
+        self.cell: Optional[List[str]] = None
+
+
+class TableLocator(HTMLParser):
+    """Incremental parser that collects the first table matching ``required_headers``.
+
+    A table matches when every required header is contained in one of the cells
+    of its first row. Other tables are skipped once their first row is read.
+    ``colspan`` and ``rowspan`` are not expanded, which is fine for the flat
+    tables we scrape.
+
+    Args:
+        required_headers (list): Header texts (substrings) the table must have
+        max_rows (int, optional): Stop after this many body rows of the table
+    """
+
+    def __init__(self, required_headers: List[str], max_rows: Optional[int] = None):
+        super().__init__(convert_charrefs=True)
+        self.required_headers = list(required_headers)
+        self.max_rows = max_rows
+        self.header: Optional[List[str]] = None
+        self.rows: List[List[str]] = []
+        self.done = False
+        self._tables: List[_TableState] = []
+        self._target: Optional[_TableState] = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "table":
+            # Once the target is found, tables nested inside it are ignored
+            self._tables.append(_TableState(skip=self._target is not None))
+            return
+        if not self._tables or self._tables[-1].skip:
+            return
+        table = self._tables[-1]
+        if tag == "tr":
+            self._end_row(table)
+            table.row = []
+        elif tag in ("td", "th") and table.row is not None:
+            self._end_cell(table)
+            table.cell = []
+        elif tag == "br" and table.cell is not None:
+            table.cell.append(" ")
+
+    def handle_data(self, data):
+        if self._tables and self._tables[-1].cell is not None:
+            self._tables[-1].cell.append(data)
+
+    def handle_endtag(self, tag):
+        if self.done or not self._tables:
+            return
+        table = self._tables[-1]
+        if tag == "table":
+            self._end_row(table)
+            self._tables.pop()
+            if table is self._target:
+                self.done = True
+        elif table.skip:
+            return
+        elif tag in ("td", "th"):
+            self._end_cell(table)
+        elif tag == "tr":
+            self._end_row(table)
+
+    @staticmethod
+    def _end_cell(table: _TableState):
+        if table.cell is not None:
+            table.row.append(" ".join("".join(table.cell).split()))
+            table.cell = None
+
+    def _end_row(self, table: _TableState):
+        if table.skip or table.row is None:
+            return
+        self._end_cell(table)
+        row, table.row = table.row, None
+        if not row:
+            return
+        if table is self._target:
+            self.rows.append(row)
+            if self.max_rows is not None and len(self.rows) >= self.max_rows:
+                self.done = True
+        elif self._target is None and self._matches(row):
+            self._target = table
+            self.header = row
+        else:
+            # First row does not carry the headers we want, skip the table
+            table.skip = True
+
+    def _matches(self, row: List[str]) -> bool:
+        return all(any(name in cell for cell in row) for name in self.required_headers)
+
+    def to_frame(self) -> Optional[pd.DataFrame]:
+        """Return the located table as a DataFrame, or None if it was not found."""
+        if self.header is None:
+            return None
+        width = len(self.header)
+        cells = [(row + [None] * width)[:width] for row in self.rows]
+        data_frame = pd.DataFrame(cells, columns=self.header)
+        for name in data_frame.columns:
+            data_frame[name] = _coerce_numeric(data_frame[name])
+        return data_frame
+
+
+def _coerce_numeric(column: pd.Series) -> pd.Series:
+    """Convert a text column to numbers when every non-empty cell is numeric."""
+    converted = pd.to_numeric(column.str.replace(",", "", regex=False), errors="coerce")
+    if converted.notna().sum() == (column.notna() & (column != "")).sum():
+        return converted
+    return column
+
+
+def locate_table(
+    html: Union[str, Iterable[str]],
+    required_headers: List[str],
+    max_rows: Optional[int] = None,
+) -> Optional[pd.DataFrame]:
+    """Stream ``html`` through a TableLocator and return the matching table.
+
+    Args:
+        html (str or iterable of str): Whole document, or its chunks as they arrive
+        required_headers (list): Header texts (substrings) the table must have
+        max_rows (int, optional): Stop after this many body rows
+
+    Returns:
+        pandas.DataFrame or None: The table, or None when no table matched
+    """
+    chunks = html
+    if isinstance(html, str):
+        chunks = (html[i:i + CHUNK_SIZE] for i in range(0, len(html), CHUNK_SIZE))
+    locator = TableLocator(required_headers, max_rows=max_rows)
+    for chunk in chunks:
+        locator.feed(chunk)
+        if locator.done:
+            break
+    return locator.to_frame()
@@ -0,0 +1,435 @@
+"""Run lineage and throughput history of the ETL jobs.
+
+Every job run is recorded in a local SQLite database (``lineage.location`` in
+config.yaml) with its run ID, status and duration, the time and rows of each
+stage, fingerprints of the input files and the locations of its outputs. The
+scheduler sets ``ETL_BATCH_ID`` for the jobs it starts, so the runs of one batch
+can be grouped. The report compares the throughput of each job's latest run with
+the median of its previous runs, so performance regressions stand out:
+
+    python3 src/lineage.py report --job etl_car
+    python3 src/lineage.py show <run_id>
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Iterable, Iterator, Optional
+
+import pandas as pd
+import yaml
+
+base_path = os.path.abspath(os.path.dirname(__file__))
+config_path = os.path.join(base_path, "../config.yaml")
+
+BATCH_ENV = "ETL_BATCH_ID"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    job TEXT NOT NULL,
+    batch_id TEXT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    duration REAL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_runs_job ON runs (job, started_at);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id TEXT NOT NULL REFERENCES runs (run_id),
+    stage TEXT NOT NULL,
+    duration REAL NOT NULL,
+    rows INTEGER,
+    rows_per_sec REAL,
+    PRIMARY KEY (run_id, stage)
+);
+CREATE TABLE IF NOT EXISTS inputs (
+    run_id TEXT NOT NULL REFERENCES runs (run_id),
+    location TEXT NOT NULL,
+    size INTEGER,
+    modified_at TEXT,
+    sha256 TEXT
+);
+CREATE TABLE IF NOT EXISTS outputs (
+    run_id TEXT NOT NULL REFERENCES runs (run_id),
+    location TEXT NOT NULL,
+    size INTEGER,
+    rows INTEGER
+);
+"""
+
+
+def default_path() -> str:
+    """Location of the lineage database configured in config.yaml."""
+    with open(config_path, "r", encoding="utf-8") as stream:
+        config = yaml.safe_load(stream)
+    location = config.get("lineage", {}).get("location", "../output/lineage.db")
+    return os.path.join(base_path, location)
+
+
+def file_fingerprint(path: str, checksum: bool = True) -> dict:
+    """Size, modification time and SHA-256 of a local file; only the location otherwise.
+
+    Without ``checksum`` the file is not read, e.g. for large databases.
+    """
+    if not os.path.isfile(path):
+        return {"location": path, "size": None, "modified_at": None, "sha256": None}
+    digest = None
+    if checksum:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return {
+        "location": os.path.abspath(path),
+        "size": os.path.getsize(path),
+        "modified_at": datetime.fromtimestamp(os.path.getmtime(path)).isoformat(),
+        "sha256": digest.hexdigest() if digest else None,
+    }
+
+
+def _rows(chunk) -> int:
+    return len(chunk) if hasattr(chunk, "__len__") else 1
+
+
+class _Records:
+    """Stages, inputs and outputs of a run, shared by the pipeline threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages: dict = {}
+        self.inputs: list = []
+        self.outputs: list = []
+
+
+class LineageRun:
+    """One run of a job, recorded when it finishes.
+
+    Stage timings may be added from several pipeline threads. Times measure the
+    work done inside a stage only, not the time it waits for its neighbours, so
+    ``rows_per_sec`` is the throughput of the stage itself.
+    """
+
+    def __init__(self, store: "LineageStore", job: str, run_id: Optional[str] = None,
+                 batch_id: Optional[str] = None):
+        self.store = store
+        self.job = job
+        self.run_id = run_id or f"{datetime.now():%Y%m%dT%H%M%S}-{os.urandom(3).hex()}"
+        self.batch_id = batch_id or os.environ.get(BATCH_ENV)
+        self.started_at = datetime.now().isoformat()
+        self._started = time.monotonic()
+        self._records = _Records()
+
+    def record_stage(self, stage: str, duration: float, rows: Optional[int] = None):
+        """Add ``duration`` seconds and ``rows`` rows to a stage."""
+        records = self._records
+        with records.lock:
+            total_duration, total_rows = records.stages.get(stage, (0.0, None))
+            if rows is not None:
+                total_rows = (total_rows or 0) + rows
+            records.stages[stage] = (total_duration + duration, total_rows)
+
+    @contextmanager
+    def stage(self, stage: str):
+        """Time the enclosed block as ``stage``; set ``.rows`` on the yielded counter."""
+        counter = SimpleNamespace(rows=None)
+        started = time.monotonic()
+        try:
+            yield counter
+        finally:
+            self.record_stage(stage, time.monotonic() - started, counter.rows)
+
+    def timed(self, stage: str, function: Callable) -> Callable:
+        """Wrap a per-chunk function (e.g. for ``map_chunks``) to time it as ``stage``."""
+
+        def wrapper(chunk):
+            started = time.monotonic()
+            result = function(chunk)
+            self.record_stage(stage, time.monotonic() - started,
+                              None if result is None else _rows(result))
+            return result
+
+        return wrapper
+
+    def timed_source(self, stage: str, chunks: Iterable) -> Iterator:
+        """Iterate over ``chunks``, timing the production of every chunk as ``stage``."""
+        iterator = iter(chunks)
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    self.record_stage(stage, time.monotonic() - started, 0)
+                    return
+                self.record_stage(stage, time.monotonic() - started, _rows(chunk))
+                yield chunk
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    def timed_sink(self, stage: str, sink: Callable) -> Callable:
+        """Wrap a sink to time it as ``stage``, excluding the time it waits for chunks."""
+
+        def wrapper(chunks: Iterable):
+            waiting = 0.0
+            rows = 0
+
+            def counted():
+                nonlocal waiting, rows
+                iterator = iter(chunks)
+                while True:
+                    started = time.monotonic()
+                    try:
+                        chunk = next(iterator)
+                    except StopIteration:
+                        waiting += time.monotonic() - started
+                        return
+                    waiting += time.monotonic() - started
+                    rows += _rows(chunk)
+                    yield chunk
+
+            started = time.monotonic()
+            try:
+                return sink(counted())
+            finally:
+                self.record_stage(stage, time.monotonic() - started - waiting, rows)
+
+        return wrapper
+
+    def record_input(self, path: str, checksum: bool = True):
+        """Record an input file (fingerprinted) or URL of the run."""
+        fingerprint = file_fingerprint(path, checksum)
+        with self._records.lock:
+            self._records.inputs.append(fingerprint)
+
+    def record_output(self, path: str, rows: Optional[int] = None):
+        """Record an output location of the run, with its size once written."""
+        size = os.path.getsize(path) if os.path.isfile(path) else None
+        location = os.path.abspath(path) if os.path.exists(path) else path
+        with self._records.lock:
+            self._records.outputs.append({"location": location, "size": size, "rows": rows})
+
+    def recorded(self) -> tuple:
+        """Copies of the stages, inputs and outputs recorded so far."""
+        records = self._records
+        with records.lock:
+            return dict(records.stages), list(records.inputs), list(records.outputs)
+
+    def finish(self, status: str = "succeeded"):
+        """Write the run and everything recorded for it to the lineage store."""
+        self.store.save_run(self, status, time.monotonic() - self._started)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.finish("failed" if exc_type else "succeeded")
+        return False
+
+
+class LineageStore:
+    """SQLite store of job runs with query helpers for their lineage and throughput.
+
+    Args:
+        path: Database file; None uses the location configured in config.yaml
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Jobs of a batch run in parallel processes and may finish at the same time
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def start_run(self, job: str, run_id: Optional[str] = None,
+                  batch_id: Optional[str] = None) -> LineageRun:
+        """Start recording a run of ``job``; use it as a context manager or call ``finish``."""
+        return LineageRun(self, job, run_id, batch_id)
+
+    def save_run(self, run: LineageRun, status: str, duration: float):
+        """Write ``run`` in one transaction."""
+        stages, inputs, outputs = run.recorded()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (run.run_id, run.job, run.batch_id, run.started_at,
+                     datetime.now().isoformat(), duration, status),
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO stages VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (run.run_id, stage, stage_duration, rows,
+                         rows / stage_duration if rows is not None and stage_duration > 0 else None)
+                        for stage, (stage_duration, rows) in stages.items()
+                    ],
+                )
+                conn.executemany(
+                    "INSERT INTO inputs VALUES (?, ?, ?, ?, ?)",
+                    [(run.run_id, i["location"], i["size"], i["modified_at"], i["sha256"])
+                     for i in inputs],
+                )
+                conn.executemany(
+                    "INSERT INTO outputs VALUES (?, ?, ?, ?)",
+                    [(run.run_id, o["location"], o["size"], o["rows"]) for o in outputs],
+                )
+        finally:
+            conn.close()
+
+    def _query(self, sql: str, params=()) -> pd.DataFrame:
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+
+    def runs(self, job: Optional[str] = None, last: Optional[int] = None) -> pd.DataFrame:
+        """Runs, newest first, optionally of one job and limited to the ``last`` ones."""
+        sql = "SELECT * FROM runs"
+        params: list = []
+        if job:
+            sql += " WHERE job = ?"
+            params.append(job)
+        sql += " ORDER BY started_at DESC"
+        if last:
+            sql += " LIMIT ?"
+            params.append(last)
+        return self._query(sql, params)
+
+    def stages(self, run_id: str) -> pd.DataFrame:
+        """Stage timings and throughput of one run."""
+        return self._query("SELECT * FROM stages WHERE run_id = ? ORDER BY stage", (run_id,))
+
+    def inputs(self, run_id: str) -> pd.DataFrame:
+        """Input files (with fingerprints) and URLs of one run."""
+        return self._query("SELECT * FROM inputs WHERE run_id = ?", (run_id,))
+
+    def outputs(self, run_id: str) -> pd.DataFrame:
+        """Output locations of one run."""
+        return self._query("SELECT * FROM outputs WHERE run_id = ?", (run_id,))
+
+    def throughput(self, job: Optional[str] = None, last: Optional[int] = None) -> pd.DataFrame:
+        """Stage throughput of successful runs, oldest first, one row per run and stage.
+
+        Returns:
+            DataFrame with job, run_id, started_at, stage, duration, rows and rows_per_sec
+        """
+        sql = """
+            SELECT r.job, r.run_id, r.started_at, s.stage, s.duration, s.rows, s.rows_per_sec
+            FROM runs r JOIN stages s ON s.run_id = r.run_id
+            WHERE r.status = 'succeeded'
+        """
+        params: list = []
+        if job:
+            sql += " AND r.job = ?"
+            params.append(job)
+        history = self._query(sql + " ORDER BY r.started_at", params)
+        if last:
+            recent = history.drop_duplicates("run_id").groupby("job").tail(last)["run_id"]
+            history = history[history["run_id"].isin(recent)].reset_index(drop=True)
+        return history
+
+    def trends(self, job: Optional[str] = None, last: int = 10,
+               threshold: float = 0.8) -> pd.DataFrame:
+        """Compare each stage's latest run with the median of the ``last`` runs before it.
+
+        A stage is flagged as a regression when its latest throughput (rows per
+        second, or the inverse duration for stages without rows) is below
+        ``threshold`` times the median.
+
+        Returns:
+            DataFrame with one row per job and stage
+        """
+        history = self.throughput(job, last + 1)
+        rows = []
+        for (job_name, stage), group in history.groupby(["job", "stage"], sort=True):
+            speed = group["rows_per_sec"].fillna(1 / group["duration"])
+            latest, previous = speed.iloc[-1], speed.iloc[:-1]
+            baseline = previous.median() if len(previous) else float("nan")
+            ratio = latest / baseline if pd.notna(baseline) and baseline > 0 else float("nan")
+            rows.append({
+                "job": job_name,
+                "stage": stage,
+                "runs": len(group),
+                "latest_run": group["run_id"].iloc[-1],
+                "latest_rows": group["rows"].iloc[-1],
+                "latest_duration": group["duration"].iloc[-1],
+                "latest_rows_per_sec": group["rows_per_sec"].iloc[-1],
+                "median_rows_per_sec": group["rows_per_sec"].iloc[:-1].median(),
+                "ratio": ratio,
+                "regression": bool(ratio < threshold),
+            })
+        return pd.DataFrame(rows)
+
+    def report(self, job: Optional[str] = None, last: int = 10, threshold: float = 0.8) -> str:
+        """Text report of the throughput trends, regressions marked."""
+        trends = self.trends(job, last, threshold)
+        if trends.empty:
+            return "No runs recorded."
+        lines = [f"{'job':<22} {'stage':<14} {'runs':>4} {'rows':>9} {'seconds':>9} "
+                 f"{'rows/s':>11} {'median':>11} {'ratio':>6}"]
+        for row in trends.itertuples():
+            lines.append(
+                f"{row.job:<22} {row.stage:<14} {row.runs:>4} {_number(row.latest_rows, 0):>9} "
+                f"{row.latest_duration:>9.3f} {_number(row.latest_rows_per_sec, 1):>11} "
+                f"{_number(row.median_rows_per_sec, 1):>11} {_number(row.ratio, 2):>6}"
+                + ("  REGRESSION" if row.regression else "")
+            )
+        return "\n".join(lines)
+
+
+def _number(value, decimals: int) -> str:
+    return "-" if pd.isna(value) else f"{value:,.{decimals}f}"
+
+
+def main(argv=None) -> int:
+    """Command line report of the lineage store; returns the exit code."""
+    parser = argparse.ArgumentParser(description="Report on the recorded ETL runs")
+    parser.add_argument("--db", help="Lineage database (default: lineage.location of config.yaml)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    report = commands.add_parser("report", help="Throughput trends across runs")
+    report.add_argument("--job", help="Only this job")
+    report.add_argument("--last", type=int, default=10, help="Previous runs in the baseline")
+    report.add_argument("--threshold", type=float, default=0.8,
+                        help="Flag stages slower than this fraction of the baseline")
+    runs = commands.add_parser("runs", help="List recorded runs")
+    runs.add_argument("--job", help="Only this job")
+    runs.add_argument("--last", type=int, default=20, help="Number of runs")
+    show = commands.add_parser("show", help="Stages, inputs and outputs of one run")
+    show.add_argument("run_id")
+    args = parser.parse_args(argv)
+
+    store = LineageStore(args.db)
+    with pd.option_context("display.width", 200, "display.max_columns", None,
+                           "display.max_colwidth", 80):
+        if args.command == "report":
+            print(store.report(args.job, args.last, args.threshold))
+            trends = store.trends(args.job, args.last, args.threshold)
+            return 1 if not trends.empty and trends["regression"].any() else 0
+        if args.command == "runs":
+            print(store.runs(args.job, args.last).to_string(index=False))
+            return 0
+        for title, frame in (("Stages", store.stages(args.run_id)),
+                             ("Inputs", store.inputs(args.run_id)),
+                             ("Outputs", store.outputs(args.run_id))):
+            print(f"{title}:")
+            print("  none" if frame.empty else frame.drop(columns="run_id").to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
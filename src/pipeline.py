@@ -0,0 +1,173 @@
+"""Composable streaming stages for extract, transform and load.
+
+A pipeline is a source, any number of transforms and a sink that exchange
+iterators of chunks (usually DataFrames):
+
+- a source is an iterable of chunks, typically a generator;
+- a transform is a function taking an iterator of chunks and returning one;
+  ``map_chunks`` turns a per-chunk function into a transform;
+- a sink is a function consuming an iterator of chunks and returning a result.
+
+``run_pipeline`` runs the source and every transform in its own thread and
+connects the stages with bounded queues, so reading files, converting chunks
+and writing the output overlap while at most ``queue_size`` chunks wait between
+two stages. An exception in any stage stops the others and is raised by
+``run_pipeline``.
+"""
+
+import glob
+import os
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+_END = object()
+
+
+class _Failure:
+    """Exception raised by the producing stage, passed on to the consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def buffered(chunks: Iterable, queue_size: int = 2) -> Iterator:
+    """Iterate over ``chunks`` produced ahead in a background thread.
+
+    The producer blocks once ``queue_size`` chunks are waiting, and stops when
+    the consumer closes the returned generator or the iteration fails.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        iterator = iter(chunks)
+        try:
+            for chunk in iterator:
+                if not put(chunk):
+                    return
+            put(_END)
+        except Exception as e:  # pylint: disable=broad-except
+            put(_Failure(e))
+        finally:
+            # Stop the stages upstream when the consumer gives up early
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def map_chunks(function: Callable) -> Callable[[Iterable], Iterator]:
+    """Transform applying ``function`` to every chunk; chunks mapped to None are dropped."""
+
+    def transform(chunks: Iterable) -> Iterator:
+        for chunk in chunks:
+            result = function(chunk)
+            if result is not None:
+                yield result
+
+    return transform
+
+
+def run_pipeline(source: Iterable, *transforms: Callable, sink: Callable, queue_size: int = 2):
+    """Stream ``source`` through ``transforms`` into ``sink``.
+
+    Args:
+        source: Iterable of chunks
+        transforms: Functions from an iterator of chunks to an iterator of chunks
+        sink: Function consuming the final iterator of chunks
+        queue_size: Chunks buffered between two stages
+
+    Returns:
+        Whatever ``sink`` returns
+    """
+    stages = [buffered(source, queue_size)]
+    for transform in transforms:
+        stages.append(buffered(transform(stages[-1]), queue_size))
+    try:
+        return sink(stages[-1])
+    finally:
+        # Downstream first: each close joins the thread that iterates the stage before
+        for stage in reversed(stages):
+            stage.close()
+
+
+def source_files(folder: str, extensions: Iterable[str], exclude: Sequence[str] = ()) -> List[str]:
+    """Files of ``folder`` with the given extensions (without dot), extension by extension."""
+    excluded = {os.path.abspath(path) for path in exclude}
+    return [
+        path
+        for extension in extensions
+        for path in glob.glob(f"{folder}/*.{extension}")
+        if os.path.abspath(path) not in excluded
+    ]
+
+
+def file_source(
+    folder: str,
+    readers: Dict[str, Callable[[str], pd.DataFrame]],
+    exclude: Sequence[str] = (),
+) -> Iterator[pd.DataFrame]:
+    """Read every file of ``folder`` with the reader of its extension, one chunk per file.
+
+    Files are read extension by extension in the order of ``readers``.
+
+    Args:
+        folder: Folder holding the source files
+        readers: File extension (without dot) to reader function
+        exclude: Paths to skip, e.g. the target file of the job
+    """
+    for path in source_files(folder, readers, exclude):
+        yield readers[os.path.splitext(path)[1][1:]](path)
+
+
+def csv_sink(path: str, columns: Optional[List[str]] = None) -> Callable[[Iterable], int]:
+    """Sink writing all chunks to one CSV file, the header with the first chunk.
+
+    When no chunk arrives, a header-only file with ``columns`` is written.
+
+    Returns:
+        Sink function returning the number of rows written
+    """
+
+    def write(chunks: Iterable[pd.DataFrame]) -> int:
+        rows = 0
+        header = True
+        for chunk in chunks:
+            chunk.to_csv(path, mode="w" if header else "a", header=header, index=False)
+            header = False
+            rows += len(chunk)
+        if header:
+            pd.DataFrame(columns=columns).to_csv(path, index=False)
+        return rows
+
+    return write
+
+
+def collect(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """Sink concatenating all chunks into one DataFrame."""
+    frames = list(chunks)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -0,0 +1,237 @@
+"""Dependency-aware scheduler for the nightly ETL batch.
+
+Jobs and their dependencies are declared under ``jobs:`` in config.yaml. Every
+job runs its script in a subprocess with the script's own directory as working
+directory, so relative paths inside the scripts resolve the same way as when
+they are started by hand. Jobs start as soon as all their dependencies have
+succeeded, up to ``max_workers`` at a time, so the batch takes about as long as
+its critical path. Failed attempts are retried, and one JSON report covers the
+whole run.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import yaml
+
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.lineage import BATCH_ENV, LineageStore
+from src.utils import log_progress
+
+base_path = os.path.abspath(os.path.dirname(__file__))
+config_path = os.path.join(base_path, "../config.yaml")
+
+
+def load_jobs(jobs_config: Dict) -> Dict[str, Dict]:
+    """Resolve the job definitions of the ``jobs:`` config section.
+
+    Script paths are made absolute relative to ``src/``, like the other paths
+    in config.yaml. Unknown dependencies and cycles raise ``ValueError``.
+
+    Returns:
+        dict: Job name to definition (script, args, depends_on, retries, timeout)
+    """
+    jobs = {}
+    for name, job in jobs_config.get("tasks", {}).items():
+        jobs[name] = {
+            "script": os.path.abspath(os.path.join(base_path, job["script"])),
+            "args": [str(arg) for arg in job.get("args", [])],
+            "depends_on": list(job.get("depends_on", [])),
+            "retries": int(job.get("retries", jobs_config.get("retries", 0))),
+            "timeout": job.get("timeout", jobs_config.get("timeout")),
+        }
+    for name, job in jobs.items():
+        unknown = set(job["depends_on"]) - set(jobs)
+        if unknown:
+            raise ValueError(f"Job {name} depends on unknown jobs: {sorted(unknown)}")
+    topological_order(jobs)
+    return jobs
+
+
+def topological_order(jobs: Dict[str, Dict]) -> List[str]:
+    """Order jobs so that every job comes after its dependencies (Kahn's algorithm)."""
+    remaining = {name: set(job["depends_on"]) for name, job in jobs.items()}
+    order = []
+    while remaining:
+        ready = sorted(name for name, deps in remaining.items() if not deps)
+        if not ready:
+            raise ValueError(f"Dependency cycle between jobs: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+            order.append(name)
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return order
+
+
+def run_job(name: str, job: Dict, retry_delay: float = 0, batch_id: Optional[str] = None) -> Dict:
+    """Run one job's script, retrying failed attempts.
+
+    ``batch_id`` is passed to the script as ``ETL_BATCH_ID``, so the runs it
+    records in the lineage store are grouped by batch.
+
+    Returns:
+        dict: Status ("succeeded" or "failed"), attempts, timing and output tails
+    """
+    started = time.monotonic()
+    result = {"job": name, "script": job["script"], "started_at": datetime.now().isoformat()}
+    env = dict(os.environ, **({BATCH_ENV: batch_id} if batch_id else {}))
+    for attempt in range(1, job["retries"] + 2):
+        try:
+            completed = subprocess.run(
+                [sys.executable, job["script"], *job["args"]],
+                cwd=os.path.dirname(job["script"]),
+                capture_output=True,
+                text=True,
+                timeout=job["timeout"],
+                env=env,
+                check=False,
+            )
+            returncode, stdout, stderr = completed.returncode, completed.stdout, completed.stderr
+        except subprocess.TimeoutExpired as e:
+            returncode, stdout, stderr = None, e.stdout or "", f"Timed out after {job['timeout']} s"
+            stdout = stdout.decode() if isinstance(stdout, bytes) else stdout
+        result.update(
+            attempts=attempt,
+            returncode=returncode,
+            stdout_tail=stdout[-2000:],
+            stderr_tail=stderr[-2000:],
+        )
+        if returncode == 0:
+            break
+        if attempt <= job["retries"]:
+            time.sleep(retry_delay * attempt)
+    result["status"] = "succeeded" if result["returncode"] == 0 else "failed"
+    result["duration"] = round(time.monotonic() - started, 3)
+    return result
+
+
+def critical_path(jobs: Dict[str, Dict], results: Dict[str, Dict]) -> List[str]:
+    """Longest chain of dependent jobs by duration, the lower bound of the batch time."""
+    longest: Dict[str, tuple] = {}
+    for name in topological_order(jobs):
+        duration = results.get(name, {}).get("duration", 0)
+        before = max((longest[dep] for dep in jobs[name]["depends_on"]), default=(0, []))
+        longest[name] = (before[0] + duration, before[1] + [name])
+    return max(longest.values(), default=(0, []))[1]
+
+
+def run_schedule(
+    jobs: Dict[str, Dict],
+    max_workers: int = 4,
+    retry_delay: float = 0,
+    log_file: Optional[str] = None,
+    batch_id: Optional[str] = None,
+) -> Dict:
+    """Run all jobs, each as soon as its dependencies have succeeded.
+
+    Jobs whose dependencies failed are skipped.
+
+    Returns:
+        dict: Run report with one result per job, the critical path and totals
+    """
+    started = time.monotonic()
+    results: Dict[str, Dict] = {}
+    waiting = dict(jobs)
+
+    def log(message):
+        print(message)
+        if log_file:
+            log_progress(message, log_file)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        running = {}
+        while waiting or running:
+            for name in sorted(waiting):
+                statuses = [results.get(dep, {}).get("status") for dep in jobs[name]["depends_on"]]
+                if any(status in ("failed", "skipped") for status in statuses):
+                    results[name] = {"job": name, "status": "skipped", "duration": 0}
+                    log(f"Skipped {name}: a dependency did not succeed")
+                    del waiting[name]
+                elif all(status == "succeeded" for status in statuses):
+                    log(f"Starting {name}")
+                    running[pool.submit(run_job, name, jobs[name], retry_delay, batch_id)] = name
+                    del waiting[name]
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+                log(f"Finished {name}: {results[name]['status']} in {results[name]['duration']} s "
+                    f"after {results[name]['attempts']} attempt(s)")
+
+    statuses = [result["status"] for result in results.values()]
+    return {
+        "batch_id": batch_id,
+        "finished_at": datetime.now().isoformat(),
+        "duration": round(time.monotonic() - started, 3),
+        "succeeded": statuses.count("succeeded"),
+        "failed": statuses.count("failed"),
+        "skipped": statuses.count("skipped"),
+        "critical_path": critical_path(jobs, results),
+        "jobs": [results[name] for name in topological_order(jobs)],
+    }
+
+
+def main(argv=None) -> int:
+    """Run the jobs of config.yaml and write the run report; returns the exit code."""
+    parser = argparse.ArgumentParser(description="Run the ETL jobs of config.yaml")
+    parser.add_argument("--only", nargs="+", help="Run these jobs and their dependencies")
+    parser.add_argument("--max-workers", type=int, help="Override jobs.max_workers")
+    args = parser.parse_args(argv)
+
+    with open(config_path, "r", encoding="utf-8") as stream:
+        jobs_config = yaml.safe_load(stream)["jobs"]
+    jobs = load_jobs(jobs_config)
+    if args.only:
+        selected, pending = set(), list(args.only)
+        while pending:
+            name = pending.pop()
+            if name not in jobs:
+                parser.error(f"unknown job {name}")
+            if name not in selected:
+                selected.add(name)
+                pending.extend(jobs[name]["depends_on"])
+        jobs = {name: job for name, job in jobs.items() if name in selected}
+
+    log_file = os.path.join(base_path, jobs_config.get("logging", {}).get(
+        "location", "../output/log_file_scheduler.txt"))
+    report_file = os.path.join(base_path, jobs_config.get("report", "../output/run_report.json"))
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+    os.makedirs(os.path.dirname(report_file), exist_ok=True)
+
+    # The batch is recorded in the lineage store with one stage per job
+    batch = LineageStore().start_run("batch")
+    report = run_schedule(
+        jobs,
+        max_workers=args.max_workers or jobs_config.get("max_workers", 4),
+        retry_delay=jobs_config.get("retry_delay", 0),
+        log_file=log_file,
+        batch_id=batch.run_id,
+    )
+    with open(report_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    for result in report["jobs"]:
+        batch.record_stage(result["job"], result["duration"])
+    batch.record_output(report_file)
+    batch.finish("failed" if report["failed"] or report["skipped"] else "succeeded")
+    log_progress(
+        f"Batch finished in {report['duration']} s: {report['succeeded']} succeeded, "
+        f"{report['failed']} failed, {report['skipped']} skipped. Report: {report_file}",
+        log_file,
+    )
+    return 1 if report["failed"] or report["skipped"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""Declarative data-quality rules, checked chunk by chunk.
+
+Rules are plain dicts, as written under ``validation.rules`` of a job in
+config.yaml:
+
+    - {column: price, check: range, min: 0}
+    - {column: car_model, check: null_ratio, max_ratio: 0.1}
+    - {column: fuel, check: allowed, values: [Petrol, Diesel, CNG]}
+    - {column: name, check: unique}
+
+Every rule counts the rows that violate it (values outside ``min``/``max``,
+missing values, values not in ``values``, repeated values) and passes when
+their share of the rows is at most ``max_ratio`` (default 0). Missing values
+only count for ``null_ratio``.
+
+``Validator.update`` checks each chunk with vectorized column operations as it
+streams past, so validation is a pipeline stage and needs no second pass over
+the data. With ``sample_size`` set, the range, null and allowed-value rules are
+evaluated on a uniform reservoir sample of that many rows instead, and their
+counts are estimated for the whole input; uniqueness is always checked on all
+rows, through 64-bit hashes of the values.
+"""
+
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+CHECKS = ("range", "null_ratio", "allowed", "unique")
+
+
+class _RuleState:
+    """What one rule has found so far: violation count, examples and seen hashes."""
+
+    def __init__(self):
+        self.violations = 0
+        self.examples: list = []
+        self.missing_column = False
+        self.seen = np.empty(0, dtype=np.uint64)
+
+
+class Validator:
+    """Accumulates rule violations over the chunks of one input.
+
+    Args:
+        rules: Rule dicts with column, check and the check's parameters
+        sample_size: Rows kept in the reservoir sample; None checks every row
+        max_examples: Offending values listed per rule in the report
+        seed: Seed of the reservoir sampling
+    """
+
+    def __init__(self, rules: List[Dict], sample_size: Optional[int] = None,
+                 max_examples: int = 5, seed: Optional[int] = None):
+        for rule in rules:
+            if rule.get("check") not in CHECKS:
+                raise ValueError(f"Unknown check {rule.get('check')!r}, expected one of {CHECKS}")
+            if "column" not in rule:
+                raise ValueError(f"Rule without a column: {rule}")
+        self.rules = [dict(rule) for rule in rules]
+        self.sample_size = sample_size
+        self.max_examples = max_examples
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    @classmethod
+    def from_config(cls, section: Dict) -> "Validator":
+        """Build a validator from a job's ``validation`` config section."""
+        return cls(
+            section.get("rules", []),
+            sample_size=section.get("sample_size"),
+            max_examples=section.get("max_examples", 5),
+            seed=section.get("seed"),
+        )
+
+    def reset(self):
+        """Forget all rows seen, to validate a new input."""
+        self.rows = 0
+        self._states = [_RuleState() for _ in self.rules]
+        self._sample: Optional[pd.DataFrame] = None
+
+    @property
+    def sampled(self) -> bool:
+        return self.sample_size is not None
+
+    def _failing(self, rule: Dict, values: pd.Series) -> np.ndarray:
+        """Boolean mask of the values violating a range, null or allowed-value rule."""
+        check = rule["check"]
+        if check == "null_ratio":
+            return values.isna().to_numpy()
+        present = values.notna().to_numpy()
+        if check == "allowed":
+            return present & ~values.isin(rule["values"]).to_numpy()
+        numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64")
+        with np.errstate(invalid="ignore"):
+            failing = present & np.isnan(numbers)
+            if rule.get("min") is not None:
+                failing |= numbers < rule["min"]
+            if rule.get("max") is not None:
+                failing |= numbers > rule["max"]
+        return failing
+
+    @staticmethod
+    def _duplicates(state: _RuleState, values: pd.Series) -> np.ndarray:
+        """Mask of the values already seen, in this chunk or before."""
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        present = values.notna().to_numpy()
+        repeated = pd.Series(hashes).duplicated().to_numpy() | np.isin(hashes, state.seen)
+        state.seen = np.union1d(state.seen, hashes[present])
+        return present & repeated
+
+    def _count(self, values: pd.Series, failing: np.ndarray, examples: list) -> int:
+        """Number of failing values; adds new offending values to ``examples``."""
+        if len(examples) < self.max_examples and failing.any():
+            for value in values[failing].drop_duplicates().head(self.max_examples):
+                value = value.item() if isinstance(value, np.generic) else value
+                if len(examples) < self.max_examples and value not in examples:
+                    examples.append(value)
+        return int(failing.sum())
+
+    def _add_to_sample(self, chunk: pd.DataFrame):
+        """Reservoir sampling (algorithm R) of the chunk's rows, vectorized.
+
+        Row ``t`` of the input replaces a random sample row with probability
+        ``sample_size / (t + 1)``; when several rows of a chunk pick the same
+        slot, the last one wins, as in the row-by-row algorithm.
+        """
+        k = self.sample_size
+        positions = np.arange(self.rows, self.rows + len(chunk))
+        fill = positions < k
+        sample = pd.concat([self._sample, chunk[fill]]) if self._sample is not None else chunk[fill]
+        slots = np.floor(self.rng.random(len(chunk)) * (positions + 1)).astype(np.int64)
+        replacing = np.flatnonzero(~fill & (slots < k))
+        if len(replacing):
+            # Keep the last row drawn for every slot
+            reversed_slots = slots[replacing][::-1]
+            unique_slots, first = np.unique(reversed_slots, return_index=True)
+            rows = replacing[::-1][first]
+            keep = np.ones(len(sample), dtype=bool)
+            keep[unique_slots] = False
+            sample = pd.concat([sample[keep], chunk.iloc[rows]])
+        self._sample = sample.reset_index(drop=True)
+
+    def update(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Check one chunk and return it unchanged, so it can be used with ``map_chunks``."""
+        for rule, state in zip(self.rules, self._states):
+            column = rule["column"]
+            if column not in chunk.columns:
+                state.missing_column = True
+                continue
+            if rule["check"] == "unique":
+                values = chunk[column]
+                failing = self._duplicates(state, values)
+                state.violations += self._count(values, failing, state.examples)
+            elif not self.sampled:
+                values = chunk[column]
+                failing = self._failing(rule, values)
+                state.violations += self._count(values, failing, state.examples)
+        if self.sampled:
+            self._add_to_sample(chunk)
+        self.rows += len(chunk)
+        return chunk
+
+    def report(self) -> Dict:
+        """Summary of all rules over the rows seen.
+
+        Returns:
+            dict: rows, sampled_rows, passed and one entry per rule with its
+                  violations (estimated when sampled), ratio, passed and examples
+        """
+        sample = self._sample if self._sample is not None else pd.DataFrame()
+        results = []
+        for rule, state in zip(self.rules, self._states):
+            violations, examples = state.violations, state.examples
+            checked_rows = self.rows
+            if self.sampled and rule["check"] != "unique":
+                checked_rows, examples = len(sample), []
+                if rule["column"] in sample.columns:
+                    values = sample[rule["column"]]
+                    violations = self._count(values, self._failing(rule, values), examples)
+            ratio = violations / checked_rows if checked_rows else 0.0
+            missing = state.missing_column
+            results.append({
+                **rule,
+                "violations": round(ratio * self.rows) if checked_rows != self.rows else violations,
+                "estimated": checked_rows != self.rows,
+                "ratio": 1.0 if missing else ratio,
+                "passed": not missing and ratio <= rule.get("max_ratio", 0),
+                "examples": ["<missing column>"] if missing else examples,
+            })
+        return {
+            "rows": self.rows,
+            "sampled_rows": len(sample) if self.sampled else self.rows,
+            "passed": all(result["passed"] for result in results),
+            "rules": results,
+        }
+
+
+def summarize(report: Dict) -> List[str]:
+    """One log line per rule and an overall line."""
+    lines = []
+    for rule in report["rules"]:
+        detail = {key: rule[key] for key in ("min", "max", "values", "max_ratio") if key in rule}
+        lines.append(
+            f"{'PASS' if rule['passed'] else 'FAIL'} {rule['check']} {rule['column']} {detail}: "
+            f"{'~' if rule['estimated'] else ''}{rule['violations']} violations "
+            f"({rule['ratio']:.2%})" + (f", e.g. {rule['examples']}" if rule["examples"] else "")
+        )
+    sampling = "" if report["sampled_rows"] == report["rows"] else (
+        f", range, null and allowed-value rules on a sample of {report['sampled_rows']}"
+    )
+    lines.append(
+        f"Validation {'passed' if report['passed'] else 'failed'}: {report['rows']} rows{sampling}"
+    )
+    return lines
+
+
+def save_report(report: Dict, path: str):
+    """Write the report as JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
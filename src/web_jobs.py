@@ -0,0 +1,96 @@
+"""Run the web-sourced ETL jobs (GDP, banks, movies) together.
+
+All pages are downloaded through one shared Fetcher, so the jobs respect a single
+concurrency bound and per-host rate limit (they all come from web.archive.org),
+and each page is parsed in a worker process while the others are still downloading.
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import banks_project, etl_gdp
+from src import etl_webscrape_movies as movies
+from src.fanout import csv_file_sink, frame_sink, load_frame
+from src.fetch import Fetcher, run_jobs
+from src.lineage import LineageStore
+from src.utils import log_progress
+
+
+def extract_all(fetcher=None, parse_workers=None):
+    """Fetch and parse the pages of all web jobs concurrently.
+
+    Returns:
+        dict: Extracted dataframes keyed by job name ("gdp", "banks", "movies")
+    """
+    fetcher = fetcher or Fetcher(**etl_gdp.config.get("fetch", {}))
+    jobs = {
+        "gdp": (etl_gdp.url, etl_gdp.parse_gdp, {"attrs": etl_gdp.table_attribs}),
+        "banks": (banks_project.url, banks_project.parse_banks, {}),
+        "movies": (movies.URL, movies.parse_movies, {"top_n": movies.TOP_N}),
+    }
+    results = run_jobs(list(jobs.values()), fetcher=fetcher, parse_workers=parse_workers)
+    return dict(zip(jobs, results))
+
+
+if __name__ == "__main__":
+    with LineageStore().start_run("web_jobs") as run:
+        for source in (etl_gdp.url, banks_project.url, banks_project.csv_file, movies.URL):
+            run.record_input(source)
+        with run.stage("extract") as stage:
+            extracted = extract_all()
+            stage.rows = sum(len(df) for df in extracted.values())
+
+        log_progress("Data extraction complete. Initiating Transformation process",
+                     etl_gdp.log_file)
+        with run.stage("transform") as stage:
+            gdp = etl_gdp.transform(extracted["gdp"])
+            banks_project.log_progress(
+                "Data extraction complete. Initiating Transformation process"
+            )
+            banks = banks_project.transform(extracted["banks"], banks_project.csv_file)
+            stage.rows = len(gdp) + len(banks)
+
+        # Each job writes its CSV file and database table at the same time
+        with run.stage("load_gdp") as stage:
+            load_frame(gdp, {
+                "csv": csv_file_sink(etl_gdp.csv_path),
+                "db": frame_sink(
+                    lambda parts: etl_gdp.load_to_db(pd.concat(parts), etl_gdp.table_name)
+                ),
+            })
+            stage.rows = len(gdp)
+        run.record_output(etl_gdp.csv_path, len(gdp))
+        run.record_output(
+            f"mysql://localhost:3306/{etl_gdp.db_name}/{etl_gdp.table_name}", len(gdp)
+        )
+        log_progress("Process Complete.", etl_gdp.log_file)
+
+        with run.stage("load_banks") as stage:
+            stage.rows = banks_project.load_chunks(
+                [banks], banks_project.output_file, banks_project.table_name
+            )
+        run.record_output(banks_project.output_file, len(banks))
+        run.record_output(
+            f"mysql://localhost:3306/{banks_project.db_name}/{banks_project.table_name}",
+            len(banks),
+        )
+        banks_project.log_progress("Process Complete.")
+
+        movie_frame = extracted["movies"]
+        with run.stage("load_movies") as stage:
+            load_frame(movie_frame, {
+                "csv": csv_file_sink(movies.CSV_PATH),
+                "db": frame_sink(
+                    lambda parts: movies.load_to_db(pd.concat(parts), movies.TABLE_NAME)
+                ),
+            })
+            stage.rows = len(movie_frame)
+        run.record_output(movies.CSV_PATH, len(movie_frame))
+        run.record_output(
+            f"mysql://localhost:3306/{movies.DB_NAME}/{movies.TABLE_NAME}", len(movie_frame)
+        )
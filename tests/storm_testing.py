@@ -0,0 +1,78 @@
+"""Shared fixtures of the StormDynamics_Attribution tests."""
+
+import unittest
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+
+import pandas as pd
+
+# Add the 'StormDynamics_Attribution' directory to the Python path
+STORM_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "StormDynamics_Attribution"))
+sys.path.append(STORM_DIR)
+
+from phase1etl import StormDataETL
+
+for name in ("phase1etl", "phase1"):
+    logging.getLogger(name).setLevel(logging.CRITICAL)
+
+
+def storm_config(directory, **overrides):
+    """Small ETL configuration writing into ``directory``."""
+    config = {
+        "database_path": os.path.join(directory, "storm_data.db"),
+        "start_date": "2020-01-01",
+        "end_date": "2020-06-30",
+        "batch_size": 30,
+        "snapshot_format": "none",
+        "synthetic": {"seed": 7},
+    }
+    config.update(overrides)
+    return config
+
+
+def read_table(config, table="storm_events", order="region, date"):
+    with sqlite3.connect(config["database_path"]) as conn:
+        return pd.read_sql(f"SELECT * FROM {table} ORDER BY {order}", conn)
+
+
+def grouped_stats(config, key):
+    """What the stats views should show: storm_events grouped by month or season."""
+    table = read_table(config)
+    table["month"] = table["date"].str[:7]
+    grouped = table.groupby(key)
+    return pd.DataFrame({
+        "records": grouped.size(),
+        "storm_event_rate": grouped["storm_event"].mean(),
+        "scs_index_mean": grouped["scs_index"].mean(),
+        "cape_mean": grouped["cape"].mean(),
+        "cape_std": grouped["cape"].std(),
+        "shear_mean": grouped["shear"].mean(),
+        "shear_std": grouped["shear"].std(),
+    })
+
+
+class StormETLTestCase(unittest.TestCase):
+    """Runs every test in its own working directory, where the ETL writes data/."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.cwd = os.getcwd()
+        os.chdir(self.dir)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def etl(self, run_id=None, **overrides):
+        return StormDataETL(config=storm_config(self.dir, **overrides), run_id=run_id)
+
+    def assertStatsMatchTable(self, config):
+        for view, key in (("storm_stats_by_month", "month"), ("storm_stats_by_season", "season")):
+            stats = read_table(config, view, key).set_index(key)
+            expected = grouped_stats(config, key)
+            pd.testing.assert_frame_equal(stats[expected.columns], expected, check_names=False,
+                                          check_dtype=False, rtol=1e-9)
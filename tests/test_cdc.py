@@ -0,0 +1,87 @@
+import unittest
+import sys
+import os
+
+import pandas as pd
+import sqlalchemy
+
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.cdc import apply_changes, diff_rows, row_hashes
+
+
+class TestCDC(unittest.TestCase):
+    def setUp(self):
+        self.engine = sqlalchemy.create_engine("sqlite://")
+        self.snapshot = pd.DataFrame(
+            {
+                "Country": ["United States", "China", "Japan"],
+                "GDP_USD_billions": [26854.6, 19373.59, 4409.74],
+            }
+        )
+
+    def read_table(self):
+        return pd.read_sql(
+            "SELECT * FROM countries_by_gdp ORDER BY Country", self.engine
+        ).reset_index(drop=True)
+
+    def test_row_hashes_ignore_dtype(self):
+        as_text = self.snapshot.astype(str)
+        pd.testing.assert_series_equal(
+            row_hashes(self.snapshot, "Country"), row_hashes(as_text, "Country")
+        )
+
+    def test_diff_rows(self):
+        previous = row_hashes(self.snapshot, "Country")
+        new = pd.DataFrame(
+            {
+                "Country": ["United States", "China", "Germany"],
+                "GDP_USD_billions": [26854.6, 19400.0, 4308.85],
+            }
+        )
+        changes = diff_rows(new, "Country", previous)
+        self.assertEqual(list(changes["inserts"]["Country"]), ["Germany"])
+        self.assertEqual(list(changes["updates"]["Country"]), ["China"])
+        self.assertEqual(changes["deletes"], ["Japan"])
+        self.assertEqual(sorted(changes["hashes"].index), ["China", "Germany"])
+
+    def test_apply_changes_writes_only_deltas(self):
+        first = apply_changes(self.snapshot, self.engine, "countries_by_gdp", "Country")
+        self.assertEqual(first, {"inserted": 3, "updated": 0, "deleted": 0})
+
+        unchanged = apply_changes(self.snapshot, self.engine, "countries_by_gdp", "Country")
+        self.assertEqual(unchanged, {"inserted": 0, "updated": 0, "deleted": 0})
+
+        new = pd.DataFrame(
+            {
+                "Country": ["United States", "China", "Germany"],
+                "GDP_USD_billions": [26854.6, 19400.0, 4308.85],
+            }
+        )
+        changed = apply_changes(new, self.engine, "countries_by_gdp", "Country")
+        self.assertEqual(changed, {"inserted": 1, "updated": 1, "deleted": 1})
+        pd.testing.assert_frame_equal(
+            self.read_table(),
+            new.sort_values("Country").reset_index(drop=True),
+        )
+
+        # The stored hashes now match the table, so a rerun is a no-op
+        rerun = apply_changes(new, self.engine, "countries_by_gdp", "Country")
+        self.assertEqual(rerun, {"inserted": 0, "updated": 0, "deleted": 0})
+
+    def test_apply_changes_quotes_column_names(self):
+        films = pd.DataFrame(
+            {"Average Rank": ["1", "2"], "Film": ["The Godfather", "Citizen Kane"]}
+        )
+        apply_changes(films, self.engine, "Top_50", "Film")
+        films.loc[1, "Average Rank"] = "3"
+        result = apply_changes(films, self.engine, "Top_50", "Film")
+        self.assertEqual(result["updated"], 1)
+        stored = pd.read_sql('SELECT "Average Rank" FROM Top_50 WHERE Film = \'Citizen Kane\'',
+                             self.engine)
+        self.assertEqual(stored.iloc[0, 0], "3")
+
+
+if __name__ == "__main__":
+    unittest.main()
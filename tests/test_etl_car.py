@@ -17,6 +17,11 @@ from src.etl_car import (
 
 class TestETL(unittest.TestCase):
     def setUp(self):
+        # Keep warnings out of the tracked log file
+        log_patcher = patch("src.etl_car.log_progress")
+        self.mock_log = log_patcher.start()
+        self.addCleanup(log_patcher.stop)
+
         # Expected DataFrame after extraction, including car_model
         self.expected_df = pd.DataFrame(
             {
@@ -165,6 +170,18 @@ class TestETL(unittest.TestCase):
         expected["car_model"] = "Unknown"
         pd.testing.assert_frame_equal(result, expected)
 
+    def test_transform_logs_missing_car_model(self):
+        # Rows without car_model are counted before they are filled in
+        transform(self.expected_df.copy())
+        self.mock_log.assert_called_once()
+        self.assertEqual(
+            self.mock_log.call_args[0][0], "Warning: 1 rows have missing car_model values."
+        )
+
+        self.mock_log.reset_mock()
+        transform(self.transformed_df.copy())
+        self.mock_log.assert_not_called()
+
     @patch("pandas.DataFrame.to_csv")
     def test_load_data(self, mock_to_csv):
         # Test that load_data calls to_csv with the correct arguments
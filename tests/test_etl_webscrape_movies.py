@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src import etl_webscrape_movies as movies
+
+
+def ranking_page(films):
+    rows = "".join(
+        f"<tr><td>{rank}</td><td><a href='#'>{film}</a></td><td>{year}</td><td>x</td></tr>"
+        for rank, (film, year) in enumerate(films, start=1)
+    )
+    return (
+        "<html><body><table><tbody>"
+        "<tr><th>Average Rank</th><th>Film</th><th>Year</th><th>Rotten Tomatoes</th></tr>"
+        f"{rows}</tbody></table></body></html>"
+    )
+
+
+class TestMovieSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.first = self.write_page(
+            "films_20230101000000.html",
+            [("The Godfather", 1972), ("Citizen Kane", 1941), ("Casablanca", 1942)],
+        )
+        self.second = self.write_page(
+            "films_20230901.html",
+            [("Citizen Kane", 1941), ("The Godfather", 1972), ("Casablanca", 1942)],
+        )
+
+    def write_page(self, name, films):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(ranking_page(films))
+        return path
+
+    def test_snapshot_date(self):
+        self.assertEqual(movies.snapshot_date(self.first), pd.Timestamp("2023-01-01"))
+        self.assertEqual(
+            movies.snapshot_date(
+                "https://web.archive.org/web/20230902185655/https://en.everybodywiki.com/"
+                "100_Most_Highly-Ranked_Films"
+            ),
+            pd.Timestamp("2023-09-02"),
+        )
+
+    def test_parse_movies_stops_at_top_n(self):
+        with open(self.first, encoding="utf-8") as f:
+            result = movies.parse_movies(f.read(), top_n=2)
+        expected = pd.DataFrame(
+            {"Average Rank": [1, 2], "Film": ["The Godfather", "Citizen Kane"],
+             "Year": [1972, 1941]}
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_scrape_snapshots_builds_rank_history(self):
+        snapshots = movies.scrape_snapshots([self.first, self.second], top_n=2)
+        history = movies.build_rank_history(snapshots)
+        self.assertEqual(list(history.columns), ["Film", "Snapshot Date", "Rank"])
+        kane = history[history["Film"] == "Citizen Kane"]
+        self.assertEqual(list(kane["Rank"]), [2, 1])
+        self.assertEqual(
+            list(kane["Snapshot Date"]),
+            [pd.Timestamp("2023-01-01"), pd.Timestamp("2023-09-01")],
+        )
+        self.assertNotIn("Casablanca", set(history["Film"]))
+
+    def test_update_rank_history_only_scrapes_new_snapshots(self):
+        history_path = os.path.join(self.tmp.name, "rank_history.csv")
+        movies.update_rank_history([self.first], history_path, top_n=3)
+        with patch.object(movies, "scrape_snapshots", wraps=movies.scrape_snapshots) as scrape:
+            history = movies.update_rank_history(
+                [self.first, self.second], history_path, top_n=3
+            )
+        scrape.assert_called_once_with([self.second], top_n=3, fetcher=None)
+        self.assertEqual(len(history), 6)
+        self.assertEqual(len(pd.read_csv(history_path)), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.exchange_rates import ExchangeRateStore, asof_join
+
+
+class TestExchangeRateStore(unittest.TestCase):
+    def setUp(self):
+        self.rates = pd.DataFrame(
+            {
+                "Date": ["2023-01-01", "2023-06-01", "2023-01-01", "2023-03-01"],
+                "Currency": ["GBP", "GBP", "EUR", "EUR"],
+                "Rate": [0.83, 0.80, 0.94, 0.92],
+            }
+        )
+
+    def test_rates_asof_picks_latest_rate_at_or_before_date(self):
+        store = ExchangeRateStore(self.rates)
+        result = store.rates_asof(
+            "GBP", ["2022-12-31", "2023-01-01", "2023-05-31", "2023-06-01", "2024-01-01"]
+        )
+        np.testing.assert_array_equal(result, [np.nan, 0.83, 0.83, 0.80, 0.80])
+
+    def test_rates_asof_unsorted_input(self):
+        store = ExchangeRateStore(self.rates.iloc[::-1])
+        result = store.rates_asof("EUR", ["2023-04-01", "2023-02-01", None])
+        np.testing.assert_array_equal(result, [0.92, 0.94, np.nan])
+
+    def test_undated_rates_apply_to_every_date(self):
+        store = ExchangeRateStore(
+            pd.DataFrame({"Currency": ["EUR", "GBP"], "Rate": [0.93, 0.8]})
+        )
+        np.testing.assert_array_equal(
+            store.rates_asof("GBP", ["2001-01-01", "2023-09-08"]), [0.8, 0.8]
+        )
+        self.assertEqual(store.latest("EUR"), 0.93)
+
+    def test_asof_join(self):
+        store = ExchangeRateStore(self.rates)
+        banks = pd.DataFrame(
+            {
+                "Name": ["A", "B", "A"],
+                "Date": pd.to_datetime(["2023-02-01", "2023-02-01", "2023-07-01"]),
+            }
+        )
+        result = asof_join(banks, store)
+        np.testing.assert_array_equal(result["Rate_GBP"], [0.83, 0.83, 0.80])
+        np.testing.assert_array_equal(result["Rate_EUR"], [0.94, 0.94, 0.92])
+
+    def test_asof_join_without_dates_uses_latest_rate(self):
+        store = ExchangeRateStore(self.rates)
+        result = asof_join(pd.DataFrame({"Name": ["A"]}), store, currencies=["GBP"])
+        self.assertEqual(list(result.columns), ["Name", "Rate_GBP"])
+        self.assertEqual(result["Rate_GBP"].iloc[0], 0.80)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.fanout import (
+    EncodedChunk,
+    StreamAborted,
+    csv_file_sink,
+    fan_out,
+    frame_sink,
+    load_frame,
+    sinks_from_config,
+)
+from src.pipeline import collect, run_pipeline
+
+
+class TestFanOut(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.df = pd.DataFrame(
+            {
+                "year_of_manufacture": [2020, 2021, 2019, 2018],
+                "price": [10000.5, 12000.0, 8000.25, np.nan],
+                "fuel": ["Petrol", "Diesel", None, "CNG"],
+            }
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def test_configured_sinks(self):
+        sinks = sinks_from_config(
+            [
+                {"type": "csv", "location": "out/data.csv"},
+                {"type": "columnar", "location": "out/data.npz"},
+                {"type": "sql", "location": "out/data.db", "table": "cars"},
+            ],
+            self.dir,
+        )
+        chunks = (self.df.iloc[i:i + 2] for i in (0, 2))
+        results = run_pipeline(chunks, sink=fan_out(sinks))
+        self.assertEqual(results, {"csv": 4, "columnar": 4, "sql": 4})
+
+        with open(self.path("out/data.csv"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), self.df.to_csv(index=False))
+        with np.load(self.path("out/data.npz")) as arrays:
+            np.testing.assert_array_equal(arrays["price"], self.df["price"].to_numpy())
+            self.assertEqual(arrays["fuel"].tolist(), ["Petrol", "Diesel", "None", "CNG"])
+        with sqlite3.connect(self.path("out/data.db")) as conn:
+            stored = pd.read_sql("SELECT * FROM cars", conn)
+        pd.testing.assert_frame_equal(stored, self.df)
+
+        # A second load replaces the table contents
+        load_frame(self.df.head(1), sinks)
+        with sqlite3.connect(self.path("out/data.db")) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM cars").fetchone()[0], 1)
+
+    def test_sinks_run_concurrently(self):
+        def slow(chunks):
+            for _ in chunks:
+                time.sleep(0.2)
+            return "done"
+
+        sinks = {name: slow for name in ("a", "b", "c")}
+        started = time.monotonic()
+        results = fan_out(sinks)([self.df] * 3)
+        # One sink takes 0.6 s; sequential sinks would take 1.8 s
+        self.assertLess(time.monotonic() - started, 1.2)
+        self.assertEqual(results, {"a": "done", "b": "done", "c": "done"})
+
+    def test_shared_encoding(self):
+        fake_csv = patch.object(
+            pd.DataFrame, "to_csv", autospec=True, side_effect=lambda *args, **kwargs: "x\n"
+        )
+        with fake_csv as to_csv:
+            results = load_frame(self.df, {
+                "first": csv_file_sink(self.path("first.csv")),
+                "second": csv_file_sink(self.path("second.csv")),
+            })
+        self.assertEqual(results, {"first": 4, "second": 4})
+        # One call encodes the rows for both files; the others write the headers
+        rows_calls = [c for c in to_csv.call_args_list if c.kwargs.get("header") is False]
+        self.assertEqual(len(rows_calls), 1)
+
+        chunk = EncodedChunk(self.df)
+        self.assertIs(chunk.records(), chunk.records())
+        self.assertEqual(chunk.records()[2], (2019, 8000.25, None))
+
+    def test_failing_sink(self):
+        def failing(chunks):
+            next(iter(chunks))
+            raise IOError("disk full")
+
+        collected = {"rows": 0}
+
+        def keep(parts):
+            for part in parts:
+                collected["rows"] += len(part)
+
+        with self.assertRaises(RuntimeError) as raised:
+            fan_out({"bad": failing, "good": frame_sink(keep)}, queue_size=1)([self.df] * 20)
+        self.assertIn("bad", str(raised.exception))
+        self.assertLess(collected["rows"], 80)
+
+    def test_failing_source_keeps_previous_load(self):
+        entries = [
+            {"type": "csv", "location": "out/data.csv"},
+            {"type": "columnar", "location": "out/data.npz"},
+            {"type": "sql", "location": "out/data.db", "table": "data"},
+        ]
+        fan_out(sinks_from_config(entries, self.dir))([self.df])
+        csv_path = os.path.join(self.dir, "out", "data.csv")
+        with open(csv_path, encoding="utf-8") as f:
+            previous_csv = f.read()
+
+        def failing_source():
+            yield self.df.assign(price=1.0)
+            yield self.df.assign(price=2.0)
+            raise IOError("connection reset")
+
+        with self.assertRaises(IOError):
+            run_pipeline(failing_source(), sink=fan_out(sinks_from_config(entries, self.dir)))
+
+        with open(csv_path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), previous_csv)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.dir, "out"))),
+                         ["data.csv", "data.db", "data.npz"])
+        with np.load(os.path.join(self.dir, "out", "data.npz")) as arrays:
+            self.assertEqual(len(arrays["price"]), 4)
+        with sqlite3.connect(os.path.join(self.dir, "out", "data.db")) as conn:
+            prices = [row[0] for row in conn.execute("SELECT price FROM data")]
+        self.assertEqual(prices[:3], [10000.5, 12000.0, 8000.25])
+        self.assertEqual(len(prices), 4)
+
+    def test_aborted_stream_reaches_sinks(self):
+        seen = {}
+
+        def sink(chunks):
+            try:
+                for _ in chunks:
+                    pass
+            except StreamAborted as e:
+                seen["error"] = e
+                raise
+
+        def failing_source():
+            yield self.df
+            raise ValueError("bad chunk")
+
+        with self.assertRaises(ValueError):
+            fan_out({"only": sink})(failing_source())
+        self.assertIsInstance(seen["error"].__cause__, ValueError)
+
+    def test_unknown_sink_type(self):
+        with self.assertRaises(ValueError):
+            sinks_from_config([{"type": "parquet", "location": "x"}], self.dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+# Also puts StormDynamics_Attribution on the Python path
+from storm_testing import StormETLTestCase, read_table
+
+from features import FeatureEngine
+
+
+def sample_series(rows=200, seed=5):
+    rng = np.random.default_rng(seed)
+    cape = rng.normal(1500, 500, rows)
+    cape[[3, 4, 50]] = np.nan
+    return pd.DataFrame({
+        "cape": cape,
+        "shear": rng.normal(20, 5, rows),
+        "storm_event": (rng.random(rows) < 0.4).astype(int),
+    })
+
+
+class TestFeatureEngine(unittest.TestCase):
+    def setUp(self):
+        self.df = sample_series()
+        self.whole = FeatureEngine().transform(self.df)
+
+    def test_chunks_match_the_whole_series(self):
+        engine = FeatureEngine()
+        bounds = [0, 1, 1, 2, 40, 41, 41, 130, 200]
+        chunks = [engine.transform(self.df.iloc[start:end])
+                  for start, end in zip(bounds[:-1], bounds[1:])]
+        pd.testing.assert_frame_equal(pd.concat(chunks), self.whole)
+
+    def test_matches_pandas_rolling(self):
+        for column in ("cape", "shear"):
+            for window in (3, 7, 30):
+                rolling = self.df[column].rolling(window, min_periods=1)
+                np.testing.assert_allclose(self.whole[f"{column}_mean_{window}"], rolling.mean())
+                np.testing.assert_allclose(self.whole[f"{column}_max_{window}"], rolling.max())
+            for lag in (1, 2, 3):
+                np.testing.assert_array_equal(self.whole[f"{column}_lag_{lag}"],
+                                              self.df[column].shift(lag))
+        events = self.df["storm_event"]
+        runs = events.groupby((events != 1).cumsum()).cumsum()
+        np.testing.assert_array_equal(self.whole["storm_event_run_length"], runs)
+        np.testing.assert_array_equal(self.whole["storm_event_days_7"],
+                                      events.rolling(7, min_periods=1).sum())
+
+    def test_empty_chunk_keeps_the_state(self):
+        engine = FeatureEngine()
+        engine.transform(self.df.iloc[:10])
+        empty = engine.transform(self.df.iloc[:0])
+        self.assertEqual(len(empty), 0)
+        self.assertEqual(list(empty.columns), list(self.whole.columns))
+        pd.testing.assert_frame_equal(engine.transform(self.df.iloc[10:]), self.whole.iloc[10:])
+
+    def test_reset_starts_a_new_series(self):
+        engine = FeatureEngine()
+        engine.transform(self.df)
+        engine.reset()
+        pd.testing.assert_frame_equal(engine.transform(self.df), self.whole)
+
+
+class TestETLFeatures(StormETLTestCase):
+    """Features loaded by the ETL equal those of the final series of each region."""
+
+    def etl(self, run_id=None, **overrides):
+        return super().etl(run_id, **{"features": {"enabled": True}, **overrides})
+
+    def assertFeaturesMatchSeries(self, etl):
+        table = read_table(etl.config)
+        engine = FeatureEngine()
+        for _, series in table.groupby("region"):
+            engine.reset()
+            expected = engine.transform(series[["cape", "shear", "storm_event"]])
+            for name in engine.feature_names:
+                np.testing.assert_allclose(series[name], expected[name], rtol=1e-9, err_msg=name)
+
+    def test_windowed_run_after_the_rescore(self):
+        etl = self.etl()
+        etl.run_etl()
+        self.assertFeaturesMatchSeries(etl)
+
+    def test_resumed_run_recomputes_earlier_run_features(self):
+        self.etl(end_date="2020-03-31").run_etl()
+        etl = self.etl()
+        etl.run_etl()
+        self.assertFeaturesMatchSeries(etl)
+
+    def test_region_windows(self):
+        etl = self.etl(regions=["north", "south"], workers=2)
+        etl.run_regions()
+        self.assertFeaturesMatchSeries(etl)
+
+    def test_resumed_region_windows(self):
+        self.etl(regions=["north", "south"], workers=2, end_date="2020-03-31").run_regions()
+        etl = self.etl(regions=["north", "south"], workers=2)
+        etl.run_regions()
+        self.assertFeaturesMatchSeries(etl)
+
+
+if __name__ == "__main__":
+    unittest.main()
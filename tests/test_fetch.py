@@ -0,0 +1,153 @@
+import unittest
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.fetch import STREAM_CHUNK_SIZE, Fetcher, fetch_streamed, fetch_text, run_jobs
+from src.html_tables import locate_table
+
+BANKS_PAGE = """<html><body><table>
+<tr><th>Rank</th><th>Bank name</th><th>Market cap<br>(US$ billion)</th></tr>
+<tr><td>1</td><td>JPMorgan Chase</td><td>432.92</td></tr>
+</table></body></html>"""
+
+
+class ArchiveStandIn(BaseHTTPRequestHandler):
+    """Local stand-in for the archive, serving pages with optional failures."""
+
+    pages = {}
+    failures = {}
+    requests_seen = []
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests_seen.append((self.path, time.monotonic()))
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+            failing = cls.failures.get(self.path, 0) > 0
+            if failing:
+                cls.failures[self.path] -= 1
+        time.sleep(0.05)
+        with cls.lock:
+            cls.in_flight -= 1
+        if failing:
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = cls.pages.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+
+class TestFetcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ArchiveStandIn)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ArchiveStandIn.pages = {f"/page{i}": f"page {i}" for i in range(6)}
+        ArchiveStandIn.pages["/banks"] = BANKS_PAGE
+        ArchiveStandIn.failures = {}
+        ArchiveStandIn.requests_seen = []
+        ArchiveStandIn.max_in_flight = 0
+
+    def test_retries_transient_errors(self):
+        ArchiveStandIn.failures = {"/page0": 2}
+        text = fetch_text(f"{self.base}/page0", per_host_interval=0, backoff=0.01)
+        self.assertEqual(text, "page 0")
+        self.assertEqual(len(ArchiveStandIn.requests_seen), 3)
+
+    def test_gives_up_after_retries(self):
+        ArchiveStandIn.failures = {"/page0": 5}
+        with self.assertRaises(requests.HTTPError):
+            fetch_text(f"{self.base}/page0", per_host_interval=0, retries=1, backoff=0.01)
+
+    def test_client_errors_are_not_retried(self):
+        with self.assertRaises(requests.HTTPError):
+            fetch_text(f"{self.base}/missing", per_host_interval=0, backoff=0.01)
+        self.assertEqual(len(ArchiveStandIn.requests_seen), 1)
+
+    def test_bounded_concurrency(self):
+        fetcher = Fetcher(max_concurrency=2, per_host_interval=0)
+        urls = [f"{self.base}/page{i}" for i in range(6)]
+        texts = run_jobs([(url, str.upper, {}) for url in urls], fetcher=fetcher)
+        self.assertEqual(texts, [f"PAGE {i}" for i in range(6)])
+        self.assertEqual(ArchiveStandIn.max_in_flight, 2)
+
+    def test_per_host_rate_limit(self):
+        fetcher = Fetcher(max_concurrency=4, per_host_interval=0.1)
+        run_jobs([(f"{self.base}/page{i}", str.upper, {}) for i in range(3)], fetcher=fetcher)
+        starts = sorted(t for _, t in ArchiveStandIn.requests_seen)
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        self.assertTrue(all(gap >= 0.09 for gap in gaps), gaps)
+
+    def test_streamed_fetch_stops_after_the_table(self):
+        filler = "<p>" + "x" * 1000 + "</p>\n"
+        ArchiveStandIn.pages["/long"] = BANKS_PAGE.replace("</body>", filler * 2000 + "</body>")
+        chunks_read = []
+
+        def parse(chunks):
+            def counted():
+                for chunk in chunks:
+                    chunks_read.append(len(chunk))
+                    yield chunk
+
+            return locate_table(counted(), required_headers=["Bank name", "Market cap"])
+
+        banks = fetch_streamed(f"{self.base}/long", parse, per_host_interval=0)
+        self.assertEqual(list(banks["Bank name"]), ["JPMorgan Chase"])
+        self.assertEqual(len(chunks_read), 1)
+        self.assertLessEqual(chunks_read[0], STREAM_CHUNK_SIZE)
+
+    def test_streamed_fetch_retries(self):
+        ArchiveStandIn.failures = {"/banks": 1}
+        banks = fetch_streamed(
+            f"{self.base}/banks",
+            lambda chunks: locate_table(chunks, required_headers=["Bank name"]),
+            per_host_interval=0,
+            backoff=0.01,
+        )
+        self.assertEqual(list(banks["Bank name"]), ["JPMorgan Chase"])
+        self.assertEqual(len(ArchiveStandIn.requests_seen), 2)
+        with self.assertRaises(requests.HTTPError):
+            fetch_streamed(f"{self.base}/missing", list, per_host_interval=0, retries=0)
+
+    def test_fetch_and_parse_in_worker_pool(self):
+        (banks,) = run_jobs(
+            [(f"{self.base}/banks", locate_table, {"required_headers": ["Bank name"]})],
+            fetcher=Fetcher(per_host_interval=0),
+            parse_workers=1,
+        )
+        self.assertEqual(list(banks["Bank name"]), ["JPMorgan Chase"])
+
+
+if __name__ == "__main__":
+    unittest.main()
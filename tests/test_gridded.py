@@ -0,0 +1,80 @@
+import unittest
+import os
+
+import numpy as np
+import pandas as pd
+
+# Also puts StormDynamics_Attribution on the Python path
+from storm_testing import StormETLTestCase
+
+from gridded import GriddedDataset
+from phase1etl import SCS_WEIGHTS
+
+
+class TestGriddedDataset(StormETLTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dataset = GriddedDataset.create(
+            os.path.join(self.dir, "grid"), "2020-01-01", "2020-01-10",
+            lat=(30.0, 31.0, 0.5), lon=(-100.0, -98.0, 0.5), attrs={"source": "test"}
+        )
+
+    def test_axes(self):
+        self.assertEqual(self.dataset.shape, (10, 3, 5))
+        self.assertEqual(self.dataset.times[-1], pd.Timestamp("2020-01-10"))
+        np.testing.assert_allclose(self.dataset.lats, [30.0, 30.5, 31.0])
+        np.testing.assert_allclose(self.dataset.lons, [-100.0, -99.5, -99.0, -98.5, -98.0])
+
+    def test_variables_round_trip_through_the_memory_map(self):
+        cube = self.dataset.create_variable("cape", units="J/kg")
+        values = np.arange(150, dtype="float32").reshape(10, 3, 5)
+        cube[:] = values
+        cube.flush()
+        self.dataset.set_attrs(moments={"cape": 1})
+
+        reopened = GriddedDataset(self.dataset.directory)
+        self.assertEqual(reopened.variables, {"cape": {"dtype": "float32", "units": "J/kg"}})
+        self.assertEqual(reopened.metadata["attrs"], {"source": "test", "moments": {"cape": 1}})
+        stored = reopened.variable("cape")
+        self.assertIsInstance(stored, np.memmap)
+        np.testing.assert_array_equal(stored, values)
+        with self.assertRaises(KeyError):
+            reopened.variable("shear")
+
+    def test_time_slices_cover_the_time_axis(self):
+        self.assertEqual(list(self.dataset.time_slices(4)), [slice(0, 4), slice(4, 8), slice(8, 10)])
+        self.assertEqual(list(self.dataset.time_slices(20)), [slice(0, 10)])
+
+
+class TestGriddedETL(StormETLTestCase):
+    def etl(self, run_id=None, directory="grid", **overrides):
+        return super().etl(run_id, end_date="2020-03-31", gridded={
+            "directory": directory, "lat": [30.0, 32.0, 0.5], "lon": [-100.0, -98.0, 0.5],
+            "chunk_days": 10,
+        }, **overrides)
+
+    def test_chunked_transform_matches_whole_cube(self):
+        dataset = self.etl().run_gridded()
+        self.assertEqual(dataset.shape, (91, 5, 5))
+        cubes = {name: np.asarray(dataset.variable(name), dtype="float64")
+                 for name in ("cape", "shear", "temperature")}
+        index = sum(
+            weight * (cubes[name] - cubes[name].mean()) / cubes[name].std(ddof=1)
+            for name, weight in SCS_WEIGHTS.items()
+        )
+        np.testing.assert_allclose(dataset.variable("scs_index"), index, atol=1e-6)
+        np.testing.assert_array_equal(dataset.variable("storm_event"),
+                                      (index > 1.0) & (cubes["temperature"] > 20))
+        moments = dataset.metadata["attrs"]["moments"]
+        self.assertEqual(moments["cape"]["count"], 91 * 25)
+        self.assertAlmostEqual(moments["cape"]["mean"], cubes["cape"].mean(), places=3)
+
+    def test_extraction_is_reproducible(self):
+        first = self.etl(directory="first").extract_gridded()
+        second = self.etl(directory="second").extract_gridded()
+        for name in ("cape", "shear", "temperature", "humidity"):
+            np.testing.assert_array_equal(first.variable(name), second.variable(name))
+
+
+if __name__ == "__main__":
+    unittest.main()
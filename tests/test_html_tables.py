@@ -0,0 +1,57 @@
+import unittest
+import sys
+import os
+
+import pandas as pd
+
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.html_tables import locate_table
+
+PAGE_HEAD = """
+<html><body>
+<table class="infobox"><tr><th>Bank name</th><td>Not this one</td></tr></table>
+<h2>By market capitalization</h2>
+<table class="wikitable">
+<tbody>
+<tr><th>Rank</th><th>Bank name</th><th>Market cap<br>(US$ billion)</th></tr>
+<tr><td>1</td><td><a href="/jpm">JPMorgan Chase</a></td><td>432.92</td></tr>
+<tr><td>2</td><td>Bank of America</td><td>1,231.52</td></tr>
+<tr><td>3</td><td>ICBC &amp; Co</td><td>194.56</td></tr>
+</tbody>
+</table>
+"""
+PAGE_TAIL = "<table><tr><th>Bank name</th><th>Market cap</th></tr></table></body></html>"
+
+
+class TestLocateTable(unittest.TestCase):
+    def test_locate_table_by_headers(self):
+        result = locate_table(PAGE_HEAD + PAGE_TAIL, ["Bank name", "Market cap"])
+        expected = pd.DataFrame(
+            {
+                "Rank": [1, 2, 3],
+                "Bank name": ["JPMorgan Chase", "Bank of America", "ICBC & Co"],
+                "Market cap (US$ billion)": [432.92, 1231.52, 194.56],
+            }
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_stops_reading_after_table_closes(self):
+        def chunks():
+            yield PAGE_HEAD
+            raise AssertionError("Read past the end of the table")
+
+        result = locate_table(chunks(), ["Bank name", "Market cap"])
+        self.assertEqual(len(result), 3)
+
+    def test_max_rows(self):
+        result = locate_table(PAGE_HEAD, ["Bank name", "Market cap"], max_rows=2)
+        self.assertEqual(list(result["Bank name"]), ["JPMorgan Chase", "Bank of America"])
+
+    def test_table_not_found(self):
+        self.assertIsNone(locate_table(PAGE_HEAD, ["Country"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
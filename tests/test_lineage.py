@@ -0,0 +1,99 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.lineage import LineageStore, file_fingerprint, main
+from src.pipeline import collect, map_chunks, run_pipeline
+
+
+class TestLineage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.store = LineageStore(os.path.join(self.dir, "lineage.db"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def record(self, job, rows, duration, run_id=None):
+        run = self.store.start_run(job, run_id=run_id)
+        run.record_stage("transform", duration, rows)
+        run.finish()
+        return run
+
+    def test_records_run_stages_inputs_and_outputs(self):
+        source = os.path.join(self.dir, "source.csv")
+        target = os.path.join(self.dir, "target.csv")
+        pd.DataFrame({"a": [1, 2, 3]}).to_csv(source, index=False)
+        with self.store.start_run("job", batch_id="batch-1") as run:
+            run.record_input(source)
+            run.record_input("https://example.com/page")
+            run.record_input(source, checksum=False)
+            with run.stage("extract") as stage:
+                df = pd.read_csv(source)
+                stage.rows = len(df)
+            df.to_csv(target, index=False)
+            run.record_output(target, len(df))
+
+        runs = self.store.runs("job")
+        self.assertEqual(runs.loc[0, "status"], "succeeded")
+        self.assertEqual(runs.loc[0, "batch_id"], "batch-1")
+        stages = self.store.stages(run.run_id)
+        self.assertEqual(stages.loc[0, "rows"], 3)
+        self.assertGreater(stages.loc[0, "rows_per_sec"], 0)
+        inputs = self.store.inputs(run.run_id)
+        self.assertEqual(inputs.loc[0, "sha256"], file_fingerprint(source)["sha256"])
+        self.assertTrue(pd.isna(inputs.loc[1, "sha256"]))
+        self.assertTrue(pd.isna(inputs.loc[2, "sha256"]))
+        self.assertEqual(inputs.loc[2, "size"], os.path.getsize(source))
+        self.assertEqual(self.store.outputs(run.run_id).loc[0, "size"], os.path.getsize(target))
+
+    def test_failed_run(self):
+        with self.assertRaises(ValueError):
+            with self.store.start_run("job"):
+                raise ValueError("boom")
+        self.assertEqual(self.store.runs("job").loc[0, "status"], "failed")
+
+    def test_pipeline_stages_exclude_waiting(self):
+        def source():
+            for i in range(3):
+                time.sleep(0.1)
+                yield pd.DataFrame({"a": [i] * 10})
+
+        with self.store.start_run("job") as run:
+            df = run_pipeline(
+                run.timed_source("extract", source()),
+                map_chunks(run.timed("transform", lambda chunk: chunk * 2)),
+                sink=run.timed_sink("load", collect),
+            )
+        self.assertEqual(len(df), 30)
+        stages = self.store.stages(run.run_id).set_index("stage")
+        self.assertEqual(stages["rows"].tolist(), [30, 30, 30])
+        self.assertGreaterEqual(stages.loc["extract", "duration"], 0.3)
+        # The sink spends its time waiting for the slow source
+        self.assertLess(stages.loc["load", "duration"], 0.1)
+
+    def test_trends_flag_regressions(self):
+        for i in range(4):
+            self.record("fast", 1000, 1.0, run_id=f"fast-{i}")
+            self.record("slow", 1000, 1.0, run_id=f"slow-{i}")
+        self.record("fast", 1000, 0.9, run_id="fast-latest")
+        self.record("slow", 1000, 2.0, run_id="slow-latest")
+        trends = self.store.trends(last=10).set_index("job")
+        self.assertFalse(trends.loc["fast", "regression"])
+        self.assertTrue(trends.loc["slow", "regression"])
+        self.assertAlmostEqual(trends.loc["slow", "ratio"], 0.5)
+        self.assertIn("REGRESSION", self.store.report())
+        self.assertEqual(main(["--db", self.store.path, "report", "--job", "fast"]), 0)
+        self.assertEqual(main(["--db", self.store.path, "report"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the 'StormDynamics_Attribution' directory to the Python path
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "StormDynamics_Attribution"))
+)
+
+from online_stats import RunningMoments, load_merged_moments, load_moments, save_moments
+
+
+class TestRunningMoments(unittest.TestCase):
+    def setUp(self):
+        self.values = np.random.default_rng(3).normal(1500, 500, 1000)
+
+    def test_chunked_updates_match_full_batch(self):
+        moments = RunningMoments()
+        for chunk in np.array_split(self.values, 7):
+            moments = moments.update(chunk)
+        self.assertEqual(moments.count, 1000)
+        self.assertAlmostEqual(moments.mean, self.values.mean(), places=9)
+        self.assertAlmostEqual(moments.std, pd.Series(self.values).std(), places=9)
+
+    def test_merge_is_order_independent(self):
+        parts = [RunningMoments.from_values(chunk) for chunk in np.array_split(self.values, 4)]
+        left = parts[0].merge(parts[1]).merge(parts[2].merge(parts[3]))
+        right = parts[3].merge(parts[1]).merge(parts[0]).merge(parts[2])
+        self.assertEqual(left.count, right.count)
+        self.assertAlmostEqual(left.mean, right.mean, places=9)
+        self.assertAlmostEqual(left.m2, right.m2, places=3)
+
+    def test_nan_and_empty_chunks(self):
+        moments = RunningMoments.from_values([1.0, np.nan, 3.0]).update([]).merge(RunningMoments())
+        self.assertEqual(moments.count, 2)
+        self.assertEqual(moments.mean, 2.0)
+        self.assertTrue(np.isnan(RunningMoments.from_values([5.0]).std))
+        np.testing.assert_allclose(moments.zscore([1.0, 3.0]), [-1 / np.sqrt(2), 1 / np.sqrt(2)])
+
+    def test_persisted_moments_merge_over_sub_jobs(self):
+        halves = np.array_split(self.values, 2)
+        with sqlite3.connect(":memory:") as conn:
+            save_moments(conn, "storm_events:north", {"cape": RunningMoments.from_values(halves[0])})
+            save_moments(conn, "storm_events:south", {"cape": RunningMoments.from_values(halves[1])})
+            save_moments(conn, "other", {"cape": RunningMoments.from_values([1e9])})
+            self.assertEqual(load_moments(conn, "storm_events"), {})
+            merged = load_merged_moments(conn, "storm_events")["cape"]
+        self.assertEqual(merged.count, 1000)
+        self.assertAlmostEqual(merged.std, pd.Series(self.values).std(), places=9)
+
+
+if __name__ == "__main__":
+    unittest.main()
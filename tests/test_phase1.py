@@ -0,0 +1,306 @@
+import unittest
+import os
+import json
+import pickle
+from unittest.mock import patch
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+# Also puts StormDynamics_Attribution on the Python path
+from storm_testing import StormETLTestCase, read_table
+
+# Render plots without a display
+matplotlib.use("Agg")
+
+import phase1
+from phase1 import (ATTRIBUTION_FEATURES, STORM_EVENT_DTYPES, _fit_attribution,
+                    _storm_events_filter, analysis_cache_key, bootstrap_attribution,
+                    histogram_2d, load_cached_analysis, load_data_from_db,
+                    perform_attribution_analysis, perform_incremental_attribution, plot_results,
+                    read_attribution_rows, read_storm_events, save_cached_analysis,
+                    table_fingerprint, trained_rows_checksum)
+
+ANALYSIS_CONFIG = {
+    "start_date": None,
+    "end_date": None,
+    "seasons": None,
+    "attribution_mode": "batch",
+    "model_path": "data/attribution_model.pkl",
+    "bootstrap_replicates": 0,
+    "bootstrap_workers": None,
+    "confidence": 0.95,
+    "plot_mode": "auto",
+    "density_threshold": 100000,
+    "cache_dir": "data/analysis_cache",
+    "cache_entries": 8,
+}
+
+
+class TestReadStormEvents(StormETLTestCase):
+    def setUp(self):
+        super().setUp()
+        etl = self.etl()
+        etl.run_etl()
+        self.config = etl.config
+
+    def test_filter_clause(self):
+        self.assertEqual(_storm_events_filter(), ("", []))
+        self.assertEqual(
+            _storm_events_filter("2020-02-01", "2020-02-29", ["Winter", "Spring"]),
+            (" WHERE date >= ? AND date < ? AND season IN (?, ?)",
+             ["2020-02-01 00:00:00", "2020-03-01", "Winter", "Spring"])
+        )
+
+    def test_date_bounds_are_inclusive(self):
+        arrays = read_storm_events("storm_data.db", start_date="2020-02-01", end_date="2020-02-29")
+        self.assertEqual(len(arrays["date"]), 29)
+        self.assertEqual(arrays["date"][0], np.datetime64("2020-02-01"))
+        self.assertEqual(arrays["date"][-1], np.datetime64("2020-02-29"))
+
+    def test_seasons(self):
+        df = load_data_from_db("storm_data.db", seasons=["Winter"])
+        self.assertEqual(len(df), 60)
+        self.assertEqual(set(df["season"]), {"Winter"})
+        self.assertEqual(len(load_data_from_db("storm_data.db", seasons=["Winter", "Spring"])), 152)
+
+    def test_columns_are_projected(self):
+        df = load_data_from_db("storm_data.db", columns=["date", "cape"])
+        self.assertEqual(list(df.columns), ["date", "cape"])
+        self.assertEqual(len(df), 182)
+        with self.assertRaises(ValueError):
+            read_storm_events("storm_data.db", columns=["cape", "rowid"])
+
+    def test_chunks_match_the_table(self):
+        table = read_table(self.config, order="date")
+        # Three full chunks and a partial one
+        arrays = read_storm_events("storm_data.db", chunksize=50)
+        self.assertEqual(arrays["date"].dtype, np.dtype("datetime64[ns]"))
+        np.testing.assert_array_equal(arrays["date"], pd.to_datetime(table["date"]).to_numpy())
+        for column in ("cape", "scs_index", "storm_event", "season"):
+            np.testing.assert_array_equal(arrays[column], table[column].to_numpy())
+            self.assertEqual(arrays[column].dtype, np.dtype(STORM_EVENT_DTYPES[column]))
+
+    def test_empty_result(self):
+        arrays = read_storm_events("storm_data.db", start_date="2021-01-01")
+        self.assertEqual({column: len(values) for column, values in arrays.items()},
+                         dict.fromkeys(STORM_EVENT_DTYPES, 0))
+        self.assertEqual(arrays["date"].dtype, np.dtype("datetime64[ns]"))
+        df = load_data_from_db("storm_data.db", seasons=["Fall"])
+        self.assertEqual(list(df.columns), list(STORM_EVENT_DTYPES))
+        self.assertEqual(len(df), 0)
+
+
+class TestIncrementalAttribution(StormETLTestCase):
+    def test_unchanged_rows_are_not_trained_again(self):
+        self.etl().run_etl()
+        coefs = perform_incremental_attribution("storm_data.db", "model.pkl")
+        self.assertEqual(perform_incremental_attribution("storm_data.db", "model.pkl"), coefs)
+
+    def test_new_load_updates_the_model(self):
+        self.etl(end_date="2020-03-31").run_etl()
+        perform_incremental_attribution("storm_data.db", "model.pkl")
+        checksum = trained_rows_checksum("storm_data.db", 91)
+
+        # The rescore of the longer run reclassifies trained rows, which keeps the model
+        self.etl().run_etl()
+        self.assertEqual(trained_rows_checksum("storm_data.db", 91), checksum)
+        with patch("phase1._new_attribution_state", wraps=phase1._new_attribution_state) as new_state:
+            perform_incremental_attribution("storm_data.db", "model.pkl")
+        new_state.assert_not_called()
+        self.assertEqual(self.state("model.pkl")["moments"]["temperature"].count, 182)
+
+    def test_changed_trained_rows_refit_the_model(self):
+        etl = self.etl()
+        etl.run_etl()
+        perform_incremental_attribution("storm_data.db", "model.pkl")
+        changed = etl.extract("2020-03-01", "2020-03-01")
+        changed["temperature"] = 40.0
+        etl.load(etl.transform(changed, etl._global_moments()))
+
+        with patch("phase1._new_attribution_state", wraps=phase1._new_attribution_state) as new_state:
+            updated = perform_incremental_attribution("storm_data.db", "model.pkl")
+        new_state.assert_called_once()
+        self.assertEqual(updated, perform_incremental_attribution("storm_data.db", "fresh.pkl"))
+
+    def test_trains_on_the_analysis_filter(self):
+        self.etl().run_etl()
+        perform_incremental_attribution("storm_data.db", "model.pkl", start_date="2020-02-01",
+                                        seasons=["Spring", "Winter"])
+        expected = load_data_from_db("storm_data.db", start_date="2020-02-01",
+                                     seasons=["Spring", "Winter"])
+        self.assertEqual(self.state("model.pkl")["moments"]["temperature"].count, len(expected))
+
+        with patch("phase1._new_attribution_state", wraps=phase1._new_attribution_state) as new_state:
+            perform_incremental_attribution("storm_data.db", "model.pkl", seasons=["Summer"])
+        new_state.assert_called_once()
+        self.assertEqual(self.state("model.pkl")["moments"]["temperature"].count,
+                         len(load_data_from_db("storm_data.db", seasons=["Summer"])))
+
+    @staticmethod
+    def state(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+class TestBootstrap(StormETLTestCase):
+    def test_intervals_cover_the_reported_coefficients(self):
+        self.etl(end_date="2021-12-31").run_etl()
+        df = load_data_from_db("storm_data.db")
+        rows = {"batch": df, "incremental": read_attribution_rows("storm_data.db")}
+        reported = {
+            "batch": perform_attribution_analysis(df),
+            "incremental": perform_incremental_attribution("storm_data.db", "model.pkl", chunksize=100),
+        }
+        # The incremental replicates are fitted the way the reported model was
+        X = rows["incremental"][ATTRIBUTION_FEATURES].to_numpy(dtype="float64")
+        np.testing.assert_allclose(
+            _fit_attribution(X, rows["incremental"]["storm_event"].to_numpy(), "incremental", 100),
+            reported["incremental"]
+        )
+        intervals = {}
+        for mode in ("batch", "incremental"):
+            intervals[mode] = bootstrap_attribution(rows[mode], n_replicates=40, workers=2, mode=mode,
+                                                    chunksize=100)
+            for (lower, upper), coef in zip(intervals[mode].values(), reported[mode]):
+                self.assertLessEqual(lower, coef)
+                self.assertLessEqual(coef, upper)
+        self.assertNotEqual(intervals["batch"], intervals["incremental"])
+        self.assertEqual(bootstrap_attribution(rows["incremental"], n_replicates=40, workers=1,
+                                               mode="incremental", chunksize=100),
+                         intervals["incremental"])
+
+
+class TestHistogram(unittest.TestCase):
+    def test_chunked_counts_match_one_pass(self):
+        rng = np.random.default_rng(7)
+        x, y = rng.normal(size=1000), rng.normal(size=1000)
+        x[::50] = np.nan
+        counts, x_edges, y_edges = histogram_2d(x, y, bins=20, chunksize=37)
+        finite = np.isfinite(x)
+        expected, expected_x, expected_y = np.histogram2d(x[finite], y[finite], bins=20)
+        np.testing.assert_array_equal(counts, expected)
+        np.testing.assert_allclose(x_edges, expected_x)
+        np.testing.assert_allclose(y_edges, expected_y)
+        self.assertEqual(counts.sum(), finite.sum())
+
+    def test_binary_columns_get_one_bin_per_level(self):
+        x = np.linspace(-2.0, 2.0, 100)
+        y = (x > 1).astype(int)
+        counts, _, y_edges = histogram_2d(x, y, bins=10, chunksize=30)
+        np.testing.assert_array_equal(y_edges, [-0.5, 0.5, 1.5])
+        self.assertEqual(counts.shape, (10, 2))
+        self.assertEqual(counts[:, 1].sum(), y.sum())
+
+
+class TestPlotResults(StormETLTestCase):
+    def frame(self, rows):
+        rng = np.random.default_rng(7)
+        return pd.DataFrame({
+            "scs_index": rng.normal(size=rows),
+            "storm_event": np.arange(rows) % 2,
+            "temperature": rng.normal(20, 5, size=rows),
+            "humidity": rng.normal(60, 10, size=rows),
+            "cape": rng.normal(1500, 500, size=rows),
+            "shear": rng.normal(15, 5, size=rows),
+        })
+
+    def test_auto_switches_to_density_above_the_threshold(self):
+        for rows, density in ((50, False), (51, True)):
+            with patch("phase1._plot_density", wraps=phase1._plot_density) as plot_density:
+                plot_results(self.frame(rows), 0.1, 0.2, mode="auto", threshold=50, bins=10)
+            self.assertEqual(plot_density.called, density, rows)
+            self.assertTrue(os.path.exists("scs_index_plot.png"))
+            self.assertEqual(len(pd.read_csv("scs_index_data.csv")), rows)
+        with self.assertRaises(ValueError):
+            plot_results(self.frame(10), 0.1, 0.2, mode="hexbin")
+
+    def test_density_of_an_empty_frame(self):
+        plot_results(self.frame(0), 0.1, 0.2, mode="density", bins=10)
+        self.assertTrue(os.path.exists("scs_index_plot.png"))
+
+
+class TestAnalysisCacheKey(StormETLTestCase):
+    def test_key_ignores_plot_cache_and_worker_settings(self):
+        key = analysis_cache_key({"rows": [182, 182]}, ANALYSIS_CONFIG)
+        for name, value in [("plot_mode", "density"), ("density_threshold", 10),
+                            ("cache_dir", "elsewhere"), ("cache_entries", 2),
+                            ("bootstrap_workers", 4)]:
+            changed = dict(ANALYSIS_CONFIG, **{name: value})
+            self.assertEqual(analysis_cache_key({"rows": [182, 182]}, changed), key, name)
+
+    def test_key_follows_result_settings_and_data(self):
+        key = analysis_cache_key({"rows": [182, 182]}, ANALYSIS_CONFIG)
+        for name, value in [("seasons", ["Summer"]), ("attribution_mode", "incremental"),
+                            ("bootstrap_replicates", 100), ("confidence", 0.9),
+                            ("start_date", "2020-02-01")]:
+            changed = dict(ANALYSIS_CONFIG, **{name: value})
+            self.assertNotEqual(analysis_cache_key({"rows": [182, 182]}, changed), key, name)
+        self.assertNotEqual(analysis_cache_key({"rows": [183, 183]}, ANALYSIS_CONFIG), key)
+
+    def test_fingerprint_changes_with_the_table(self):
+        etl = self.etl(end_date="2020-03-31")
+        etl.run_etl()
+        loaded = table_fingerprint("storm_data.db")
+        self.assertEqual(etl.run_etl(), 0)
+        self.assertEqual(table_fingerprint("storm_data.db"), loaded)
+
+        changed = etl.extract("2020-03-01", "2020-03-01")
+        changed["cape"] = 0.0
+        etl.load(etl.transform(changed, etl._global_moments()))
+        upserted = table_fingerprint("storm_data.db")
+        self.assertNotEqual(upserted, loaded)
+
+        self.etl().run_etl()
+        self.assertNotEqual(table_fingerprint("storm_data.db"), upserted)
+
+
+class TestAnalysisCache(StormETLTestCase):
+    def test_round_trip(self):
+        self.assertIsNone(load_cached_analysis("cache", "missing"))
+        result = {"coefficients": (0.1, 0.2), "intervals": None}
+        save_cached_analysis("cache", "key", result)
+        self.assertEqual(load_cached_analysis("cache", "key"), result)
+        self.assertEqual(os.listdir("cache"), ["key.pkl"])
+
+    def test_least_recently_used_entries_are_evicted(self):
+        for age, key in enumerate(["a", "b", "c"]):
+            save_cached_analysis("cache", key, {"key": key}, max_entries=3)
+            os.utime(os.path.join("cache", f"{key}.pkl"), (1000 + age, 1000 + age))
+        self.assertEqual(load_cached_analysis("cache", "a"), {"key": "a"})
+        save_cached_analysis("cache", "d", {"key": "d"}, max_entries=3)
+        self.assertEqual(sorted(os.listdir("cache")), ["a.pkl", "c.pkl", "d.pkl"])
+        self.assertIsNone(load_cached_analysis("cache", "b"))
+
+
+
+class TestMainCache(StormETLTestCase):
+    def run_main(self, **analysis):
+        """Run the analysis; returns how often it plotted and fitted the model."""
+        config = dict(self.etl().config, lineage={"location": "lineage.db"},
+                      analysis=dict(ANALYSIS_CONFIG, **analysis))
+        with open("config.json", "w") as f:
+            json.dump(config, f)
+        with patch("phase1.plot_results", wraps=phase1.plot_results) as plot, \
+                patch("phase1.perform_attribution_analysis",
+                      wraps=phase1.perform_attribution_analysis) as fit:
+            phase1.main()
+        return plot.call_count, fit.call_count
+
+    def test_unchanged_outputs_are_not_redrawn(self):
+        self.etl().run_etl()
+        self.assertEqual(self.run_main(), (1, 1))
+        self.assertEqual(self.run_main(), (0, 0))
+        self.assertEqual(self.run_main(plot_mode="density"), (1, 0))
+        os.remove("scs_index_data.csv")
+        self.assertEqual(self.run_main(plot_mode="density"), (1, 0))
+        self.assertEqual(self.run_main(plot_mode="density"), (0, 0))
+
+        keys = [name[:-4] for name in os.listdir("data/analysis_cache") if name.endswith(".pkl")]
+        self.assertEqual(len(keys), 1)
+        self.assertEqual(set(load_cached_analysis("data/analysis_cache", keys[0])),
+                         {"temp_coef", "humidity_coef", "intervals"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,274 @@
+import unittest
+import os
+from unittest.mock import patch
+
+import pandas as pd
+
+# Also puts StormDynamics_Attribution on the Python path
+from storm_testing import StormETLTestCase, read_table
+
+from online_stats import RunningMoments
+from phase1etl import SCORED_JOB, StormDataETL
+
+
+class TestCheckpoints(StormETLTestCase):
+    def test_windows_hold_at_most_batch_size_records(self):
+        daily = self.etl()._date_windows()
+        self.assertEqual(len(daily), 7)
+        self.assertEqual(daily[0], (pd.Timestamp("2020-01-01"), pd.Timestamp("2020-01-30")))
+        self.assertEqual(daily[-1][1], pd.Timestamp("2020-06-30"))
+
+        hourly = self.etl(batch_size=100, synthetic={"seed": 7, "freq": "h"})
+        windows = hourly._date_windows()
+        self.assertEqual(windows[0], (pd.Timestamp("2020-01-01"), pd.Timestamp("2020-01-04")))
+        self.assertLessEqual(max(len(hourly.extract(*window)) for window in windows), 100)
+
+    def test_resume_after_interruption_matches_full_run(self):
+        full = self.etl(database_path=os.path.join(self.dir, "full.db"))
+        full.run_etl()
+
+        etl = self.etl()
+        original_load = StormDataETL.load
+        calls = []
+
+        def failing_load(instance, df):
+            calls.append(len(df))
+            if len(calls) == 3:
+                raise IOError("disk full")
+            original_load(instance, df)
+
+        with patch.object(StormDataETL, "load", failing_load):
+            with self.assertRaises(IOError):
+                etl.run_etl()
+        self.assertEqual(etl._read_checkpoint(), "2020-02-29")
+        self.assertEqual(len(read_table(etl.config)), 60)
+
+        etl.run_etl()
+        self.assertEqual(etl._read_checkpoint(), "2020-06-30")
+        resumed, expected = read_table(etl.config), read_table(full.config)
+        self.assertEqual(len(resumed), 182)
+        pd.testing.assert_frame_equal(
+            resumed.drop(columns="processed_date"), expected.drop(columns="processed_date")
+        )
+
+    def test_up_to_date_run_loads_nothing(self):
+        etl = self.etl()
+        self.assertEqual(etl.run_etl(), 182)
+        self.assertEqual(etl.run_etl(), 0)
+
+        etl.reset_checkpoint()
+        self.assertIsNone(etl._read_checkpoint())
+        self.assertEqual(etl.run_etl(), 182)
+        self.assertEqual(len(read_table(etl.config)), 182)
+
+
+class TestUpsert(StormETLTestCase):
+    def test_rerun_leaves_row_count_unchanged(self):
+        etl = self.etl()
+        etl.run_etl()
+        before = read_table(etl.config)
+        etl.run_etl(resume=False)
+        after = read_table(etl.config)
+        self.assertEqual(len(after), 182)
+        self.assertFalse(after.duplicated(["date", "region"]).any())
+        pd.testing.assert_frame_equal(
+            after.drop(columns="processed_date"), before.drop(columns="processed_date")
+        )
+
+    def test_upsert_updates_existing_rows(self):
+        etl = self.etl()
+        etl.run_etl()
+        changed = etl.extract("2020-03-01", "2020-03-02")
+        changed["cape"] = 0.0
+        etl.load(etl.transform(changed, etl._global_moments()))
+        table = read_table(etl.config)
+        self.assertEqual(len(table), 182)
+        self.assertEqual(list(table.loc[table["cape"] == 0.0, "date"]),
+                         ["2020-03-01 00:00:00", "2020-03-02 00:00:00"])
+
+    def test_append_mode_duplicates_until_the_key_is_added(self):
+        etl = self.etl(load_mode="append")
+        etl.run_etl()
+        etl.run_etl(resume=False)
+        self.assertEqual(len(read_table(etl.config)), 364)
+
+        upsert = self.etl()
+        upsert.run_etl(resume=False)
+        table = read_table(upsert.config)
+        self.assertEqual(len(table), 182)
+        self.assertFalse(table.duplicated(["date", "region"]).any())
+
+
+class TestRescore(StormETLTestCase):
+    def test_windowed_run_matches_full_batch_transform(self):
+        etl = self.etl()
+        etl.run_etl()
+        expected = etl.transform(etl.extract())
+        table = read_table(etl.config)
+        pd.testing.assert_series_equal(table["scs_index"], expected["scs_index"], check_names=False)
+        pd.testing.assert_series_equal(table["storm_event"], expected["storm_event"],
+                                       check_names=False, check_dtype=False)
+
+    def test_moments_are_persisted_with_the_checkpoint(self):
+        etl = self.etl()
+        etl.run_etl()
+        raw = etl.extract()
+        moments = etl._read_moments()
+        for name in ("cape", "shear"):
+            self.assertEqual(moments[name].count, 182)
+            self.assertAlmostEqual(moments[name].mean, raw[name].mean(), places=9)
+            self.assertAlmostEqual(moments[name].std, raw[name].std(), places=9)
+
+    def test_small_load_rescores_only_its_rows(self):
+        etl = self.etl(end_date="2020-06-29")
+        etl.run_etl()
+        before = read_table(etl.config)
+        scored = etl._read_moments(SCORED_JOB)
+
+        extended = self.etl()
+        extended.run_etl()
+        table = read_table(extended.config)
+        pd.testing.assert_frame_equal(table.iloc[:-1], before)
+        expected = extended.transform(extended.extract("2020-06-30", "2020-06-30"), scored)
+        self.assertAlmostEqual(table["scs_index"].iloc[-1], expected["scs_index"].iloc[0])
+        self.assertEqual(extended._read_moments(SCORED_JOB)["cape"].count, 181)
+        self.assertStatsMatchTable(extended.config)
+
+    def test_drift_past_the_tolerance_rescores_every_row(self):
+        self.etl(end_date="2020-06-29").run_etl()
+        extended = self.etl(rescore_tolerance=0)
+        extended.run_etl()
+        expected = extended.transform(extended.extract())
+        pd.testing.assert_series_equal(read_table(extended.config)["scs_index"],
+                                       expected["scs_index"], check_names=False)
+        self.assertEqual(extended._read_moments(SCORED_JOB)["cape"].count, 182)
+
+    def test_moments_without_spread_are_not_applied(self):
+        etl = self.etl(end_date="2020-01-01")
+        self.assertEqual(etl.run_etl(), 1)
+        self.assertEqual(etl._read_moments(SCORED_JOB)["cape"].count, 0)
+
+
+class TestRegions(StormETLTestCase):
+    def regions_etl(self, **overrides):
+        return self.etl(regions=["north", "south"], workers=2, **overrides)
+
+    def test_every_region_is_loaded_with_its_own_checkpoint(self):
+        etl = self.regions_etl()
+        self.assertEqual(etl.run_regions(), 364)
+        table = read_table(etl.config)
+        self.assertEqual(table["region"].value_counts().to_dict(), {"north": 182, "south": 182})
+        for region in ("north", "south"):
+            job = f"storm_events:{region}"
+            self.assertEqual(etl._read_checkpoint(job), "2020-06-30")
+            self.assertEqual(etl._read_moments(job)["cape"].count, 182)
+        self.assertIsNone(etl._read_checkpoint())
+        self.assertStatsMatchTable(etl.config)
+
+    def test_rerun_is_idempotent(self):
+        etl = self.regions_etl()
+        etl.run_regions()
+        before = read_table(etl.config)
+        self.assertEqual(etl.run_regions(), 0)
+        self.assertEqual(etl.run_regions(resume=False), 364)
+        after = read_table(etl.config)
+        pd.testing.assert_frame_equal(
+            after.drop(columns="processed_date"), before.drop(columns="processed_date")
+        )
+        self.assertStatsMatchTable(etl.config)
+
+    def test_default_region_is_reserved(self):
+        etl = self.etl(regions=["north", "default"], workers=2)
+        with self.assertRaises(ValueError):
+            etl.run_regions()
+        self.assertIsNone(etl._read_checkpoint("storm_events:north"))
+
+    def test_rescore_uses_the_moments_of_all_regions(self):
+        etl = self.regions_etl()
+        etl.run_regions()
+        raw = pd.concat([etl.extract(region=region) for region in ("north", "south")],
+                        ignore_index=True)
+        moments = {name: RunningMoments.from_values(raw[name]) for name in ("cape", "shear")}
+        expected = etl.transform(raw, moments)
+        table = read_table(etl.config)
+        pd.testing.assert_series_equal(table["scs_index"], expected["scs_index"], check_names=False)
+        pd.testing.assert_series_equal(table["storm_event"], expected["storm_event"],
+                                       check_names=False, check_dtype=False)
+
+
+class TestStatsViews(StormETLTestCase):
+    def test_views_match_group_by_after_windowed_load(self):
+        etl = self.etl()
+        etl.run_etl()
+        self.assertStatsMatchTable(etl.config)
+        seasons = read_table(etl.config, "storm_stats_by_season", "season")
+        self.assertEqual(list(seasons["season"]), ["Spring", "Summer", "Winter"])
+        self.assertEqual(seasons["records"].sum(), 182)
+
+    def test_views_follow_upserts_and_reruns(self):
+        etl = self.etl()
+        etl.run_etl()
+        changed = etl.extract("2020-03-01", "2020-03-10")
+        changed["cape"] = changed["cape"] * 3
+        etl.load(etl.transform(changed, etl._global_moments()))
+        self.assertStatsMatchTable(etl.config)
+
+        etl.run_etl(resume=False)
+        self.assertStatsMatchTable(etl.config)
+
+    def test_views_follow_the_rescore_of_a_longer_run(self):
+        etl = self.etl(end_date="2020-03-31")
+        etl.run_etl()
+        extended = self.etl()
+        extended.run_etl()
+        self.assertStatsMatchTable(extended.config)
+
+    def test_views_count_appended_duplicates(self):
+        etl = self.etl(load_mode="append")
+        etl.run_etl()
+        etl.run_etl(resume=False)
+        self.assertStatsMatchTable(etl.config)
+        self.assertEqual(read_table(etl.config, "storm_stats_by_month", "month")["records"].sum(), 364)
+
+
+class TestCompaction(StormETLTestCase):
+    def test_old_rows_move_to_rollups(self):
+        etl = self.etl(data_retention_days=60)
+        etl.run_etl()
+        before = read_table(etl.config)
+        old = before[before["date"] < "2020-05-01"]
+
+        self.assertEqual(etl.compact(as_of="2020-06-30"), {"rows": 121, "files": 0})
+        table = read_table(etl.config)
+        self.assertEqual(len(table), 61)
+        self.assertEqual(table["date"].min(), "2020-05-01 00:00:00")
+
+        monthly = read_table(etl.config, "storm_events_monthly", "period")
+        self.assertEqual(list(monthly["period"]), ["2020-01", "2020-02", "2020-03", "2020-04"])
+        self.assertEqual(monthly["records"].sum(), 121)
+        self.assertEqual(monthly["storm_events"].sum(), old["storm_event"].sum())
+        self.assertAlmostEqual(monthly.loc[0, "cape_mean"], old["cape"].iloc[:31].mean())
+        self.assertAlmostEqual(monthly.loc[0, "cape_max"], old["cape"].iloc[:31].max())
+        daily = read_table(etl.config, "storm_events_daily", "period")
+        self.assertEqual(len(daily), 121)
+
+    def test_stats_views_forget_compacted_rows(self):
+        etl = self.etl(data_retention_days=60)
+        etl.run_etl()
+        etl.compact(as_of="2020-06-30")
+        self.assertStatsMatchTable(etl.config)
+        self.assertEqual(list(read_table(etl.config, "storm_stats_by_month", "month")["month"]),
+                         ["2020-05", "2020-06"])
+
+        self.assertEqual(etl.compact(as_of="2020-06-30")["rows"], 0)
+        self.assertStatsMatchTable(etl.config)
+
+    def test_without_retention_nothing_is_compacted(self):
+        etl = self.etl()
+        etl.run_etl()
+        self.assertEqual(etl.compact(), {"rows": 0, "files": 0})
+        self.assertEqual(len(read_table(etl.config)), 182)
+
+
+if __name__ == "__main__":
+    unittest.main()
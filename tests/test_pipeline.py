@@ -0,0 +1,102 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.pipeline import buffered, collect, csv_sink, file_source, map_chunks, run_pipeline
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def chunks(self, count=3):
+        for i in range(count):
+            yield pd.DataFrame({"value": [2 * i, 2 * i + 1]})
+
+    def test_streams_chunks_in_order(self):
+        double = map_chunks(lambda df: df.assign(value=df["value"] * 2))
+        result = run_pipeline(self.chunks(), double, sink=collect)
+        self.assertEqual(result["value"].tolist(), [0, 2, 4, 6, 8, 10])
+
+    def test_map_chunks_drops_none(self):
+        keep_even = map_chunks(lambda df: df if df["value"].iloc[0] % 4 == 0 else None)
+        result = run_pipeline(self.chunks(), keep_even, sink=collect)
+        self.assertEqual(result["value"].tolist(), [0, 1, 4, 5])
+
+    def test_stages_overlap(self):
+        def slow_source():
+            for chunk in self.chunks(4):
+                time.sleep(0.2)
+                yield chunk
+
+        def slow_sink(chunks):
+            for _ in chunks:
+                time.sleep(0.2)
+
+        started = time.monotonic()
+        run_pipeline(slow_source(), sink=slow_sink)
+        # Sequential stages would take 1.6 s
+        self.assertLess(time.monotonic() - started, 1.4)
+
+    def test_queue_is_bounded(self):
+        produced = []
+
+        def source():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        stream = buffered(source(), queue_size=2)
+        next(stream)
+        time.sleep(0.3)
+        # One chunk consumed, two queued and one waiting to be put
+        self.assertLessEqual(len(produced), 4)
+        stream.close()
+
+    def test_errors_propagate_and_stop_upstream(self):
+        def failing(df):
+            raise ValueError("bad chunk")
+
+        result = {}
+        threads = threading.active_count()
+
+        def source():
+            try:
+                yield from self.chunks(50)
+            finally:
+                result["closed"] = True
+
+        with self.assertRaises(ValueError):
+            run_pipeline(source(), map_chunks(failing), sink=collect)
+        self.assertTrue(result["closed"])
+        self.assertEqual(threading.active_count(), threads)
+
+    def test_file_source_and_csv_sink(self):
+        pd.DataFrame({"a": [1, 2]}).to_csv(os.path.join(self.dir, "one.csv"), index=False)
+        pd.DataFrame({"a": [3]}).to_json(os.path.join(self.dir, "two.json"), orient="records", lines=True)
+        target = os.path.join(self.dir, "target.csv")
+        readers = {"csv": pd.read_csv, "json": lambda path: pd.read_json(path, lines=True)}
+        rows = run_pipeline(file_source(self.dir, readers, exclude=[target]), sink=csv_sink(target))
+        self.assertEqual(rows, 3)
+        self.assertEqual(pd.read_csv(target)["a"].tolist(), [1, 2, 3])
+
+        # Without chunks the sink writes the header only
+        rows = run_pipeline(iter([]), sink=csv_sink(target, columns=["a", "b"]))
+        self.assertEqual(rows, 0)
+        self.assertEqual(list(pd.read_csv(target).columns), ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import os
+import sys
+import tempfile
+import time
+
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.scheduler import load_jobs, run_schedule, topological_order
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def script(self, name, body):
+        """Write a job script into the temporary directory and return its path."""
+        path = os.path.join(self.dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(body)
+        return path
+
+    def jobs(self, tasks, **settings):
+        return load_jobs({"tasks": tasks, **settings})
+
+    def test_runs_in_script_directory(self):
+        self.script("cwd.py", "import os\nopen('cwd.txt', 'w').write(os.getcwd())\n")
+        report = run_schedule(self.jobs({"cwd": {"script": os.path.join(self.dir, "cwd.py")}}))
+        self.assertEqual(report["succeeded"], 1)
+        with open(os.path.join(self.dir, "cwd.txt"), encoding="utf-8") as f:
+            self.assertEqual(os.path.realpath(f.read()), os.path.realpath(self.dir))
+
+    def test_dependencies_run_in_order(self):
+        log = os.path.join(self.dir, "order.txt")
+        for name in ("a", "b", "c"):
+            self.script(f"{name}.py", f"open({log!r}, 'a').write('{name}')\n")
+        jobs = self.jobs({
+            "c": {"script": os.path.join(self.dir, "c.py"), "depends_on": ["b"]},
+            "b": {"script": os.path.join(self.dir, "b.py"), "depends_on": ["a"]},
+            "a": {"script": os.path.join(self.dir, "a.py")},
+        })
+        report = run_schedule(jobs, max_workers=3)
+        with open(log, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "abc")
+        self.assertEqual(report["critical_path"], ["a", "b", "c"])
+
+    def test_independent_jobs_run_concurrently(self):
+        self.script("sleep.py", "import time\ntime.sleep(1)\n")
+        tasks = {name: {"script": os.path.join(self.dir, "sleep.py")} for name in "abc"}
+        started = time.monotonic()
+        report = run_schedule(self.jobs(tasks), max_workers=3)
+        self.assertEqual(report["succeeded"], 3)
+        self.assertLess(time.monotonic() - started, 2.5)
+
+    def test_retries_then_skips_dependents(self):
+        counter = os.path.join(self.dir, "attempts.txt")
+        self.script("flaky.py", f"open({counter!r}, 'a').write('x')\nraise SystemExit(1)\n")
+        self.script("after.py", "")
+        jobs = self.jobs({
+            "flaky": {"script": os.path.join(self.dir, "flaky.py"), "retries": 2},
+            "after": {"script": os.path.join(self.dir, "after.py"), "depends_on": ["flaky"]},
+        })
+        report = run_schedule(jobs)
+        statuses = {job["job"]: job["status"] for job in report["jobs"]}
+        self.assertEqual(statuses, {"flaky": "failed", "after": "skipped"})
+        with open(counter, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "xxx")
+
+    def test_rejects_cycles_and_unknown_dependencies(self):
+        with self.assertRaises(ValueError):
+            self.jobs({"a": {"script": "a.py", "depends_on": ["b"]},
+                       "b": {"script": "b.py", "depends_on": ["a"]}})
+        with self.assertRaises(ValueError):
+            self.jobs({"a": {"script": "a.py", "depends_on": ["missing"]}})
+
+    def test_topological_order(self):
+        jobs = {"b": {"depends_on": ["a"]}, "a": {"depends_on": []}}
+        self.assertEqual(topological_order(jobs), ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
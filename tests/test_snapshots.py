@@ -0,0 +1,109 @@
+import unittest
+import os
+
+import numpy as np
+import pandas as pd
+
+# Also puts StormDynamics_Attribution on the Python path
+from storm_testing import StormETLTestCase, read_table
+
+from snapshots import prune_catalog, read_catalog, read_snapshot, record_snapshot, write_snapshot
+
+
+def sample_frame(days=5, start="2020-01-01"):
+    return pd.DataFrame({
+        "date": pd.date_range(start, periods=days, freq="D"),
+        "cape": np.linspace(1000.0, 2000.0, days),
+        "storm_event": np.arange(days) % 2,
+        "region": ["north"] * days,
+    })
+
+
+class TestSnapshots(StormETLTestCase):
+    def test_round_trip_keeps_types(self):
+        df = sample_frame()
+        _, path, written = write_snapshot(df, self.dir, "raw")
+        self.assertTrue(written)
+        pd.testing.assert_frame_equal(read_snapshot(path), df)
+
+    def test_identical_content_is_stored_once(self):
+        digest, path, _ = write_snapshot(sample_frame(), self.dir, "raw")
+        again, same_path, written = write_snapshot(sample_frame(), self.dir, "raw")
+        self.assertEqual((again, same_path, written), (digest, path, False))
+        self.assertEqual(path.name, f"raw_{digest}.npz")
+
+        changed = sample_frame()
+        changed.loc[0, "cape"] = 0.0
+        other, other_path, written = write_snapshot(changed, self.dir, "raw")
+        self.assertTrue(written)
+        self.assertNotEqual(other, digest)
+        self.assertEqual(sorted(os.listdir(self.dir)), sorted([path.name, other_path.name]))
+
+    def test_catalog_and_pruning(self):
+        catalog = os.path.join(self.dir, "catalog.jsonl")
+        old, new = sample_frame(start="2020-01-01"), sample_frame(start="2020-03-01")
+        old_digest, old_path, _ = write_snapshot(old, self.dir, "raw")
+        new_digest, new_path, _ = write_snapshot(new, self.dir, "raw")
+        record_snapshot(catalog, "run-1", "raw", old_digest, old_path, old)
+        record_snapshot(catalog, "run-2", "raw", new_digest, new_path, new)
+        # A later run whose snapshot has the same content shares the file
+        record_snapshot(catalog, "run-3", "raw", new_digest, new_path, new)
+
+        entries = read_catalog(catalog)
+        self.assertEqual([e["run_id"] for e in entries], ["run-1", "run-2", "run-3"])
+        self.assertEqual((entries[0]["first_date"], entries[0]["last_date"], entries[0]["rows"]),
+                         ("2020-01-01", "2020-01-05", 5))
+
+        self.assertEqual(prune_catalog(catalog, pd.Timestamp("2020-02-01")), 1)
+        self.assertFalse(old_path.exists())
+        self.assertTrue(new_path.exists())
+        self.assertEqual([e["run_id"] for e in read_catalog(catalog)], ["run-2", "run-3"])
+        self.assertEqual(read_catalog(os.path.join(self.dir, "missing.jsonl")), [])
+
+
+class TestReplay(StormETLTestCase):
+    def etl(self, run_id=None, database="storm_data.db", **overrides):
+        return super().etl(run_id, database_path=os.path.join(self.dir, database),
+                           end_date="2020-03-31", snapshot_format="npz", **overrides)
+
+    def read_table(self, database):
+        config = {"database_path": database}
+        return read_table(config, order="date").drop(columns="processed_date")
+
+    def test_rerun_reuses_the_stored_snapshots(self):
+        self.etl("first").run_etl()
+        files = sorted(os.listdir("data/raw")) + sorted(os.listdir("data/processed"))
+        self.assertEqual(len(files), 2 * 4)
+
+        self.etl("second").run_etl(resume=False)
+        self.assertEqual(sorted(os.listdir("data/raw")) + sorted(os.listdir("data/processed")), files)
+        entries = read_catalog("data/snapshot_catalog.jsonl")
+        paths = {run_id: {e["path"] for e in entries if e["run_id"] == run_id}
+                 for run_id in ("first", "second")}
+        self.assertEqual(len(paths["first"]), 8)
+        self.assertEqual(paths["first"], paths["second"])
+
+    def test_replay_rebuilds_the_table(self):
+        self.etl("first").run_etl()
+        for kind in ("processed", "raw"):
+            database = f"replayed_{kind}.db"
+            replay = self.etl("replay", database)
+            self.assertEqual(replay.replay("first", kind), 91)
+            pd.testing.assert_frame_equal(self.read_table(database), self.read_table("storm_data.db"))
+            self.assertEqual(replay._read_checkpoint(), "2020-03-31")
+            self.assertEqual(replay.run_etl(), 0)
+        with self.assertRaises(ValueError):
+            self.etl("replay").replay("unknown")
+
+    def test_replay_into_the_loaded_database_changes_nothing(self):
+        etl = self.etl("first")
+        etl.run_etl()
+        before = self.read_table("storm_data.db")
+        moments = etl._global_moments()
+        self.assertEqual(etl.replay("first"), 91)
+        pd.testing.assert_frame_equal(self.read_table("storm_data.db"), before)
+        self.assertEqual(etl._global_moments()["cape"].count, moments["cape"].count)
+
+
+if __name__ == "__main__":
+    unittest.main()
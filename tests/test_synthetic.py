@@ -0,0 +1,68 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the 'StormDynamics_Attribution' directory to the Python path
+sys.path.append(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "StormDynamics_Attribution"))
+)
+
+from synthetic import SYNTHETIC_VARIABLES, SyntheticStormGenerator
+
+
+class TestSyntheticStormGenerator(unittest.TestCase):
+    def setUp(self):
+        # Small blocks, so the ranges below span several streams
+        self.generator = SyntheticStormGenerator(seed=7, block_size=16)
+        self.whole = self.generator.generate("2020-01-01", "2020-03-31")
+
+    def test_range_and_columns(self):
+        self.assertEqual(len(self.whole), 91)
+        self.assertEqual(list(self.whole.columns), ["date", *SYNTHETIC_VARIABLES, "region"])
+        self.assertEqual(self.whole["date"].iloc[0], pd.Timestamp("2020-01-01"))
+        self.assertEqual(self.whole["date"].iloc[-1], pd.Timestamp("2020-03-31"))
+        self.assertTrue((self.whole["region"] == "default").all())
+        self.assertEqual(len(self.generator.generate("2020-02-01", "2020-01-31")), 0)
+
+    def test_any_split_gives_the_same_data(self):
+        bounds = ["2020-01-01", "2020-01-05", "2020-01-20", "2020-03-01", "2020-04-01"]
+        parts = [
+            self.generator.generate(start, pd.Timestamp(end) - pd.Timedelta(days=1))
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), self.whole)
+
+        same_seed = SyntheticStormGenerator(seed=7, block_size=16)
+        pd.testing.assert_frame_equal(same_seed.generate("2020-01-01", "2020-03-31"), self.whole)
+
+    def test_seed_and_region_select_the_streams(self):
+        other_seed = SyntheticStormGenerator(seed=8, block_size=16).generate("2020-01-01", "2020-03-31")
+        other_region = self.generator.generate("2020-01-01", "2020-03-31", region="north")
+        for other in (other_seed, other_region):
+            self.assertFalse(np.allclose(other["cape"], self.whole["cape"]))
+        self.assertTrue((other_region["region"] == "north").all())
+
+        unseeded = SyntheticStormGenerator().generate("2020-01-01", "2020-01-10")
+        self.assertFalse(np.allclose(unseeded["cape"], self.whole["cape"].iloc[:10]))
+
+    def test_hourly_series(self):
+        hourly = SyntheticStormGenerator(seed=7, freq="h", block_size=16)
+        day = hourly.generate("2020-01-01", "2020-01-01")
+        self.assertEqual(len(day), 24)
+        self.assertEqual(day["date"].iloc[-1], pd.Timestamp("2020-01-01 23:00"))
+        self.assertEqual(hourly.step, pd.Timedelta(hours=1))
+        days = hourly.generate("2020-01-01", "2020-01-03")
+        pd.testing.assert_frame_equal(days.iloc[:24], day)
+
+    def test_variables_follow_their_distributions(self):
+        large = SyntheticStormGenerator(seed=7).generate("2000-01-01", "2019-12-31")
+        for name, (mean, std) in SYNTHETIC_VARIABLES.items():
+            self.assertAlmostEqual(large[name].mean(), mean, delta=4 * std / np.sqrt(len(large)))
+            self.assertAlmostEqual(large[name].std(), std, delta=0.05 * std)
+
+
+if __name__ == "__main__":
+    unittest.main()
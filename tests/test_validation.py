@@ -0,0 +1,99 @@
+import unittest
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the 'src' directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.pipeline import collect, map_chunks, run_pipeline
+from src.validation import Validator, summarize
+
+RULES = [
+    {"column": "price", "check": "range", "min": 0},
+    {"column": "fuel", "check": "allowed", "values": ["Petrol", "Diesel"]},
+    {"column": "car_model", "check": "null_ratio", "max_ratio": 0.5},
+    {"column": "id", "check": "unique"},
+]
+
+
+class TestValidation(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame(
+            {
+                "id": [1, 2, 3, 3, 4, 1],
+                "price": [100.0, -5.0, 200.0, np.nan, 50.0, 10.0],
+                "fuel": ["Petrol", "Diesel", "Steam", None, "Petrol", "Steam"],
+                "car_model": ["Baleno", None, "Swift", None, None, "Alto"],
+            }
+        )
+
+    def rule(self, report, column, check):
+        return next(r for r in report["rules"] if r["column"] == column and r["check"] == check)
+
+    def test_rules_across_chunks(self):
+        validator = Validator(RULES)
+        result = run_pipeline(
+            (self.df.iloc[i:i + 2] for i in range(0, 6, 2)),
+            map_chunks(validator.update),
+            sink=collect,
+        )
+        pd.testing.assert_frame_equal(result, self.df)
+        report = validator.report()
+        self.assertEqual(report["rows"], 6)
+        self.assertFalse(report["passed"])
+
+        price = self.rule(report, "price", "range")
+        self.assertEqual((price["violations"], price["examples"]), (1, [-5.0]))
+        fuel = self.rule(report, "fuel", "allowed")
+        self.assertEqual((fuel["violations"], fuel["examples"]), (2, ["Steam"]))
+        models = self.rule(report, "car_model", "null_ratio")
+        self.assertEqual(models["violations"], 3)
+        self.assertTrue(models["passed"])
+        # Duplicates are found within a chunk and across chunks
+        ids = self.rule(report, "id", "unique")
+        self.assertEqual((ids["violations"], sorted(ids["examples"])), (2, [1, 3]))
+        self.assertEqual(len(summarize(report)), len(RULES) + 1)
+
+    def test_missing_column_fails(self):
+        validator = Validator([{"column": "mileage", "check": "range", "min": 0}])
+        validator.update(self.df)
+        rule = validator.report()["rules"][0]
+        self.assertFalse(rule["passed"])
+        self.assertEqual(rule["examples"], ["<missing column>"])
+
+    def test_unknown_check(self):
+        with self.assertRaises(ValueError):
+            Validator([{"column": "price", "check": "positive"}])
+
+    def test_reservoir_sample_estimates(self):
+        rng = np.random.default_rng(0)
+        n = 100_000
+        data = pd.DataFrame({"id": np.arange(n), "price": rng.normal(100, 50, n)})
+        validator = Validator(
+            [{"column": "price", "check": "range", "min": 0, "max_ratio": 0.05},
+             {"column": "id", "check": "unique"}],
+            sample_size=2000,
+            seed=1,
+        )
+        for start in range(0, n, 7000):
+            validator.update(data.iloc[start:start + 7000])
+        report = validator.report()
+        self.assertEqual((report["rows"], report["sampled_rows"]), (n, 2000))
+        price = report["rules"][0]
+        self.assertTrue(price["estimated"])
+        self.assertAlmostEqual(price["ratio"], (data["price"] < 0).mean(), delta=0.01)
+        self.assertTrue(price["passed"])
+        # Uniqueness is checked on every row, not on the sample
+        self.assertFalse(report["rules"][1]["estimated"])
+        self.assertEqual(report["rules"][1]["violations"], 0)
+        # The sample is spread uniformly over the input
+        sample_ids = validator._sample["id"]  # pylint: disable=protected-access
+        self.assertTrue(sample_ids.is_unique)
+        self.assertAlmostEqual(sample_ids.mean() / n, 0.5, delta=0.03)
+
+
+if __name__ == "__main__":
+    unittest.main()